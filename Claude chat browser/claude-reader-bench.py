@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Claude Chat Reader Benchmarks
+Generate a synthetic ~/.claude/projects tree and time claude-reader.py on it
+"""
+
+import json
+import os
+import sys
+import math
+import random
+import shutil
+import argparse
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+READER = Path(__file__).resolve().parent / 'claude-reader.py'
+BENCH = Path(__file__).resolve()
+
+NEEDLE = 'kubernetes'  # Planted in a known share of messages; the searches look for it
+
+WORDS = ('the', 'a', 'to', 'of', 'and', 'in', 'is', 'it', 'that', 'for', 'file', 'function', 'test',
+         'error', 'update', 'build', 'docker', 'config', 'script', 'value', 'check', 'return', 'list',
+         'server', 'request', 'fix', 'change', 'line', 'module', 'should', 'now', 'can', 'we', 'this')
+
+TOOLS = ('Read', 'Edit', 'Bash', 'Write', 'Grep', 'TodoWrite')
+
+CODE_LINES = (
+    'def handle_request(request, timeout=30):',
+    '    """Process one request and return the response"""',
+    '    if not request.get("id"):',
+    "        raise ValueError('missing id')",
+    '    for item in sorted(items, key=lambda x: x["name"]):',
+    '        total += item.price * item.quantity  # ünïcode €',
+    '    return {"status": "ok", "count": len(results)}',
+    '',
+    'class Config:',
+    '    path = "/etc/app/config.yaml"',
+    '\tprint(f"done in {elapsed:.2f}s")',
+)
+
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'
+
+def print_colored(message, color):
+    """Print colored message"""
+    print(f"{color}{message}{Colors.NC}")
+
+def parse_size(text):
+    """Parse a size like 512KB, 10MB or 2.5GB (powers of 1024) to bytes"""
+    text = text.strip().upper().rstrip('B')
+    units = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    unit = text[-1] if text and text[-1] in units else ''
+    return int(float(text[:len(text) - len(unit)]) * units[unit])
+
+def format_size(size):
+    """Format a byte count like 12.3 MB"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+class CorpusGenerator:
+    """Writes realistic Claude Code chat files
+
+    Sessions alternate user prompts, assistant answers with tool uses, and tool
+    results whose sizes follow a log-normal distribution (many small outputs, a
+    few whole files). A share of lines is malformed, and some chats end in a
+    partial line like a session that is still being written.
+    """
+
+    def __init__(self, seed=0, tool_result_size=2048, tool_result_max=4 * 1024 ** 2,
+                 malformed_rate=0.001, needle_rate=0.01):
+        self.random = random.Random(seed)
+        self.tool_result_size = tool_result_size
+        self.tool_result_max = tool_result_max
+        self.malformed_rate = malformed_rate
+        self.needle_rate = needle_rate
+
+        # Tool outputs are slices of one large block of code-like text
+        lines = [self.random.choice(CODE_LINES) for _ in range(max(1, tool_result_max // 30))]
+        self.block = '\n'.join(lines)
+        while len(self.block) < tool_result_max:
+            self.block += '\n' + self.block
+
+    def text(self, words):
+        """Get a sentence of random words, mentioning the needle now and then"""
+        choice = self.random.choice
+        parts = [choice(WORDS) for _ in range(words)]
+        if self.random.random() < self.needle_rate:
+            parts[self.random.randrange(words)] = NEEDLE
+        return ' '.join(parts).capitalize() + '.'
+
+    def payload(self):
+        """Get a tool output with a log-normally distributed size"""
+        size = int(self.random.lognormvariate(math.log(self.tool_result_size), 1.5))
+        size = max(1, min(size, self.tool_result_max))
+        start = self.random.randrange(0, len(self.block) - size + 1)
+        return self.block[start:start + size]
+
+    def tool_call(self, tool):
+        """Get (tool input, tool_result content, toolUseResult) of one tool use"""
+        path = f"/home/user/src/app/{self.random.choice(WORDS)}_{self.random.randrange(100)}.py"
+        output = self.payload()
+        if tool == 'Read':
+            lines = output.count('\n') + 1
+            return ({'file_path': path}, output,
+                    {'type': 'text', 'file': {'filePath': path, 'content': output, 'numLines': lines,
+                                              'startLine': 1, 'totalLines': lines}})
+        if tool == 'Edit':
+            old, new = self.text(6), self.text(6)
+            return ({'file_path': path, 'old_string': old, 'new_string': new},
+                    f"The file {path} has been updated.",
+                    {'filePath': path, 'oldString': old, 'newString': new, 'originalFile': output,
+                     'structuredPatch': [{'oldStart': 1, 'oldLines': 1, 'newStart': 1, 'newLines': 1,
+                                          'lines': [f'-{old}', f'+{new}']}], 'userModified': False})
+        if tool == 'Write':
+            return ({'file_path': path, 'content': output}, f"File created successfully at: {path}",
+                    {'type': 'create', 'filePath': path, 'content': output, 'structuredPatch': []})
+        if tool == 'Grep':
+            files = [f"/home/user/src/app/{word}.py" for word in self.random.sample(WORDS, 5)]
+            return ({'pattern': self.random.choice(WORDS), 'path': '/home/user/src/app'}, '\n'.join(files),
+                    {'mode': 'files_with_matches', 'filenames': files, 'numFiles': len(files)})
+        if tool == 'TodoWrite':
+            todos = [{'content': self.text(5), 'status': self.random.choice(('pending', 'in_progress', 'completed')),
+                      'id': str(i)} for i in range(self.random.randint(1, 6))]
+            return ({'todos': todos}, 'Todos have been modified successfully.',
+                    {'oldTodos': todos[:-1], 'newTodos': todos})
+        command = f"pytest -q tests/test_{self.random.choice(WORDS)}.py"
+        return ({'command': command, 'description': self.text(4)}, output,
+                {'stdout': output, 'stderr': '', 'interrupted': False, 'isImage': False})
+
+    def session(self, session_id, messages, start, cwd):
+        """Yield the entries of one chat session with about `messages` messages"""
+        random_ = self.random
+        timestamp = start
+        parent = None
+        count = 0
+
+        def entry(entry_type, message, **extra):
+            nonlocal parent, timestamp
+            timestamp += timedelta(seconds=random_.randint(1, 90))
+            uuid = f"{random_.getrandbits(64):016x}"
+            data = {'parentUuid': parent, 'isSidechain': False, 'userType': 'external', 'cwd': cwd,
+                    'sessionId': session_id, 'version': '1.0.0', 'gitBranch': 'main', 'type': entry_type,
+                    'message': message, 'uuid': uuid,
+                    'timestamp': timestamp.strftime('%Y-%m-%dT%H:%M:%S.') + f"{timestamp.microsecond // 1000:03d}Z"}
+            data.update(extra)
+            parent = uuid
+            return data
+
+        if random_.random() < 0.5:
+            yield {'type': 'summary', 'summary': self.text(5), 'leafUuid': f"{random_.getrandbits(64):016x}"}
+
+        while count < messages:
+            yield entry('user', {'role': 'user', 'content': self.text(random_.randint(5, 60))})
+            count += 1
+            for _ in range(random_.choice((0, 1, 1, 2, 3))):
+                tool = random_.choice(TOOLS)
+                tool_input, result, tool_use_result = self.tool_call(tool)
+                tool_id = f"toolu_{random_.getrandbits(64):016x}"
+                content = [{'type': 'tool_use', 'id': tool_id, 'name': tool, 'input': tool_input}]
+                if random_.random() < 0.6:
+                    content.insert(0, {'type': 'text', 'text': self.text(random_.randint(5, 40))})
+                yield entry('assistant', {'id': f"msg_{random_.getrandbits(64):016x}", 'type': 'message',
+                                          'role': 'assistant', 'model': 'claude-synthetic', 'content': content,
+                                          'stop_reason': 'tool_use',
+                                          'usage': {'input_tokens': random_.randint(10, 5000),
+                                                    'output_tokens': random_.randint(10, 800)}})
+                yield entry('user', {'role': 'user', 'content': [{'tool_use_id': tool_id, 'type': 'tool_result',
+                                                                  'content': result}]},
+                            toolUseResult=tool_use_result)
+                count += 2
+            yield entry('assistant', {'role': 'assistant', 'model': 'claude-synthetic',
+                                      'content': [{'type': 'text', 'text': self.text(random_.randint(10, 200))}]})
+            count += 1
+
+    def write_chat(self, path, messages, start, cwd):
+        """Write one chat file; returns (bytes written, messages written)"""
+        written = count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for data in self.session(path.stem, messages, start, cwd):
+                line = json.dumps(data, ensure_ascii=False)
+                if self.random.random() < self.malformed_rate:
+                    # A cut-off line, a stray fragment or an empty line
+                    line = self.random.choice((line[:len(line) // 2], '{"type": "user", "message": {', ''))
+                else:
+                    count += data['type'] != 'summary'
+                f.write(line + '\n')
+                written += len(line.encode('utf-8')) + 1
+            if self.random.random() < 0.05:
+                # A session still being written: the last line has no newline yet
+                partial = json.dumps({'type': 'user', 'message': {'role': 'user', 'content': self.text(8)}})
+                f.write(partial[:len(partial) // 2])
+                written += len(partial[:len(partial) // 2].encode('utf-8'))
+        return written, count
+
+def generate_corpus(root, projects=5, chats=20, messages=200, size=None, seed=0, tool_result_size=2048,
+                    tool_result_max=4 * 1024 ** 2, malformed_rate=0.001, needle_rate=0.01, quiet=False):
+    """Build a ~/.claude/projects-shaped tree under root/.claude/projects
+
+    Every project gets `chats` chats of about `messages` messages (one of them ten
+    times longer, like a long-running session). With `size` (bytes), chats are
+    added round-robin until the corpus reaches that size instead.
+    Returns a summary dict, also saved as root/corpus.json.
+    """
+    projects_dir = Path(root) / '.claude' / 'projects'
+    if projects_dir.exists():
+        shutil.rmtree(projects_dir)
+    projects_dir.mkdir(parents=True)
+
+    generator = CorpusGenerator(seed, tool_result_size, tool_result_max, malformed_rate, needle_rate)
+    project_dirs = []
+    for i in range(projects):
+        project_dir = projects_dir / f"-home-user-src-bench-project-{i}"
+        project_dir.mkdir()
+        project_dirs.append(project_dir)
+
+    started = time.time()
+    total_bytes = total_messages = files = 0
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    while True:
+        project_dir = project_dirs[files % projects]
+        chat_number = files // projects
+        if size is None and chat_number >= chats:
+            break
+        if size is not None and total_bytes >= size:
+            break
+
+        count = generator.random.randint(max(1, messages // 2), messages * 3 // 2 + 1)
+        if chat_number == 0:
+            count *= 10
+        if size is not None:
+            # Keep small targets spread over all projects: no chat gets more than a
+            # share of the size, estimated from the bytes per message seen so far
+            per_message = total_bytes / total_messages if total_messages else 4 * tool_result_size
+            budget = min(size - total_bytes, size / (2 * projects))
+            count = max(2, min(count, int(budget / per_message)))
+        start = base + timedelta(days=generator.random.randint(0, 270), seconds=generator.random.randint(0, 86400))
+        chat_file = project_dir / f"{generator.random.getrandbits(128):032x}.jsonl"
+        cwd = '/' + project_dir.name[1:].replace('-', '/')
+        written, count = generator.write_chat(chat_file, count, start, cwd)
+        total_bytes += written
+        total_messages += count
+        files += 1
+        if not quiet and files % 50 == 0:
+            print(f"\r   {files} chats, {format_size(total_bytes)}", end='', flush=True)
+    if not quiet and files >= 50:
+        print()
+
+    summary = {'projects': projects, 'chats': files, 'messages': total_messages, 'bytes': total_bytes,
+               'seed': seed, 'seconds': round(time.time() - started, 2)}
+    with open(Path(root) / 'corpus.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def run_reader(command, env, timeout=None):
+    """Run a Python script (claude-reader.py and its arguments); returns (seconds, peak RSS in bytes, exit status)
+
+    The peak RSS is that of the largest process in the tree (the reader or one of
+    its workers), as reported by wait4().
+    """
+    started = time.time()
+    process = subprocess.Popen([sys.executable] + command, env=env,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = started + timeout if timeout else None
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            break
+        if deadline and time.time() > deadline:
+            process.kill()
+            pid, status, usage = os.wait4(process.pid, 0)
+            status = -1
+            break
+        time.sleep(0.01)
+    process.returncode = status
+    elapsed = time.time() - started
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return elapsed, peak, os.waitstatus_to_exitcode(status) if status >= 0 else 'timeout'
+
+def page_chat(link, page_height=22):
+    """Page through a chat to its end in the viewer, as Space does, with the terminal stubbed out
+
+    Runs the reader's own viewing path (deep link, message index, parsed-chat cache,
+    ChatDocument); only display_with_pager's keyboard loop is replaced.
+    """
+    sys.path.insert(0, str(READER.parent))
+    from claude_reader import viewer
+
+    def display_all_pages(document, title='', start_message=None):
+        top = (0, 0)
+        while True:
+            lines = document.page(top, page_height)
+            if not lines:
+                break
+            print('\n'.join(lines))
+            top = document.forward(top, page_height)
+            document.ensure(top[0] + viewer.PAGER_READ_AHEAD)
+
+    viewer.display_with_pager = display_all_pages
+    viewer.open_chat_link(link)
+
+def largest_chat(projects_dir):
+    """Get the deep link (project/chat) of the largest chat"""
+    chat = max(projects_dir.glob('*/*.jsonl'), key=lambda path: path.stat().st_size)
+    return f"{chat.parent.name}/{chat.stem}"
+
+def benchmark_corpus(root, jobs=None, timeout=None):
+    """Time the reader's operations on a generated corpus, cold (empty caches) and warm
+
+    Returns a list of result dicts.
+    """
+    root = Path(root)
+    projects_dir = root / '.claude' / 'projects'
+    cache_dir = root / 'cache'
+    export_dir = root / 'export'
+    env = dict(os.environ, CLAUDE_PROJECTS_DIR=str(projects_dir), XDG_CACHE_HOME=str(cache_dir))
+    job_args = ['-j', str(jobs)] if jobs else []
+
+    reader = [str(READER)]
+    operations = (
+        ('list', reader + ['-l']),
+        ('search (index)', reader + ['-c', NEEDLE, '--limit', '100']),
+        ('search (live scan)', reader + ['-c', NEEDLE, '--live', '--limit', '100'] + job_args),
+        ('query', reader + ['-c', f'{NEEDLE} role:assistant -error', '--limit', '100'] + job_args),
+        ('view largest chat', [str(BENCH), 'page', '--', largest_chat(projects_dir)]),
+        ('export all', reader + ['--export-dir', str(export_dir), '-f', 'markdown'] + job_args),
+    )
+
+    results = []
+    for name, command in operations:
+        result = {'operation': name}
+        for run in ('cold', 'warm'):
+            if run == 'cold' and cache_dir.exists():
+                shutil.rmtree(cache_dir)
+            if export_dir.exists():
+                shutil.rmtree(export_dir)
+            elapsed, peak, status = run_reader(command, env, timeout)
+            result[run] = {'seconds': round(elapsed, 3), 'peak_rss': peak, 'status': status}
+        results.append(result)
+    return results
+
+def print_results(summary, results):
+    """Print the benchmark results of one corpus as a table"""
+    print_colored(f"📊 {format_size(summary['bytes'])}: {summary['projects']} projects, {summary['chats']} chats, "
+                  f"{summary['messages']} messages", Colors.BLUE)
+    print_colored(f"{'Operation':<22} {'Cold':>9} {'Peak RSS':>10} {'Warm':>9} {'Peak RSS':>10}", Colors.CYAN)
+    print("-" * 64)
+    for result in results:
+        row = f"{result['operation']:<22}"
+        for run in ('cold', 'warm'):
+            measured = result[run]
+            if measured['status'] != 0:
+                row += f" {'failed' if measured['status'] != 'timeout' else 'timeout':>9} {'':>10}"
+            else:
+                row += f" {measured['seconds']:>8.2f}s {format_size(measured['peak_rss']):>10}"
+        print(row)
+    print()
+
+def generator_options(args):
+    """Get the generate_corpus() keyword arguments of the command line"""
+    return {'projects': args.projects, 'chats': args.chats, 'messages': args.messages, 'seed': args.seed,
+            'tool_result_size': parse_size(args.tool_result_size),
+            'tool_result_max': parse_size(args.tool_result_max),
+            'malformed_rate': args.malformed_rate, 'needle_rate': args.needle_rate}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate synthetic Claude chat corpora and benchmark claude-reader.py on them',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s generate /tmp/corpus --size 500MB     # Build a corpus to explore by hand
+  CLAUDE_PROJECTS_DIR=/tmp/corpus/.claude/projects python3 claude-reader.py -l
+  %(prog)s run                                   # Benchmark at 10MB, 100MB and 1GB
+  %(prog)s run --scales 1GB,20GB --workdir /data/bench --keep --json results.json
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    generate = subparsers.add_parser('generate', help='Generate a corpus')
+    generate.add_argument('root', help='Directory to create the corpus in (as ROOT/.claude/projects)')
+    generate.add_argument('--size', metavar='SIZE', help='Add chats until the corpus has SIZE (e.g. 500MB)')
+    run = subparsers.add_parser('run', help='Generate corpora of several sizes and time the reader on them')
+    run.add_argument('--scales', default='10MB,100MB,1GB', help='Comma-separated corpus sizes (default: %(default)s)')
+    run.add_argument('--workdir', help='Where to generate the corpora (default: a temporary directory)')
+    run.add_argument('--keep', action='store_true', help='Keep the corpora; an existing one is reused')
+    run.add_argument('-j', '--jobs', metavar='N', type=int, help='Worker processes for the reader')
+    run.add_argument('--timeout', metavar='SECONDS', type=float, help='Give up on an operation after SECONDS')
+    run.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    page = subparsers.add_parser('page', help='Page through a chat in the viewer without a terminal (timed by run)')
+    page.add_argument('link', help='Deep link of the chat (project/chat)')
+
+    for subparser in (generate, run):
+        subparser.add_argument('--projects', type=int, default=5, help='Number of projects (default: %(default)s)')
+        subparser.add_argument('--chats', type=int, default=20,
+                               help='Chats per project, unless a size is given (default: %(default)s)')
+        subparser.add_argument('--messages', type=int, default=200,
+                               help='Average messages per chat (default: %(default)s)')
+        subparser.add_argument('--tool-result-size', default='2KB',
+                               help='Median size of tool outputs (default: %(default)s)')
+        subparser.add_argument('--tool-result-max', default='4MB',
+                               help='Largest tool output (default: %(default)s)')
+        subparser.add_argument('--malformed-rate', type=float, default=0.001,
+                               help='Share of malformed lines (default: %(default)s)')
+        subparser.add_argument('--needle-rate', type=float, default=0.01,
+                               help=f"Share of messages mentioning '{NEEDLE}' (default: %(default)s)")
+        subparser.add_argument('--seed', type=int, default=0, help='Random seed (default: %(default)s)')
+
+    args = parser.parse_args()
+    if args.command == 'page':
+        page_chat(args.link)
+        return
+    options = generator_options(args)
+
+    if args.command == 'generate':
+        summary = generate_corpus(args.root, size=parse_size(args.size) if args.size else None, **options)
+        print_colored(f"✅ {summary['chats']} chats, {summary['messages']} messages, {format_size(summary['bytes'])} "
+                      f"in {Path(args.root) / '.claude' / 'projects'} ({summary['seconds']}s)", Colors.GREEN)
+        return
+
+    workdir = Path(args.workdir) if args.workdir else None
+    temporary = workdir is None
+    if temporary:
+        import tempfile
+        workdir = Path(tempfile.mkdtemp(prefix='claude-reader-bench-'))
+
+    all_results = []
+    try:
+        for scale in args.scales.split(','):
+            size = parse_size(scale)
+            root = workdir / f"corpus-{scale.strip().upper()}"
+            summary = None
+            if args.keep and (root / 'corpus.json').exists():
+                with open(root / 'corpus.json') as f:
+                    summary = json.load(f)
+                print_colored(f"Reusing the {scale} corpus in {root}", Colors.CYAN)
+            else:
+                print_colored(f"Generating a {scale} corpus in {root}...", Colors.CYAN)
+                summary = generate_corpus(root, size=size, **options)
+
+            try:
+                results = benchmark_corpus(root, args.jobs, args.timeout)
+            except KeyboardInterrupt:
+                print_colored("Interrupted", Colors.YELLOW)
+                break
+            print_results(summary, results)
+            all_results.append({'scale': scale, 'corpus': summary, 'results': results})
+
+            if not args.keep:
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        if temporary and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print_colored(f"Results written to: {args.json}", Colors.GREEN)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""
+Claude JSONL Chat Reader
+Pure Python package to read and convert Claude project JSONL chat files to readable format
+"""
@@ -0,0 +1,93 @@
+"""Compressing old chats to archives"""
+
+import contextlib
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+
+from .common import Colors, find_project_dir, get_claude_projects_dir, print_colored
+from .chatfiles import zstandard
+from .index import get_chat_index
+from .parsed_cache import remove_parsed_cache
+
+def compress_chat(chat_file, archive_file, compression):
+    """Write a compressed copy of a chat file"""
+    with open(chat_file, 'rb') as source, open(archive_file, 'wb') as target:
+        if compression == 'zst':
+            zstandard.ZstdCompressor(level=10).copy_stream(source, target)
+        else:
+            with gzip.GzipFile(chat_file.name, 'wb', 6, target) as gz:
+                shutil.copyfileobj(source, gz, 1024 * 1024)
+
+def archive_chats(days, project=None, compression='gz'):
+    """Compress the chats not modified for `days` days to .jsonl.gz (or .jsonl.zst) archives
+
+    An archive keeps the chat's modification time and replaces it only once it
+    is complete; if moving the index entry or removing the chat fails, the
+    archive is removed again. Its metadata index entry is carried over, so
+    archives are listed and searched without being decompressed again.
+    """
+    if compression == 'zst' and zstandard is None:
+        print_colored("❌ zstd archives need zstandard (pip install zstandard)", Colors.RED)
+        return
+    if project:
+        project_dir = find_project_dir(project)
+        if project_dir is None:
+            print_colored(f"Project not found: {project}", Colors.RED)
+            return
+        project_dirs = [project_dir]
+    else:
+        project_dirs = sorted(d for d in get_claude_projects_dir().iterdir() if d.is_dir())
+    
+    cutoff = time.time() - days * 86400
+    index = get_chat_index()
+    archived = size_before = size_after = 0
+    print_colored(f"🗜️  Archiving chats not modified for {days} day(s) to .jsonl.{compression}", Colors.BLUE)
+    for project_dir in project_dirs:
+        for chat_file in sorted(project_dir.glob('*.jsonl')):
+            archive_file = chat_file.with_name(f"{chat_file.name}.{compression}")
+            tmp_file = chat_file.with_name(f".{archive_file.name}.tmp")
+            replaced = False
+            try:
+                st = chat_file.stat()
+                if st.st_mtime >= cutoff or archive_file.exists():
+                    continue
+                if index is not None:
+                    # Bring the entry up to date with the chat before it moves
+                    chat_info = index.chat_info(chat_file.absolute())
+                    index.message_index(chat_info)
+                
+                compress_chat(chat_file, tmp_file, compression)
+                os.utime(tmp_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+                new_st = chat_file.stat()
+                if (new_st.st_ino, new_st.st_size, new_st.st_mtime_ns) != (st.st_ino, st.st_size, st.st_mtime_ns):
+                    print_colored(f"Skipped (modified while archiving): {chat_file.name}", Colors.YELLOW)
+                    os.unlink(tmp_file)
+                    continue
+                os.replace(tmp_file, archive_file)
+                replaced = True
+                if index is not None:
+                    index.move_chat(chat_file.absolute(), archive_file.absolute())
+                chat_file.unlink()
+            except (OSError, sqlite3.Error) as e:
+                print_colored(f"Failed to archive {chat_file.name}: {e}", Colors.RED)
+                if tmp_file.exists():
+                    os.unlink(tmp_file)
+                if replaced and chat_file.exists():
+                    # Keep the chat, not two copies of it; the index rereads it
+                    with contextlib.suppress(OSError):
+                        archive_file.unlink()
+                continue
+            
+            remove_parsed_cache(chat_file)
+            archived += 1
+            size_before += st.st_size
+            size_after += archive_file.stat().st_size
+    
+    if archived:
+        print_colored(f"✅ {archived} chat(s) archived: {size_before / 1024 / 1024:.1f}MB -> "
+                      f"{size_after / 1024 / 1024:.1f}MB", Colors.GREEN)
+    else:
+        print_colored("No chats to archive", Colors.YELLOW)
@@ -0,0 +1,425 @@
+"""The project listings and the interactive browser"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .common import Colors, clean_project_name, get_cache_dir, get_claude_projects_dir, print_colored
+from .chatfiles import CHAT_SUFFIXES, chat_name
+from .index import ChatIndex, chat_index_disabled, get_chat_infos, index_busy, retry_if_busy, scan_project_chats
+from .export import export_project_chats
+from .search import search_content
+from .viewer import view_chat
+
+def get_project_info(project_dir, chats=None):
+    """Get information about a project (from its already loaded chat metadata if given)"""
+    project_name = clean_project_name(project_dir.name)
+    if chats is None:
+        chats = get_chat_infos(project_dir)
+    file_count = len(chats)
+    total_messages = sum(chat['message_count'] or 0 for chat in chats)
+    mtimes = [chat['mtime'] for chat in chats if chat['mtime']]
+    last_modified = None
+    
+    if mtimes:
+        last_modified = datetime.fromtimestamp(max(mtimes)).strftime('%Y-%m-%d %H:%M')
+    
+    return {
+        'name': project_name,
+        'file_count': file_count,
+        'total_messages': total_messages,
+        'last_modified': last_modified or 'unknown',
+        'sort_timestamp': max(mtimes) if mtimes else 0,
+        'path': project_dir
+    }
+
+def iter_project_infos(claude_dir):
+    """Yield the information of every project directory"""
+    for project_dir in claude_dir.iterdir():
+        if project_dir.is_dir():
+            yield get_project_info(project_dir)
+
+def list_projects(project_infos=None):
+    """List all available projects (the given project infos instead of reading them)"""
+    claude_dir = get_claude_projects_dir()
+    
+    print_colored("📁 Available Claude Projects", Colors.BLUE)
+    print("=" * 60)
+    
+    if project_infos is None:
+        if claude_dir.exists() and any(claude_dir.iterdir()):
+            project_infos = iter_project_infos(claude_dir)
+    if not project_infos:
+        print_colored("No projects found in {}".format(claude_dir), Colors.YELLOW)
+        return []
+    
+    print_colored("Project Name                 Chats  Messages   Last Modified", Colors.CYAN)
+    print("-" * 70)
+    
+    projects = []
+    for info in project_infos:
+        projects.append(info)
+        print(f"{info['name']:<28} {info['file_count']:>5}  {info['total_messages']:>8}   {info['last_modified']}")
+    
+    return projects
+
+def search_projects(search_term):
+    """Search for projects containing search term"""
+    claude_dir = get_claude_projects_dir()
+    
+    print_colored(f"🔍 Searching for projects containing: '{search_term}'", Colors.BLUE)
+    print("=" * 60)
+    
+    found = False
+    for project_dir in claude_dir.iterdir():
+        if project_dir.is_dir():
+            clean_name = clean_project_name(project_dir.name)
+            if search_term.lower() in clean_name.lower() or search_term.lower() in project_dir.name.lower():
+                info = get_project_info(project_dir)
+                print_colored(f"✅ {info['name']}", Colors.GREEN)
+                print(f"   {info['file_count']} chats, {info['total_messages']} messages, modified: {info['last_modified']}")
+                found = True
+    
+    if not found:
+        print_colored(f"No projects found matching '{search_term}'", Colors.YELLOW)
+
+def show_recent_projects(count=10, project_infos=None):
+    """Show most recently modified projects (of the given project infos instead of reading them)"""
+    claude_dir = get_claude_projects_dir()
+    
+    print_colored(f"⏰ {count} Most Recently Modified Projects", Colors.BLUE)
+    print("=" * 60)
+    
+    projects = []
+    for info in project_infos if project_infos is not None else iter_project_infos(claude_dir):
+        if info['last_modified'] != 'unknown':
+            projects.append(info)
+    
+    # Sort by timestamp and show top N
+    projects.sort(key=lambda x: x.get('sort_timestamp', 0), reverse=True)
+    
+    for info in projects[:count]:
+        print_colored(f"📝 {info['name']}", Colors.GREEN)
+        print(f"   {info['file_count']} chats, {info['total_messages']} messages, {info['last_modified']}")
+
+def print_project_menu(project_name, chats):
+    """Print the chat list and options of a project"""
+    print_colored(f"💬 Project: {project_name}", Colors.BLUE)
+    print("=" * 60)
+    print_colored(f"Found {len(chats)} chat file(s):", Colors.CYAN)
+    print()
+    
+    # Show files with numbers and message counts
+    for i, chat in enumerate(chats, 1):
+        filename = chat_name(chat['file'])
+        if chat['size'] is not None and chat['message_count'] is not None:
+            size = chat['size']
+            size_str = f"{size/1024:.1f}KB" if size > 1024 else f"{size}B"
+            modified = datetime.fromtimestamp(chat['mtime']).strftime('%Y-%m-%d')
+            print(f"{i:2d}) {filename:<30} {size_str:>8} {chat['message_count']:>10} msgs {modified}")
+        else:
+            print(f"{i:2d}) {filename:<30} {'error':>8} {'?':>10} msgs {'unknown'}")
+    
+    print()
+    print_colored("Choose an option:", Colors.YELLOW)
+    print(f"  1-{len(chats)}) View specific chat")
+    print("  a) View all chats")
+    print("  e) Export all to markdown")
+    print("  eb) Export all to book format") 
+    print("  ea) Export all to markdown and book format")
+    print("  b) Back to main menu")
+    print("  q) Quit")
+    print()
+
+# Project menu export choices and the formats they write
+PROJECT_EXPORTS = {'e': ['markdown'], 'eb': ['book'], 'ea': ['markdown', 'book']}
+
+def browse_project(project_path, format_type='pretty', output_file=None, model=None):
+    """Browse a specific project (with its chat list from the browser's ProjectModel if given)"""
+    project_dir = Path(project_path)
+    project_name = clean_project_name(project_dir.name)
+    
+    def load_chats():
+        chats = model.chats(project_dir) if model is not None else None
+        return chats if chats is not None else get_chat_infos(project_dir)
+    
+    # Get all jsonl files in the project
+    chats = load_chats()
+    chat_files = [chat['file'] for chat in chats]
+    
+    if not chat_files:
+        print_colored(f"No JSONL chat files found in project: {project_name}", Colors.YELLOW)
+        return
+    
+    print_project_menu(project_name, chats)
+    
+    while True:
+        try:
+            choice = input("Enter choice: ").strip()
+            
+            if choice.lower() in ['q', 'quit']:
+                break
+            elif choice.lower() == 'b':
+                return  # Return to main menu
+            elif choice.lower() == 'a':
+                # View all chats
+                for file_path in chat_files:
+                    print()
+                    print_colored("=" * 60, Colors.CYAN)
+                    view_chat(file_path, format_type)
+                    print()
+                    next_input = input("Press Enter for next chat (or 'q' to stop)...")
+                    if next_input.lower() == 'q':
+                        break
+                break
+            elif choice.lower() in PROJECT_EXPORTS:
+                # Export all chats, rendering every format in one pass over each chat
+                export_project_chats(project_name, chat_files, PROJECT_EXPORTS[choice.lower()])
+                break
+            elif choice.isdigit():
+                choice_num = int(choice)
+                if 1 <= choice_num <= len(chat_files):
+                    view_chat(chat_files[choice_num - 1], format_type, output_file)
+                    print()
+                    input("Press Enter to continue...")
+                    print()
+                    
+                    # Redisplay the project menu
+                    chats = load_chats()
+                    chat_files = [chat['file'] for chat in chats]
+                    print_project_menu(project_name, chats)
+                    
+                    # Continue the loop to return to project menu
+                    continue
+                else:
+                    print_colored(f"Invalid selection. Please choose 1-{len(chat_files)}", Colors.RED)
+            else:
+                print_colored("Invalid choice. Please enter a number, 'a', 'e', 'eb', 'ea', 'b', or 'q'", Colors.RED)
+        
+        except KeyboardInterrupt:
+            print()
+            break
+        except EOFError:
+            break
+
+def project_signature(project_dir):
+    """Get the (name, inode, size, mtime) of every chat file of a project, to notice changes"""
+    signature = []
+    with os.scandir(project_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(CHAT_SUFFIXES):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature.append((entry.name, st.st_ino, st.st_size, st.st_mtime_ns))
+    return tuple(sorted(signature))
+
+class ProjectModel:
+    """The projects and chats of the interactive browser, kept in memory for the session
+
+    After the first load, a background thread re-stats the chat files every
+    `interval` seconds and re-reads only the projects whose files changed, so
+    the menus draw from memory and never wait on a rescan. The thread has its
+    own connection to the metadata index (SQLite connections are per thread);
+    a lock held by one connection makes the other retry or read the files this
+    once, and never turns the index off.
+    """
+    
+    def __init__(self, claude_dir, interval=2.0):
+        self.claude_dir = claude_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.entries = {}  # project dir -> (signature, project info, chat infos)
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Load the projects, then keep them up to date in the background"""
+        self.refresh(get_chat_infos)
+        self.thread = threading.Thread(target=self.run, name='project-model', daemon=True)
+        self.thread.start()
+    
+    def close(self):
+        """Stop the background refresh"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(self.interval)
+    
+    def run(self):
+        """Background thread: refresh the model until it is closed"""
+        index = None
+        if not chat_index_disabled():
+            try:
+                index = ChatIndex(get_cache_dir() / 'index.sqlite3')
+            except (sqlite3.Error, OSError):
+                pass
+        
+        def load_chats(project_dir):
+            nonlocal index
+            if index is not None:
+                try:
+                    return retry_if_busy(index, lambda: index.project_chats(project_dir))
+                except sqlite3.Error as e:
+                    if not index_busy(e):
+                        index.close()
+                        index = None
+            return scan_project_chats(project_dir)
+        
+        try:
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.refresh(load_chats)
+                except OSError:
+                    pass
+        finally:
+            if index is not None:
+                index.close()
+    
+    def refresh(self, load_chats):
+        """Re-read the projects whose chat files changed, with load_chats(project_dir)"""
+        with self.lock:
+            known = self.entries
+        
+        entries = {}
+        for project_dir in self.claude_dir.iterdir():
+            if self.stop_event.is_set():
+                return
+            if not project_dir.is_dir():
+                continue
+            try:
+                signature = project_signature(project_dir)
+            except OSError:
+                continue
+            entry = known.get(project_dir)
+            if entry is None or entry[0] != signature:
+                chats = load_chats(project_dir)
+                entry = (signature, get_project_info(project_dir, chats), chats)
+            entries[project_dir] = entry
+        
+        with self.lock:
+            self.entries = entries
+    
+    def projects(self, with_chats_only=True):
+        """Get the info of all projects, most recently modified first"""
+        with self.lock:
+            infos = [info for _, info, _ in self.entries.values()
+                     if info['file_count'] > 0 or not with_chats_only]
+        infos.sort(key=lambda x: x['last_modified'], reverse=True)
+        return infos
+    
+    def chats(self, project_dir):
+        """Get the chat infos of a project, or None if it is not known"""
+        with self.lock:
+            entry = self.entries.get(Path(project_dir))
+        return entry[2] if entry is not None else None
+
+def print_browser_menu(projects):
+    """Print the project list and options of the interactive browser"""
+    print_colored("🤖 Claude JSONL Chat Browser", Colors.BLUE)
+    print("=" * 60)
+    print()
+    print_colored("Available projects:", Colors.CYAN)
+    print()
+    
+    for i, info in enumerate(projects, 1):
+        # Format with better alignment
+        name_col = f"{i:2d}) {info['name']}"
+        details_col = f"({info['file_count']} chats, {info['total_messages']} msgs, {info['last_modified']})"
+        
+        # Align details to column 50 for better readability
+        if len(name_col) < 48:
+            padding = 48 - len(name_col)
+            print(f"{name_col}{' ' * padding}{details_col}")
+        else:
+            # If name is too long, put details on next line with indentation
+            print(f"{name_col}")
+            print(f"{'':>50}{details_col}")
+    
+    print()
+    print_colored("Options:", Colors.YELLOW)
+    print(f"  1-{len(projects)}) Browse specific project")
+    print("  l) List all projects with details")
+    print("  r) Show recent projects")
+    print("  c) Search chat content")
+    print("  q) Quit")
+    print()
+
+def interactive_browser():
+    """Interactive project browser"""
+    claude_dir = get_claude_projects_dir()
+    
+    if not claude_dir.exists():
+        print_colored("🤖 Claude JSONL Chat Browser", Colors.BLUE)
+        print("=" * 60)
+        print()
+        print_colored(f"❌ Claude projects directory not found: {claude_dir}", Colors.RED)
+        print("Make sure you have Claude Desktop installed and have created projects.")
+        return
+    
+    model = ProjectModel(claude_dir)
+    model.start()
+    try:
+        redraw = True
+        while True:
+            if redraw:
+                # Only projects with JSONL files, most recently modified first
+                projects = model.projects()
+                if not projects:
+                    print_colored(f"No projects with chat files found in {claude_dir}", Colors.YELLOW)
+                    return
+                print_browser_menu(projects)
+                redraw = False
+            
+            try:
+                choice = input("Enter choice: ").strip()
+                
+                if choice.lower() in ['q', 'quit']:
+                    print_colored("👋 Goodbye!", Colors.BLUE)
+                    break
+                elif choice.lower() == 'l':
+                    print()
+                    list_projects(model.projects(with_chats_only=False))
+                    print()
+                    input("Press Enter to continue...")
+                    print()
+                    redraw = True
+                elif choice.lower() == 'r':
+                    print()
+                    show_recent_projects(10, model.projects())
+                    print()
+                    input("Press Enter to continue...")
+                    print()
+                    redraw = True
+                elif choice.lower() == 'c':
+                    search_term = input("Enter search term: ").strip()
+                    if search_term:
+                        print()
+                        search_content(search_term)
+                        print()
+                        input("Press Enter to continue...")
+                    print()
+                    redraw = True
+                elif choice.isdigit():
+                    choice_num = int(choice)
+                    if 1 <= choice_num <= len(projects):
+                        print()
+                        browse_project(projects[choice_num - 1]['path'], model=model)
+                        # After browsing a project, return to main menu
+                        print()
+                        redraw = True
+                    else:
+                        print_colored(f"Invalid selection. Please choose 1-{len(projects)}", Colors.RED)
+                else:
+                    print_colored("Invalid choice. Please enter a number, 'l', 'r', 'c', or 'q'", Colors.RED)
+            
+            except KeyboardInterrupt:
+                print()
+                print_colored("👋 Goodbye!", Colors.BLUE)
+                break
+            except EOFError:
+                break
+    finally:
+        model.close()
@@ -0,0 +1,204 @@
+"""Chat files: listing, names, archives, and scanning their lines"""
+
+import glob
+import gzip
+import io
+from pathlib import Path
+
+try:
+    import zstandard  # Optional, for .jsonl.zst chat archives
+except ImportError:
+    zstandard = None
+
+from .common import json_loads
+
+# Chat files: live .jsonl chats and compressed archives (see archive_chats())
+ARCHIVE_SUFFIXES = ('.jsonl.gz',) + (('.jsonl.zst',) if zstandard is not None else ())
+CHAT_SUFFIXES = ('.jsonl',) + ARCHIVE_SUFFIXES
+
+def list_chat_files(project_dir, prefix=''):
+    """Get the chat files of a project (whose names start with prefix), sorted"""
+    chat_files = []
+    for suffix in CHAT_SUFFIXES:
+        chat_files.extend(Path(project_dir).glob(f'{glob.escape(prefix)}*{suffix}'))
+    return sorted(chat_files)
+
+def chat_name(file_path):
+    """Get the name of a chat: its file name without .jsonl or an archive suffix"""
+    name = Path(file_path).name
+    for suffix in ('.jsonl.gz', '.jsonl.zst', '.jsonl'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(file_path).stem
+
+def is_archive(file_path):
+    """Check whether a chat file is a compressed archive"""
+    return str(file_path).endswith(('.gz', '.zst'))
+
+class ZstdReader(io.RawIOBase):
+    """Raw stream of a zstd-compressed file, seekable by decompressing forward
+
+    Like gzip.GzipFile, a backward seek starts over from the beginning. Wrapped
+    in an io.BufferedReader for line iteration.
+    """
+    
+    def __init__(self, file_path):
+        self.raw = open(file_path, 'rb')
+        self.rewind()
+    
+    def rewind(self):
+        self.raw.seek(0)
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+        self.pending = memoryview(b'')
+        self.position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        while not self.pending:
+            data = self.raw.read(1024 * 1024)
+            if not data:
+                return 0
+            self.pending = memoryview(self.decompressor.decompress(data))
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        self.position += size
+        return size
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('can only seek from the start or the current position')
+        if offset < self.position:
+            self.rewind()
+        buffer = bytearray(1024 * 1024)
+        while self.position < offset:
+            if not self.readinto(memoryview(buffer)[:offset - self.position]):
+                break
+        return self.position
+    
+    def tell(self):
+        return self.position
+    
+    def close(self):
+        self.raw.close()
+        super().close()
+
+def open_chat_file(file_path):
+    """Open a chat file for binary reading, decompressing archives on the fly
+
+    Archives support seek() (by decompressing forward), so byte offsets work the
+    same as in plain chats: they are offsets into the decompressed lines.
+    """
+    name = str(file_path)
+    if name.endswith('.gz'):
+        return gzip.open(file_path, 'rb')
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise OSError(f'Reading {Path(file_path).name} needs zstandard (pip install zstandard)')
+        return io.BufferedReader(ZstdReader(file_path), 1024 * 1024)
+    return open(file_path, 'rb')
+
+def scan_chat_file(file_path, start=0):
+    """Count messages and find the first/last timestamp of a chat file from byte offset `start`
+
+    Returns the offset just past the last complete line, so that a later scan
+    can continue from there once more lines have been appended. A trailing line
+    without a newline (still being written) is counted but flagged as `partial`.
+    """
+    message_count = 0
+    first_timestamp = None
+    last_line = None
+    offset = start
+    partial = 0
+    
+    with open_chat_file(file_path) as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b'\n'):
+                # Unterminated last line: count it, but rescan it next time
+                partial = 1 if line.strip() else 0
+            else:
+                offset += len(line)
+            if not line.strip():
+                continue
+            message_count += 1
+            if b'"timestamp"' in line:
+                if first_timestamp is None:
+                    first_timestamp = extract_timestamp(line)
+                last_line = line
+    
+    last_timestamp = extract_timestamp(last_line) if last_line else None
+    return {
+        'message_count': message_count,
+        'first_timestamp': first_timestamp,
+        'last_timestamp': last_timestamp or first_timestamp,
+        'offset': offset,
+        'partial': partial,
+    }
+
+def extract_timestamp(line):
+    """Get the top-level timestamp of a raw JSONL line"""
+    try:
+        data = json_loads(line)
+        timestamp = data.get('timestamp') if isinstance(data, dict) else None
+        return str(timestamp) if timestamp is not None else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def tool_input_path(tool_input):
+    """Get the file path a tool use works on, or None"""
+    if isinstance(tool_input, dict):
+        for key in ('file_path', 'notebook_path', 'path'):
+            if isinstance(tool_input.get(key), str):
+                return tool_input[key]
+    return None
+
+def extract_search_fields(entry):
+    """Get (text, tool names, file paths, role, timestamp) of a chat entry for the search index"""
+    if not isinstance(entry, dict) or entry.get('type') == 'summary':
+        return None
+    message = entry.get('message')
+    if not isinstance(message, dict):
+        return None
+    
+    role = message.get('role', entry.get('type', 'unknown'))
+    content = message.get('content', '')
+    texts, tools, paths = [], [], []
+    
+    if isinstance(content, str):
+        texts.append(content)
+    elif isinstance(content, list):
+        for item in content:
+            if isinstance(item, str):
+                texts.append(item)
+            elif not isinstance(item, dict):
+                continue
+            elif item.get('type') == 'text':
+                texts.append(item.get('text') or '')
+            elif item.get('type') == 'tool_use':
+                tools.append(str(item.get('name', 'unknown')))
+                path = tool_input_path(item.get('input'))
+                if path is not None:
+                    paths.append(path)
+    
+    tool_result = entry.get('toolUseResult')
+    if isinstance(tool_result, dict):
+        file_info = tool_result.get('file')
+        if isinstance(file_info, dict) and isinstance(file_info.get('filePath'), str):
+            paths.append(file_info['filePath'])
+        elif isinstance(tool_result.get('filePath'), str):
+            paths.append(tool_result['filePath'])
+    
+    text = '\n'.join(t for t in texts if t.strip())
+    if not (text or tools or paths):
+        return None
+    timestamp = entry.get('timestamp')
+    return (text, ' '.join(tools), '\n'.join(dict.fromkeys(paths)), role,
+            str(timestamp) if timestamp is not None else None)
@@ -0,0 +1,147 @@
+"""Command line interface"""
+
+import argparse
+import sys
+
+from .common import Colors, find_project_dir, get_claude_projects_dir, print_colored
+from .index import disable_chat_index
+from .parsed_cache import disable_parsed_cache
+from .render import FORMATTERS
+from .archive import archive_chats
+from .browser import browse_project, interactive_browser, list_projects, search_projects, show_recent_projects
+from .dataset import export_dataset
+from .export import export_chats
+from .search import search_content
+from .stats import show_stats
+from .viewer import open_chat_link
+from .watch import follow_chat, watch_index
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Claude JSONL Chat Reader - Browse and view Claude project chat files',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                           # Interactive project browser
+  %(prog)s -l                        # List all projects
+  %(prog)s -r 5                      # Show 5 most recent projects
+  %(prog)s -s docker                 # Search for projects with 'docker' in name
+  %(prog)s "my-project"              # View specific project chats
+  %(prog)s "my-project" -f book      # View as clean book format
+  %(prog)s "my-project" -f markdown  # View as markdown
+  %(prog)s "my-project" -o chat.md   # Save to markdown file
+  %(prog)s "my-project/<chat>#120"   # Open a chat at message 120
+  %(prog)s "my-project/<chat>#10-20" -f markdown  # Export messages 10-20
+  %(prog)s -c "update checker"       # Search chat content for a phrase
+  %(prog)s -c "update AND checker"   # Messages containing both words
+  %(prog)s -c 'docker -compose role:user from:2025-09-01'  # Search with a query
+  %(prog)s --export-dir out -f book  # Export all projects as books, in parallel
+  %(prog)s --follow                  # Watch the most recent chat as it is written
+  %(prog)s --stats                   # Usage statistics across all projects
+  %(prog)s --archive 90              # Compress chats untouched for 90 days
+  %(prog)s --watch &                 # Keep the indexes warm in the background
+  %(prog)s --dataset chats.sqlite    # Messages and tool calls as tables, for analysis
+        """
+    )
+    
+    parser.add_argument('project', nargs='?', help='Project name to browse, or a project/chat#N link')
+    parser.add_argument('-l', '--list', action='store_true', help='List all projects')
+    parser.add_argument('-s', '--search', metavar='TERM', help='Search for projects containing TERM')
+    parser.add_argument('-r', '--recent', metavar='N', type=int, nargs='?', const=10,
+                       help='Show N most recently modified projects (default: 10)')
+    parser.add_argument('-f', '--format', choices=list(FORMATTERS), 
+                       default='pretty', help='Output format (default: pretty, book=clean markdown without timestamps)')
+    parser.add_argument('-o', '--output', metavar='FILE', help='Save output to file')
+    parser.add_argument('-c', '--content', metavar='QUERY',
+                       help='Search for content within chats: a phrase, or a query of words, "phrases", /regex/, '
+                            'AND/OR/NOT, role:, tool:, project:, from: and to: filters')
+    parser.add_argument('--live', action='store_true',
+                       help='Content search: scan the chat files instead of using the full-text index')
+    parser.add_argument('--limit', metavar='N', type=int, help='Content search: show at most N matches')
+    parser.add_argument('--offset', metavar='N', type=int, default=0,
+                       help='Content search: skip the first N matches (for paging with --limit)')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int,
+                       help='Worker processes for file scans and exports (default: number of CPUs)')
+    parser.add_argument('--export-dir', metavar='DIR',
+                       help='Export every chat of the given project (or of all projects) to DIR/<project>/ '
+                            'in the -f format, using -j worker processes')
+    parser.add_argument('--incremental', action='store_true',
+                       help='With --export-dir: only render new or changed chats and remove the exports '
+                            'of deleted ones (tracked in a manifest in DIR)')
+    parser.add_argument('--follow', action='store_true',
+                       help='Show the end of a chat and stream new messages as they are written (like tail -f); '
+                            'follows the given project/chat link, the latest chat of the given project, '
+                            'or the latest chat overall')
+    parser.add_argument('--stats', action='store_true',
+                       help='Show usage statistics (messages, tool uses, edits, sessions, activity per day) '
+                            'of all projects or of the given project')
+    parser.add_argument('--dataset', metavar='PATH',
+                       help='Export the messages and tool calls of all projects (or of the given project) as tables '
+                            'for analysis: a SQLite database or a Parquet directory; later runs only add what changed')
+    parser.add_argument('--dataset-format', choices=['auto', 'sqlite', 'parquet'], default='auto',
+                       help='Format of --dataset (default: that of an existing PATH, sqlite for a .sqlite/.db '
+                            'PATH, else parquet when pyarrow is installed)')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep the indexes up to date as chats are written (runs until stopped), so that '
+                            'other commands start with a warm index')
+    parser.add_argument('--archive', metavar='DAYS', type=int,
+                       help='Compress the chats (of the given project or of all projects) not modified for '
+                            'DAYS days; archived chats stay readable everywhere')
+    parser.add_argument('--archive-format', choices=['gz', 'zst'], default='gz',
+                       help='Compression of --archive: gz or zst (needs zstandard) (default: gz)')
+    parser.add_argument('--no-index', action='store_true',
+                       help='Read chat files directly instead of using the indexes and caches in ~/.cache/claude-reader')
+    
+    args = parser.parse_args()
+    
+    if args.no_index:
+        disable_chat_index()
+        disable_parsed_cache()
+    
+    claude_dir = get_claude_projects_dir()
+    
+    # Check if Claude directory exists
+    if not claude_dir.exists():
+        print_colored(f"❌ Claude projects directory not found: {claude_dir}", Colors.RED)
+        print("Make sure you have Claude Desktop installed and have created projects.")
+        sys.exit(1)
+    
+    # Handle command line arguments
+    if args.dataset:
+        export_dataset(args.dataset, args.project, jobs=args.jobs, format_type=args.dataset_format)
+    elif args.watch:
+        watch_index()
+    elif args.archive is not None:
+        archive_chats(args.archive, args.project, args.archive_format)
+    elif args.follow:
+        follow_chat(args.project, args.format)
+    elif args.stats:
+        show_stats(args.project, jobs=args.jobs)
+    elif args.export_dir:
+        export_chats(args.export_dir, args.format, args.project, jobs=args.jobs, incremental=args.incremental)
+    elif args.list:
+        list_projects()
+    elif args.search:
+        search_projects(args.search)
+    elif args.content:
+        search_content(args.content, limit=args.limit, offset=args.offset, live=args.live, jobs=args.jobs)
+    elif args.recent is not None:
+        show_recent_projects(args.recent)
+    elif args.project:
+        if '/' in args.project:
+            # Deep link to a chat: project/chat#N
+            open_chat_link(args.project, args.format, args.output)
+            return
+        
+        # Browse specific project - handle both clean and original names
+        project_path = find_project_dir(args.project)
+        
+        if project_path and project_path.exists():
+            browse_project(project_path, args.format, args.output)
+        else:
+            print_colored(f"Project not found: {args.project}", Colors.RED)
+            print("Available projects:")
+            list_projects()
+    else:
+        # Interactive browser
+        interactive_browser()
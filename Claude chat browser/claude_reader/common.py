@@ -0,0 +1,119 @@
+"""Shared helpers: colors, timestamps, and where projects and caches live"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import orjson  # Optional, faster JSON decoding
+except ImportError:
+    orjson = None
+
+# Colors for output
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    PURPLE = '\033[0;35m'
+    NC = '\033[0m'  # No Color
+
+def print_colored(message, color):
+    """Print colored message to terminal"""
+    print(f"{color}{message}{Colors.NC}")
+
+def format_timestamp(ts):
+    """Format timestamp to readable format"""
+    try:
+        if ts is None:
+            return 'No timestamp'
+        if isinstance(ts, str):
+            # Parse ISO format (like 2025-09-20T12:28:46.794Z)
+            try:
+                dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+                return dt.strftime('%Y-%m-%d %H:%M:%S')
+            except:
+                return ts
+        if isinstance(ts, (int, float)):
+            # Handle both seconds and milliseconds timestamps
+            if ts > 1000000000000:  # Milliseconds
+                return datetime.fromtimestamp(ts / 1000).strftime('%Y-%m-%d %H:%M:%S')
+            else:  # Seconds
+                return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        return str(ts)
+    except:
+        return 'Invalid timestamp'
+
+def clean_project_name(name):
+    """Clean project name by removing leading dash and making it readable"""
+    # Remove leading dash if present
+    if name.startswith('-'):
+        name = name[1:]
+    
+    # Replace dashes with spaces for better readability (optional)
+    # You can comment this out if you prefer to keep the original format
+    readable_name = name.replace('-', ' ').title()
+    
+    return readable_name
+
+def get_claude_projects_dir():
+    """Get Claude projects directory path ($CLAUDE_PROJECTS_DIR overrides ~/.claude/projects)"""
+    override = os.environ.get('CLAUDE_PROJECTS_DIR')
+    if override:
+        return Path(override).expanduser()
+    home = Path.home()
+    claude_dir = home / '.claude' / 'projects'
+    return claude_dir
+
+def get_cache_dir():
+    """Get the cache directory used for the reader's indexes"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(cache_home) / 'claude-reader'
+
+def timestamp_ms(ts):
+    """Convert a chat timestamp (ISO string or epoch seconds/ms) to epoch milliseconds, 0 if unknown"""
+    try:
+        if isinstance(ts, str):
+            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp() * 1000)
+        if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+            return int(ts if ts > 1000000000000 else ts * 1000)
+    except (ValueError, OverflowError, OSError):
+        pass
+    return 0
+
+def json_loads(data):
+    """Decode JSON, with orjson when it is installed
+
+    Anything orjson rejects (e.g. NaN) is left to the json module, so both accept
+    the same lines and report errors alike.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+def find_project_dir(name):
+    """Find a project directory by its clean or original name"""
+    for project_dir in get_claude_projects_dir().iterdir():
+        if project_dir.is_dir():
+            clean_name = clean_project_name(project_dir.name)
+            if clean_name.lower() == name.lower() or project_dir.name.lower() == name.lower():
+                return project_dir
+    return None
+
+def parse_link_time(value, end=False):
+    """Parse the ISO date/time of a link time range to epoch milliseconds (UTC, like the display)"""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    ms = int(dt.timestamp() * 1000)
+    if end and 'T' not in value:
+        ms += 24 * 3600 * 1000 - 1  # A date ends at midnight
+    return ms
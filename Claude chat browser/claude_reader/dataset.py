@@ -0,0 +1,340 @@
+"""Dataset export: messages and tool calls as SQLite or Parquet tables"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+try:
+    import pyarrow  # Optional, for Parquet datasets (--dataset)
+    import pyarrow.compute
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from .common import (Colors, clean_project_name, find_project_dir, get_claude_projects_dir, json_loads,
+                     print_colored, timestamp_ms)
+from .chatfiles import chat_name, is_archive, list_chat_files, open_chat_file, tool_input_path
+from .export import load_export_manifest, print_progress, save_export_manifest
+from .parallel import parallel_map
+
+# Dataset export (--dataset): the columns of the messages and tool_calls tables
+DATASET_COLUMNS = {
+    'messages': ('project', 'chat', 'line', 'session', 'uuid', 'parent_uuid', 'role', 'timestamp', 'model',
+                 'text_length', 'tool_calls', 'is_sidechain'),
+    'tool_calls': ('project', 'chat', 'line', 'session', 'message_uuid', 'tool_use_id', 'tool_name',
+                   'file_path', 'timestamp'),
+}
+DATASET_INTEGER_COLUMNS = {'line', 'text_length', 'tool_calls', 'is_sidechain'}
+DATASET_BATCH_SIZE = 10000  # Rows written (and, for SQLite, committed) at a time
+
+def optional_str(value):
+    """str() of a value, keeping None"""
+    return str(value) if value is not None else None
+
+def dataset_rows(entry, project, chat, line):
+    """Get (message row, tool call rows) of a chat entry for the dataset, or None if it is no message"""
+    if not isinstance(entry, dict) or entry.get('type') == 'summary':
+        return None
+    message = entry.get('message')
+    if not isinstance(message, dict):
+        return None
+    
+    session = optional_str(entry.get('sessionId'))
+    uuid = optional_str(entry.get('uuid'))
+    timestamp = optional_str(entry.get('timestamp'))
+    content = message.get('content', '')
+    text_length = 0
+    tool_calls = []
+    if isinstance(content, str):
+        text_length = len(content)
+    elif isinstance(content, list):
+        for item in content:
+            if isinstance(item, str):
+                text_length += len(item)
+            elif not isinstance(item, dict):
+                continue
+            elif item.get('type') == 'text':
+                text_length += len(item.get('text') or '')
+            elif item.get('type') == 'tool_use':
+                tool_calls.append((project, chat, line, session, uuid, optional_str(item.get('id')),
+                                   str(item.get('name', 'unknown')), tool_input_path(item.get('input')), timestamp))
+    
+    row = (project, chat, line, session, uuid, optional_str(entry.get('parentUuid')),
+           str(message.get('role', entry.get('type', 'unknown'))), timestamp, optional_str(message.get('model')),
+           text_length, len(tool_calls), int(bool(entry.get('isSidechain'))))
+    return row, tool_calls
+
+def collect_dataset_rows(task):
+    """Worker: get (message rows, tool call rows, end offset, end line) of the complete lines of a chat from an offset"""
+    chat_file, project, chat, offset, line_num = task
+    messages, tool_calls = [], []
+    try:
+        with open_chat_file(chat_file) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                line_num += 1
+                try:
+                    rows = dataset_rows(json_loads(line), project, chat, line_num)
+                except ValueError:
+                    continue
+                if rows is not None:
+                    messages.append(rows[0])
+                    tool_calls.extend(rows[1])
+    except (OSError, EOFError):
+        pass
+    return messages, tool_calls, offset, line_num
+
+class SQLiteDataset:
+    """--dataset target: a SQLite database with messages and tool_calls tables
+
+    The export state of every chat (identity and the offset/line exported up
+    to) is kept in a dataset_chats table and committed together with its rows.
+    """
+    
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path), timeout=10)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        for table, columns in DATASET_COLUMNS.items():
+            definitions = ', '.join(f"{column} {'INTEGER' if column in DATASET_INTEGER_COLUMNS else 'TEXT'}"
+                                    for column in columns)
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definitions})')
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_chat ON {table} (project, chat, line)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tool_calls_tool ON tool_calls (tool_name)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS dataset_chats (path TEXT PRIMARY KEY, project TEXT, chat TEXT, '
+                          'inode INTEGER, size INTEGER, mtime_ns INTEGER, offset INTEGER, line INTEGER)')
+        self.conn.commit()
+    
+    def load_state(self):
+        """Get {chat path: export state}"""
+        self.conn.row_factory = sqlite3.Row
+        state = {row['path']: dict(row) for row in self.conn.execute('SELECT * FROM dataset_chats')}
+        self.conn.row_factory = None
+        return state
+    
+    def remove(self, states):
+        """Drop the rows and the state of chats that were deleted or must be exported again"""
+        with self.conn:
+            for state in states:
+                for table in DATASET_COLUMNS:
+                    self.conn.execute(f'DELETE FROM {table} WHERE project = ? AND chat = ?',
+                                      (state['project'], state['chat']))
+                self.conn.execute('DELETE FROM dataset_chats WHERE path = ?', (state['path'],))
+    
+    def write(self, table, rows):
+        placeholders = ', '.join('?' * len(DATASET_COLUMNS[table]))
+        self.conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+    
+    def checkpoint(self, states):
+        """Make the rows written so far durable, with the state of the chats they belong to"""
+        self.conn.executemany('INSERT OR REPLACE INTO dataset_chats VALUES '
+                              '(:path, :project, :chat, :inode, :size, :mtime_ns, :offset, :line)', states)
+        self.conn.commit()
+    
+    def close(self, complete=True):
+        """Close the database; rows written after the last checkpoint are rolled back"""
+        self.conn.close()
+
+class ParquetDataset:
+    """--dataset target: a directory of Parquet files, messages/part-N.parquet and tool_calls/part-N.parquet
+
+    Every run writes its new rows to new part files, in row groups of
+    DATASET_BATCH_SIZE rows; chats that must be exported again are filtered
+    out of the earlier parts. The export state is kept in a manifest.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.manifest = load_export_manifest(self.path)
+        self.part = self.manifest.setdefault('parts', 0) + 1
+        self.writers = {}
+        self.buffers = {table: [] for table in DATASET_COLUMNS}
+        self.schemas = {table: pyarrow.schema([(column, self.column_type(column)) for column in columns])
+                        for table, columns in DATASET_COLUMNS.items()}
+        for table in DATASET_COLUMNS:
+            (self.path / table).mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def column_type(column):
+        if column == 'timestamp':
+            return pyarrow.timestamp('ms', tz='UTC')
+        if column == 'is_sidechain':
+            return pyarrow.bool_()
+        return pyarrow.int64() if column in DATASET_INTEGER_COLUMNS else pyarrow.string()
+    
+    def load_state(self):
+        """Get {chat path: export state}"""
+        return dict(self.manifest['chats'])
+    
+    def remove(self, states):
+        """Filter the rows of chats that were deleted or must be exported again out of the part files"""
+        if not states:
+            return
+        keys = pyarrow.array(sorted({f"{state['project']}/{state['chat']}" for state in states}))
+        for table in DATASET_COLUMNS:
+            for part in sorted((self.path / table).glob('part-*.parquet')):
+                rows = pyarrow.parquet.read_table(str(part))
+                chats = pyarrow.compute.binary_join_element_wise(rows['project'], rows['chat'], '/')
+                removed = pyarrow.compute.is_in(chats, value_set=keys)
+                if not pyarrow.compute.any(removed).as_py():
+                    continue
+                rows = rows.filter(pyarrow.compute.invert(removed))
+                if rows.num_rows:
+                    tmp_part = part.with_name(f'.{part.name}.tmp')
+                    pyarrow.parquet.write_table(rows, str(tmp_part), compression='zstd')
+                    os.replace(tmp_part, part)
+                else:
+                    part.unlink()
+        for state in states:
+            self.manifest['chats'].pop(state['path'], None)
+        save_export_manifest(self.path, self.manifest)
+    
+    def write(self, table, rows):
+        buffer = self.buffers[table]
+        buffer.extend(rows)
+        if len(buffer) >= DATASET_BATCH_SIZE:
+            self.flush(table)
+    
+    def flush(self, table):
+        """Write the buffered rows of a table as one row group"""
+        buffer = self.buffers[table]
+        if not buffer:
+            return
+        columns = dict(zip(DATASET_COLUMNS[table], (list(values) for values in zip(*buffer))))
+        columns['timestamp'] = [timestamp_ms(ts) or None for ts in columns['timestamp']]
+        if 'is_sidechain' in columns:
+            columns['is_sidechain'] = [bool(value) for value in columns['is_sidechain']]
+        if table not in self.writers:
+            tmp_part = self.path / table / f'.part-{self.part:05d}.parquet.tmp'
+            self.writers[table] = pyarrow.parquet.ParquetWriter(str(tmp_part), self.schemas[table], compression='zstd')
+        self.writers[table].write_table(pyarrow.Table.from_pydict(columns, schema=self.schemas[table]))
+        buffer.clear()
+    
+    def checkpoint(self, states):
+        """Record the state of exported chats (made durable by close())"""
+        for state in states:
+            self.manifest['chats'][state['path']] = state
+    
+    def close(self, complete=True):
+        """Finish this run's part files and save the manifest
+
+        An incomplete (interrupted) run drops its part files instead: the manifest
+        would only cover the chats checkpointed so far, so the next run would
+        export the rest of their rows again.
+        """
+        if not complete:
+            for table, writer in self.writers.items():
+                writer.close()
+                (self.path / table / f'.part-{self.part:05d}.parquet.tmp').unlink()
+            return
+        for table in DATASET_COLUMNS:
+            self.flush(table)
+        for table, writer in self.writers.items():
+            writer.close()
+            name = f'part-{self.part:05d}.parquet'
+            os.replace(self.path / table / f'.{name}.tmp', self.path / table / name)
+        if self.writers:
+            self.manifest['parts'] = self.part
+        save_export_manifest(self.path, self.manifest)
+
+def export_dataset(path, project=None, jobs=None, format_type='auto'):
+    """Export all chats (or one project's) as message and tool call tables, incrementally
+
+    A chat that only grew since the last run has just its new lines added; a
+    replaced, truncated or deleted chat has its rows removed (and is exported
+    again if it still exists). Chats are parsed by a process pool and the rows
+    written in batches.
+    """
+    path = Path(path)
+    if format_type == 'auto':
+        if path.exists():
+            format_type = 'parquet' if path.is_dir() else 'sqlite'
+        elif path.suffix in ('.sqlite', '.sqlite3', '.db') or pyarrow is None:
+            format_type = 'sqlite'
+        else:
+            format_type = 'parquet'
+    if format_type == 'parquet' and pyarrow is None:
+        print_colored("❌ Parquet datasets need pyarrow (pip install pyarrow); use --dataset-format sqlite", Colors.RED)
+        return
+    
+    if project:
+        project_dir = find_project_dir(project)
+        if project_dir is None:
+            print_colored(f"Project not found: {project}", Colors.RED)
+            return
+        project_dirs = [project_dir]
+    else:
+        project_dirs = sorted(d for d in get_claude_projects_dir().iterdir() if d.is_dir())
+    
+    dataset = ParquetDataset(path) if format_type == 'parquet' else SQLiteDataset(path)
+    complete = False
+    try:
+        known = dataset.load_state()
+        tasks, states, removed = [], [], []
+        unchanged = 0
+        seen = set()
+        for project_dir in project_dirs:
+            project_name = clean_project_name(project_dir.name)
+            for chat_file in list_chat_files(project_dir):
+                key = str(chat_file.absolute())
+                seen.add(key)
+                try:
+                    st = chat_file.stat()
+                except OSError:
+                    continue
+                state = known.get(key)
+                if state is not None and (state['inode'], state['size'], state['mtime_ns']) == \
+                        (st.st_ino, st.st_size, st.st_mtime_ns):
+                    unchanged += 1
+                    continue
+                if state is not None and state['inode'] == st.st_ino and st.st_size >= state['size'] \
+                        and not is_archive(chat_file):
+                    # Appended to: export the new lines only
+                    start, line = state['offset'], state['line']
+                else:
+                    if state is not None:
+                        removed.append(state)
+                    start, line = 0, 0
+                tasks.append((chat_file, project_name, chat_name(chat_file), start, line))
+                states.append({'path': key, 'project': project_name, 'chat': chat_name(chat_file),
+                               'inode': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+        
+        # Chats deleted at the source
+        in_scope = {str(d.absolute()) for d in project_dirs}
+        removed.extend(state for key, state in known.items()
+                       if key not in seen and (str(Path(key).parent) in in_scope or not Path(key).exists()))
+        dataset.remove(removed)
+        
+        print_colored(f"📊 Exporting {len(tasks)} new or changed chat(s) to the {format_type} dataset: {path}",
+                      Colors.BLUE)
+        counts = {'messages': 0, 'tool_calls': 0}
+        pending = []
+        pending_rows = 0
+        results = parallel_map(collect_dataset_rows, tasks, jobs)
+        for done, (state, (messages, tool_calls, offset, line)) in enumerate(zip(states, results), 1):
+            dataset.write('messages', messages)
+            dataset.write('tool_calls', tool_calls)
+            counts['messages'] += len(messages)
+            counts['tool_calls'] += len(tool_calls)
+            state.update(offset=offset, line=line)
+            pending.append(state)
+            pending_rows += len(messages) + len(tool_calls)
+            if pending_rows >= DATASET_BATCH_SIZE:
+                dataset.checkpoint(pending)
+                pending, pending_rows = [], 0
+            if sys.stdout.isatty():
+                print_progress(done, len(tasks))
+        dataset.checkpoint(pending)
+        complete = True
+        if tasks and sys.stdout.isatty():
+            print()
+    finally:
+        dataset.close(complete)
+    
+    print_colored(f"✅ {counts['messages']} message(s) and {counts['tool_calls']} tool call(s) added", Colors.GREEN)
+    print_colored(f"   {unchanged} unchanged chat(s) skipped, {len(removed)} replaced or deleted chat(s) removed",
+                  Colors.CYAN)
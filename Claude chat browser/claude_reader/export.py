@@ -0,0 +1,353 @@
+"""Rendering chats to files: single chats, bulk and incremental exports"""
+
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from .common import Colors, clean_project_name, find_project_dir, get_claude_projects_dir, print_colored
+from .chatfiles import chat_name, list_chat_files
+from .index import get_message_index
+from .parsed_cache import open_parsed_cache, write_parsed_cache
+from .parallel import parallel_map, scan_cancelled
+from .render import FORMATTERS, FormatterSink, iter_chat_entries, iter_chat_messages, render_messages
+
+def open_chat_entries(file_path, start=0, start_line=1, warnings=None):
+    """Get an iterator over the (offset, entry) pairs of a chat file, or None if it has none
+
+    Reports a missing file or a chat without valid entries. Warnings about invalid
+    lines are added to the warnings list, if given (see iter_chat_entries).
+    """
+    if not Path(file_path).exists():
+        print_colored(f"❌ File not found: {file_path}", Colors.RED)
+        return None
+    
+    entries = iter_chat_entries(file_path, with_offsets=True, start=start, start_line=start_line,
+                                warnings=warnings)
+    first = next(entries, None)
+    if first is None:
+        print_colored('No valid messages found', Colors.YELLOW)
+        return None
+    return itertools.chain([first], entries)
+
+def open_chat_messages(file_path, first=None, last=None, entries=False):
+    """Get an iterator over the displayable messages numbered first..last of a chat, or None
+
+    Unless the messages must carry their JSON entries, a valid parsed-chat cache
+    is read instead of the chat; reading the whole chat refreshes the cache, and
+    reading it whole from the cache repeats the warnings the chat gave.
+    With the metadata index, reading starts right at message `first` instead of
+    parsing every message before it.
+    """
+    if not entries:
+        parsed = open_parsed_cache(file_path)
+        if parsed is not None:
+            return iter_parsed_chat(parsed, first, last)
+    
+    start, start_line, msg_count = 0, 1, 0
+    if first and first > 1 and Path(file_path).exists():
+        message_index = get_message_index(file_path)
+        if message_index is not None and first <= len(message_index):
+            start = message_index.offsets[first - 1]
+            start_line = message_index.lines[first - 1]
+            msg_count = first - 1
+    
+    warnings = []
+    chat_entries = open_chat_entries(file_path, start, start_line, warnings)
+    if chat_entries is None:
+        return None
+    
+    messages = iter_chat_messages(chat_entries, msg_count, keep_entries=entries)
+    if not first and not last:
+        return write_parsed_cache(messages, file_path, warnings)
+    if first:
+        messages = itertools.dropwhile(lambda message: message.number < first, messages)
+    if last:
+        messages = itertools.takewhile(lambda message: message.number <= last, messages)
+    return messages
+
+def iter_parsed_chat(parsed, first=None, last=None):
+    """Yield the messages of a parsed-chat cache, closing it afterwards
+
+    The whole chat comes with the warnings parsing it gave, as if it was parsed.
+    """
+    try:
+        if not first and not last:
+            for warning in parsed.warnings:
+                print(warning, file=sys.stderr)
+        yield from parsed.iter_messages(first, last)
+    finally:
+        parsed.close()
+
+def render_chat(file_path, outputs, first=None, last=None, quiet=False):
+    """Parse a chat once and write it in several formats
+
+    outputs is a list of (format, output file) pairs; no file or '-' writes to
+    stdout. Files are written to a temporary name and renamed into place when
+    complete. Returns whether the chat had anything to render.
+    """
+    entries = any(FORMATTERS[format_type].needs_entries for format_type, output_file in outputs)
+    messages = open_chat_messages(file_path, first, last, entries=entries)
+    if messages is None:
+        return False
+    
+    tmp_files = []
+    try:
+        with contextlib.ExitStack() as stack:
+            sinks = []
+            for format_type, output_file in outputs:
+                if output_file and output_file != '-':
+                    tmp_file = f'{output_file}.{os.getpid()}.tmp'
+                    tmp_files.append((tmp_file, output_file))
+                    stream = stack.enter_context(open(tmp_file, 'w', encoding='utf-8'))
+                else:
+                    stream = sys.stdout
+                sinks.append(FormatterSink(format_type, stream))
+            render_messages(messages, sinks)
+        
+        for tmp_file, output_file in tmp_files:
+            os.replace(tmp_file, output_file)
+    finally:
+        # Leftovers of a failed or interrupted export
+        for tmp_file, output_file in tmp_files:
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+    
+    if not quiet:
+        for format_type, output_file in outputs:
+            if output_file and output_file != '-':
+                print_colored(f'Chat exported to: {output_file}', Colors.GREEN)
+            else:
+                print()
+    return True
+
+def export_chat(task):
+    """Worker: quietly export one chat to (format, file) outputs
+
+    Returns (chat file, number of files written, number of warnings, error message or None).
+    """
+    file_path, outputs = task
+    if scan_cancelled():
+        return file_path, 0, 0, 'cancelled'
+    
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            written = render_chat(file_path, outputs, quiet=True)
+    except (OSError, UnicodeError, ValueError) as e:
+        return file_path, 0, 0, f'{file_path.name}: {e}'
+    warnings = sum(1 for line in log.getvalue().splitlines() if line.startswith('Warning:'))
+    return file_path, (len(outputs) if written else 0), warnings, None
+
+def print_progress(done, total, width=30):
+    """Draw an aggregate progress bar on the current terminal line"""
+    filled = width * done // total if total else width
+    bar = '█' * filled + '░' * (width - filled)
+    print(f"\r   [{bar}] {done}/{total} chats", end='', flush=True)
+
+def run_export(tasks, jobs=None):
+    """Export chats in worker processes, largest first, with a progress bar
+
+    tasks are (chat file, [(format, output file)]) pairs. Returns a summary with
+    the number of files written and warnings, the errors and the failed chats.
+    """
+    def chat_size(task):
+        try:
+            return task[0].stat().st_size
+        except OSError:
+            return 0
+    
+    # Largest chats first keeps all workers busy until the end
+    tasks = sorted(tasks, key=chat_size, reverse=True)
+    show_progress = sys.stdout.isatty() and tasks
+    summary = {'files': 0, 'warnings': 0, 'errors': [], 'failed': set()}
+    
+    results = parallel_map(export_chat, tasks, jobs, ordered=False)
+    try:
+        for done, (file_path, written, warnings, error) in enumerate(results, 1):
+            summary['files'] += written
+            summary['warnings'] += warnings
+            if error:
+                summary['errors'].append(error)
+                summary['failed'].add(file_path)
+            if show_progress:
+                print_progress(done, len(tasks))
+    finally:
+        results.close()
+        if show_progress:
+            print()
+    
+    return summary
+
+def print_export_summary(summary):
+    """Report the warnings and errors of a bulk export"""
+    if summary['warnings']:
+        print_colored(f"⚠️  {summary['warnings']} invalid line(s) skipped", Colors.YELLOW)
+    for error in summary['errors']:
+        print_colored(f"❌ {error}", Colors.RED)
+
+EXPORT_MANIFEST = '.claude-reader-export.json'
+
+def load_export_manifest(export_dir):
+    """Load the manifest of an incremental export directory (empty if there is none)"""
+    try:
+        with open(Path(export_dir) / EXPORT_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == 1:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': 1, 'chats': {}}
+
+def save_export_manifest(export_dir, manifest):
+    """Write the manifest of an incremental export directory atomically"""
+    path = Path(export_dir) / EXPORT_MANIFEST
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+def file_sha256(path):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, 1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def remove_export_file(export_dir, relative_path):
+    """Delete an exported file, and its project directory once it is empty"""
+    path = Path(export_dir) / relative_path
+    try:
+        path.unlink()
+        path.parent.rmdir()
+    except OSError:
+        pass
+
+def export_chats(export_dir, format_type, project=None, jobs=None, incremental=False):
+    """Export all chats of one project (or of all projects) to export_dir/<project>/<chat>
+
+    With incremental, a manifest in export_dir records the identity and content
+    hash of every exported chat: only new or changed chats are rendered, and the
+    exports of chats deleted at the source are removed.
+    """
+    claude_dir = get_claude_projects_dir()
+    if project:
+        project_dir = find_project_dir(project)
+        if project_dir is None:
+            print_colored(f"Project not found: {project}", Colors.RED)
+            return
+        project_dirs = [project_dir]
+    else:
+        project_dirs = sorted(d for d in claude_dir.iterdir() if d.is_dir())
+    
+    manifest = load_export_manifest(export_dir) if incremental else None
+    extension = FORMATTERS[format_type].extension
+    tasks = []
+    pending = {}  # Manifest entries of the chats being rendered
+    seen = set()
+    unchanged = 0
+    target_dirs = []
+    
+    for project_dir in project_dirs:
+        target_dir = Path(export_dir) / clean_project_name(project_dir.name)
+        target_dirs.append(target_dir)
+        for chat_file in list_chat_files(project_dir):
+            output_file = target_dir / f"{chat_name(chat_file)}{extension}"
+            if manifest is not None:
+                key = str(chat_file.absolute())
+                seen.add(key)
+                try:
+                    st = chat_file.stat()
+                    identity = {'inode': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+                    entry = manifest['chats'].get(key)
+                    if (entry and entry['format'] == format_type and
+                            (entry['output'] is None or (Path(export_dir) / entry['output']).exists())):
+                        if all(entry[field] == value for field, value in identity.items()):
+                            unchanged += 1
+                            continue
+                        digest = file_sha256(chat_file)
+                        if digest == entry['sha256']:
+                            # Touched or copied, but the same content
+                            entry.update(identity)
+                            unchanged += 1
+                            continue
+                    else:
+                        digest = file_sha256(chat_file)
+                except OSError:
+                    continue
+                
+                relative_output = str(output_file.relative_to(export_dir))
+                if entry and entry['output'] and entry['output'] != relative_output:
+                    # Exported in another format before
+                    remove_export_file(export_dir, entry['output'])
+                pending[key] = dict(identity, sha256=digest, format=format_type, output=relative_output)
+            tasks.append((chat_file, [(format_type, str(output_file))]))
+    
+    removed = 0
+    if manifest is not None:
+        # Forget (and delete the exports of) chats that no longer exist at the source
+        in_scope = {str(d.absolute()) for d in project_dirs}
+        for key in [key for key in manifest['chats'] if key not in seen]:
+            if str(Path(key).parent) in in_scope or not Path(key).exists():
+                entry = manifest['chats'].pop(key)
+                if entry['output']:
+                    remove_export_file(export_dir, entry['output'])
+                removed += 1
+    
+    # Created only now: removing old exports deletes directories that became empty
+    for target_dir in target_dirs:
+        target_dir.mkdir(parents=True, exist_ok=True)
+    
+    print_colored(f"📤 Exporting {len(tasks)} chat(s) from {len(project_dirs)} project(s) "
+                  f"to {format_type} in: {export_dir}", Colors.BLUE)
+    summary = run_export(tasks, jobs)
+    print_colored(f"✅ {summary['files']} file(s) exported to: {export_dir}/", Colors.GREEN)
+    
+    if manifest is not None:
+        for key, entry in pending.items():
+            if Path(key) in summary['failed']:
+                continue
+            if not (Path(export_dir) / entry['output']).exists():
+                entry['output'] = None  # Nothing to export
+            manifest['chats'][key] = entry
+        save_export_manifest(export_dir, manifest)
+        print_colored(f"   {unchanged} unchanged chat(s) skipped, {removed} deleted chat(s) removed", Colors.CYAN)
+    print_export_summary(summary)
+
+# Per format: icon, label and directory name of a project export
+EXPORT_STYLES = {
+    'markdown': ('📤', 'markdown', '{project}_export_{stamp}'),
+    'book': ('📚', 'book format', '{project}_book_export_{stamp}'),
+}
+
+def export_project_chats(project_name, chat_files, formats, jobs=None):
+    """Export all chats of a project to one directory per format, reading each chat once"""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    export_dirs = {}
+    for format_type in formats:
+        icon, label, dir_pattern = EXPORT_STYLES[format_type]
+        export_dir = dir_pattern.format(project=project_name, stamp=stamp)
+        os.makedirs(export_dir, exist_ok=True)
+        export_dirs[format_type] = export_dir
+        print_colored(f"{icon} Exporting all chats to {label} in: {export_dir}", Colors.BLUE)
+    
+    tasks = [(file_path, [(format_type, os.path.join(export_dir, f"{chat_name(file_path)}{FORMATTERS[format_type].extension}"))
+                          for format_type, export_dir in export_dirs.items()])
+             for file_path in chat_files]
+    summary = run_export(tasks, jobs)
+    
+    for format_type, export_dir in export_dirs.items():
+        exported = os.listdir(export_dir)
+        size = sum(os.path.getsize(os.path.join(export_dir, file)) for file in exported)
+        print_colored(f"✅ {len(exported)} chat(s) exported to {EXPORT_STYLES[format_type][1]}: "
+                      f"{export_dir}/ ({size/1024:.1f}KB)", Colors.GREEN)
+    print_export_summary(summary)
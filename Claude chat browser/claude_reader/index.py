@@ -0,0 +1,471 @@
+"""The persistent metadata, message offset and full-text index of chats (SQLite)"""
+
+import json
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from .common import get_cache_dir, json_loads, timestamp_ms
+from .chatfiles import extract_search_fields, is_archive, list_chat_files, open_chat_file, scan_chat_file
+from .parsed_cache import remove_parsed_cache
+
+class MessageIndex:
+    """Byte offset, line number, role and timestamp of every message of a chat
+
+    Message N, as numbered by the viewer and the exports, is entry N - 1 of the
+    arrays. The index covers the complete lines before `offset`, so it can be
+    extended as the chat grows; the metadata index stores it as blobs.
+    """
+    
+    ROLES = ('user', 'assistant', 'system')  # Role codes; any other role is len(ROLES)
+    FIELDS = (('offsets', 'q'), ('lines', 'l'), ('roles', 'B'), ('timestamps', 'q'))
+    
+    def __init__(self, row=None):
+        for name, typecode in self.FIELDS:
+            setattr(self, name, array(typecode))
+        self.offset = 0  # Bytes of complete lines indexed
+        self.line = 0  # Lines indexed
+        if row is not None:
+            self.offset, self.line = row['offset'], row['line']
+            for name, typecode in self.FIELDS:
+                getattr(self, name).frombytes(row[name])
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def to_row(self, chat_id):
+        """Get the database row of the index"""
+        row = {name: getattr(self, name).tobytes() for name, typecode in self.FIELDS}
+        row.update(chat_id=chat_id, offset=self.offset, line=self.line)
+        return row
+    
+    def add(self, offset, line_num, entry):
+        """Index one parsed line if it is a numbered message (like iter_chat_messages)"""
+        if not isinstance(entry, dict) or not entry or entry.get('type') == 'summary':
+            return
+        message = entry.get('message')
+        if not message:
+            return
+        role = message.get('role', entry.get('type')) if isinstance(message, dict) else None
+        self.offsets.append(offset)
+        self.lines.append(line_num)
+        self.roles.append(self.ROLES.index(role) if role in self.ROLES else len(self.ROLES))
+        self.timestamps.append(timestamp_ms(entry.get('timestamp')))
+    
+    def extend(self, file_path, end=None, count=None, include_partial=False):
+        """Index the lines after `offset`, up to byte `end` or until `count` messages are known
+
+        Returns False once the end of the file was reached. With include_partial, a
+        trailing line without a newline is indexed too, but left out of `offset`.
+        """
+        with open_chat_file(file_path) as f:
+            f.seek(self.offset)
+            for line in f:
+                if (end is not None and self.offset >= end) or (count is not None and len(self) >= count):
+                    return True
+                if not line.endswith(b'\n'):
+                    if include_partial:
+                        try:
+                            self.add(self.offset, self.line + 1, json_loads(line))
+                        except ValueError:
+                            pass
+                    break
+                
+                offset = self.offset
+                self.offset += len(line)
+                self.line += 1
+                try:
+                    entry = json_loads(line)
+                except ValueError:
+                    continue
+                self.add(offset, self.line, entry)
+        return False
+    
+    def number_at_line(self, line_num):
+        """Get the number of the message on (or last before) a line, 0 if none"""
+        return bisect_right(self.lines, line_num)
+    
+    def numbers_between(self, start_ms=None, end_ms=None):
+        """Get the first and last message numbers with a timestamp in [start_ms, end_ms]"""
+        first = last = None
+        for i, ts in enumerate(self.timestamps):
+            if ts and (start_ms is None or ts >= start_ms) and (end_ms is None or ts <= end_ms):
+                if first is None:
+                    first = i + 1
+                last = i + 1
+        return first, last
+
+class ChatIndex:
+    """On-disk SQLite index of per-chat metadata, validated by (inode, size, mtime)
+
+    Warm listings only stat() the chat files; a file is re-read only when its
+    identity changed since it was indexed. Chat files only grow while a session
+    is active, so a grown file is refreshed by parsing just the appended tail.
+
+    When SQLite has FTS5, the index also holds a full-text index of message
+    text, tool names and file paths. Its rowid is (chat id << 32 | line number),
+    so the rows of one chat can be dropped with a rowid range.
+    
+    Each chat can also have a MessageIndex (see message_index()), which lets the
+    viewer and the exports seek straight to a message, and cached usage
+    statistics (see chat_stats()), which are extended like the message index.
+    """
+    
+    VERSION = 5
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS chats (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            project TEXT NOT NULL,
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            message_count INTEGER NOT NULL,
+            first_timestamp TEXT,
+            last_timestamp TEXT,
+            offset INTEGER NOT NULL,
+            partial INTEGER NOT NULL,
+            fts_offset INTEGER NOT NULL DEFAULT 0,
+            fts_line INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_chats_project ON chats (project);
+        CREATE TABLE IF NOT EXISTS message_index (
+            chat_id INTEGER PRIMARY KEY,
+            offset INTEGER NOT NULL,
+            line INTEGER NOT NULL,
+            offsets BLOB NOT NULL,
+            lines BLOB NOT NULL,
+            roles BLOB NOT NULL,
+            timestamps BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS chat_stats (
+            chat_id INTEGER PRIMARY KEY,
+            offset INTEGER NOT NULL,
+            stats TEXT NOT NULL
+        );
+    """
+    
+    FTS_COLUMNS = 'text, tools, paths, role UNINDEXED, timestamp UNINDEXED'
+    
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.VERSION:
+            # Cache only: drop whatever an older version left behind (virtual tables first)
+            tables = self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+                "ORDER BY sql NOT LIKE 'CREATE VIRTUAL%'").fetchall()
+            for (table,) in tables:
+                self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.conn.execute(f'PRAGMA user_version = {self.VERSION}')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(self.SCHEMA)
+        self.fts_tokenizer = self.create_fts_table()
+    
+    def create_fts_table(self):
+        """Create the full-text table, returning its tokenizer (None without FTS5)"""
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'").fetchone()
+        if row is not None:
+            return 'trigram' if 'trigram' in row[0] else 'unicode61'
+        
+        # The trigram tokenizer (SQLite 3.34+) keeps the substring semantics of the plain scan
+        for tokenizer in ('trigram', 'unicode61 remove_diacritics 2'):
+            try:
+                self.conn.execute(
+                    f"CREATE VIRTUAL TABLE messages_fts USING fts5({self.FTS_COLUMNS}, tokenize='{tokenizer}')")
+                return tokenizer.split()[0]
+            except sqlite3.OperationalError:
+                continue
+        return None
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+    
+    def refresh_chat(self, chat_file, st, row=None):
+        """Bring the index entry of one chat up to date with its stat() result"""
+        if row is not None and (row['inode'], row['size'], row['mtime_ns']) == (st.st_ino, st.st_size, st.st_mtime_ns):
+            return dict(row)
+        
+        if (row is not None and row['inode'] == st.st_ino and st.st_size >= row['size']
+                and not is_archive(chat_file)):
+            # Same file, appended to: only parse the new tail
+            tail = scan_chat_file(chat_file, start=row['offset'])
+            info = dict(row)
+            info.update(
+                message_count=row['message_count'] - row['partial'] + tail['message_count'],
+                first_timestamp=row['first_timestamp'] or tail['first_timestamp'],
+                last_timestamp=tail['last_timestamp'] or row['last_timestamp'],
+                offset=tail['offset'],
+                partial=tail['partial'],
+            )
+        else:
+            # New, replaced or truncated file: full rescan
+            info = scan_chat_file(chat_file)
+            info.update(fts_offset=0, fts_line=0)
+            if row is not None:
+                self.delete_chat_rows(row['id'])
+        
+        info.update(path=str(chat_file), project=chat_file.parent.name, inode=st.st_ino,
+                    size=st.st_size, mtime_ns=st.st_mtime_ns)
+        self.conn.execute(
+            'INSERT INTO chats (path, project, inode, size, mtime_ns, message_count, first_timestamp, '
+            'last_timestamp, offset, partial, fts_offset, fts_line) VALUES (:path, :project, :inode, :size, '
+            ':mtime_ns, :message_count, :first_timestamp, :last_timestamp, :offset, :partial, :fts_offset, '
+            ':fts_line) ON CONFLICT (path) DO UPDATE SET project = excluded.project, inode = excluded.inode, '
+            'size = excluded.size, mtime_ns = excluded.mtime_ns, message_count = excluded.message_count, '
+            'first_timestamp = excluded.first_timestamp, last_timestamp = excluded.last_timestamp, '
+            'offset = excluded.offset, partial = excluded.partial, fts_offset = excluded.fts_offset, '
+            'fts_line = excluded.fts_line', info)
+        return dict(self.conn.execute('SELECT * FROM chats WHERE path = ?', (info['path'],)).fetchone())
+    
+    def project_chats(self, project_dir):
+        """Get metadata of all chats in a project, refreshing stale entries"""
+        project = project_dir.name
+        indexed = {row['path']: row for row in self.conn.execute(
+            'SELECT * FROM chats WHERE project = ?', (project,))}
+        
+        chats = []
+        with self.conn:
+            for chat_file in list_chat_files(project_dir):
+                try:
+                    st = chat_file.stat()
+                    info = self.refresh_chat(chat_file, st, indexed.pop(str(chat_file), None))
+                except OSError:
+                    continue
+                
+                info['file'] = chat_file
+                info['mtime'] = info['mtime_ns'] / 1e9
+                chats.append(info)
+            
+            # Forget chats that were deleted
+            for row in indexed.values():
+                self.delete_chat_rows(row['id'])
+            self.conn.executemany('DELETE FROM chats WHERE path = ?', [(path,) for path in indexed])
+        for path in indexed:
+            remove_parsed_cache(path)
+        
+        return chats
+    
+    def chat_info(self, chat_file):
+        """Get the up-to-date metadata of one chat"""
+        row = self.conn.execute('SELECT * FROM chats WHERE path = ?', (str(chat_file),)).fetchone()
+        with self.conn:
+            info = self.refresh_chat(chat_file, chat_file.stat(), row)
+        info['file'] = chat_file
+        info['mtime'] = info['mtime_ns'] / 1e9
+        return info
+    
+    def move_chat(self, chat_file, new_file):
+        """Point the entry of a chat at a file with the same lines (its archive)
+
+        The message index, search rows and statistics stay valid, so the new
+        file is not read again.
+        """
+        st = new_file.stat()
+        with self.conn:
+            for (chat_id,) in self.conn.execute('SELECT id FROM chats WHERE path = ?', (str(new_file),)).fetchall():
+                self.delete_chat_rows(chat_id)
+                self.conn.execute('DELETE FROM chats WHERE id = ?', (chat_id,))
+            self.conn.execute('UPDATE chats SET path = ?, inode = ?, size = ?, mtime_ns = ? WHERE path = ?',
+                              (str(new_file), st.st_ino, st.st_size, st.st_mtime_ns, str(chat_file)))
+    
+    def delete_chat_rows(self, chat_id):
+        """Drop the full-text rows, the message index and the statistics of one chat"""
+        self.delete_search_rows(chat_id)
+        self.conn.execute('DELETE FROM message_index WHERE chat_id = ?', (chat_id,))
+        self.conn.execute('DELETE FROM chat_stats WHERE chat_id = ?', (chat_id,))
+    
+    def load_message_index(self, chat_id):
+        """Get the stored message index of a chat (empty if there is none)"""
+        row = self.conn.execute('SELECT * FROM message_index WHERE chat_id = ?', (chat_id,)).fetchone()
+        return MessageIndex(row)
+    
+    def save_message_index(self, chat_id, message_index):
+        """Store the message index of a chat"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO message_index (chat_id, offset, line, offsets, lines, roles, timestamps) '
+            'VALUES (:chat_id, :offset, :line, :offsets, :lines, :roles, :timestamps)',
+            message_index.to_row(chat_id))
+    
+    def message_index(self, chat):
+        """Get the message index of a chat, indexing the lines appended since it was stored"""
+        message_index = self.load_message_index(chat['id'])
+        if message_index.offset < chat['offset']:
+            message_index.extend(chat['file'], end=chat['offset'])
+            with self.conn:
+                self.save_message_index(chat['id'], message_index)
+        return message_index
+    
+    def chat_stats(self, chat_id):
+        """Get the (offset, statistics) stored for a chat, (0, None) if there are none"""
+        row = self.conn.execute('SELECT offset, stats FROM chat_stats WHERE chat_id = ?', (chat_id,)).fetchone()
+        return (row['offset'], json.loads(row['stats'])) if row else (0, None)
+    
+    def save_chat_stats(self, chat_id, offset, stats):
+        """Store the statistics of a chat's lines before offset"""
+        self.conn.execute('INSERT OR REPLACE INTO chat_stats (chat_id, offset, stats) VALUES (?, ?, ?)',
+                          (chat_id, offset, json.dumps(stats)))
+    
+    def delete_search_rows(self, chat_id):
+        """Drop the full-text rows of one chat"""
+        if self.fts_tokenizer:
+            self.conn.execute('DELETE FROM messages_fts WHERE rowid BETWEEN ? AND ?',
+                              (chat_id << 32, (chat_id << 32) | 0xFFFFFFFF))
+    
+    def update_search_index(self, chat):
+        """Add the complete lines appended to a chat since it was last indexed for search"""
+        if not self.fts_tokenizer or chat['fts_offset'] >= chat['offset']:
+            return
+        
+        offset = chat['fts_offset']
+        line_num = chat['fts_line']
+        base = chat['id'] << 32
+        rows = []
+        insert = 'INSERT INTO messages_fts (rowid, text, tools, paths, role, timestamp) VALUES (?, ?, ?, ?, ?, ?)'
+        
+        # Lines are parsed here anyway: extend the message index in the same pass
+        message_index = self.load_message_index(chat['id'])
+        if message_index.offset != offset:
+            message_index = None
+        
+        with self.conn:
+            with open_chat_file(chat['file']) as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n') or offset >= chat['offset']:
+                        break
+                    line_offset = offset
+                    offset += len(line)
+                    line_num += 1
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        continue
+                    if message_index is not None:
+                        message_index.add(line_offset, line_num, entry)
+                    fields = extract_search_fields(entry)
+                    if fields:
+                        rows.append((base | line_num,) + fields)
+                    if len(rows) >= 500:
+                        self.conn.executemany(insert, rows)
+                        rows = []
+            
+            self.conn.executemany(insert, rows)
+            self.conn.execute('UPDATE chats SET fts_offset = ?, fts_line = ? WHERE id = ?',
+                              (offset, line_num, chat['id']))
+            if message_index is not None:
+                message_index.offset, message_index.line = offset, line_num
+                self.save_message_index(chat['id'], message_index)
+    
+    def can_search(self, search_term):
+        """Check whether the full-text index can answer a search for this term"""
+        if not self.fts_tokenizer:
+            return False
+        # Trigrams need at least 3 characters
+        return len(search_term) >= 3 if self.fts_tokenizer == 'trigram' else bool(search_term.strip())
+    
+    def search(self, search_term, limit=-1, offset=0):
+        """Ranked full-text search, returning (project, chat file, line, role, timestamp, text, tools, paths) rows
+
+        text, tools and paths are the indexed fields of the message, for previews.
+        """
+        query = '"' + search_term.replace('"', '""') + '"'
+        return self.conn.execute(
+            "SELECT c.project, c.path, f.rowid & 0xFFFFFFFF AS line, f.role, f.timestamp, f.text, f.tools, f.paths "
+            "FROM messages_fts f JOIN chats c ON c.id = f.rowid >> 32 "
+            "WHERE messages_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?", (query, limit, offset)).fetchall()
+
+_chat_index = None
+_chat_index_disabled = False
+
+def get_chat_index():
+    """Get the shared metadata index, or None if it is disabled or unavailable"""
+    global _chat_index, _chat_index_disabled
+    if _chat_index is None and not _chat_index_disabled:
+        try:
+            _chat_index = ChatIndex(get_cache_dir() / 'index.sqlite3')
+        except (sqlite3.Error, OSError) as e:
+            print(f'Warning: Chat index unavailable, reading files directly: {e}', file=sys.stderr)
+            _chat_index_disabled = True
+    return _chat_index
+
+def disable_chat_index():
+    """Read chat files directly instead of using the metadata index"""
+    global _chat_index_disabled
+    _chat_index_disabled = True
+
+def chat_index_disabled():
+    """Whether the metadata index was turned off or found unavailable"""
+    return _chat_index_disabled
+
+def index_busy(error):
+    """Whether an index error only means that another connection (--watch, the browser) held a lock"""
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in str(error) or 'busy' in str(error))
+
+def retry_if_busy(index, read):
+    """Call read(), once more if another connection held a lock
+
+    The failed transaction is rolled back first, so the retry starts from a fresh
+    snapshot (in WAL mode, a read transaction that another connection wrote past
+    cannot become a write transaction, and fails without waiting).
+    """
+    try:
+        return read()
+    except sqlite3.OperationalError as e:
+        if not index_busy(e):
+            raise
+        index.conn.rollback()
+        return read()
+
+def index_error(error):
+    """Report an index error; the index is turned off unless it was only busy"""
+    if index_busy(error):
+        print(f'Warning: Chat index busy, reading files directly: {error}', file=sys.stderr)
+    else:
+        print(f'Warning: Chat index error, reading files directly: {error}', file=sys.stderr)
+        disable_chat_index()
+
+def get_message_index(chat_file):
+    """Get the up-to-date message index of a chat file, or None without the metadata index"""
+    index = get_chat_index()
+    if index is not None:
+        try:
+            return retry_if_busy(index, lambda: index.message_index(index.chat_info(Path(chat_file).absolute())))
+        except sqlite3.Error as e:
+            index_error(e)
+        except OSError:
+            pass
+    return None
+
+def get_chat_infos(project_dir):
+    """Get metadata (message count, size, mtime, first/last timestamp) of all chats in a project"""
+    index = get_chat_index()
+    if index is not None:
+        try:
+            return retry_if_busy(index, lambda: index.project_chats(project_dir))
+        except sqlite3.Error as e:
+            index_error(e)
+    return scan_project_chats(project_dir)
+
+def scan_project_chats(project_dir):
+    """Get the metadata of all chats in a project by reading the files"""
+    chats = []
+    for chat_file in list_chat_files(project_dir):
+        info = {'file': chat_file, 'message_count': None, 'first_timestamp': None,
+                'last_timestamp': None, 'size': None, 'mtime': None}
+        try:
+            st = chat_file.stat()
+            info.update(size=st.st_size, mtime=st.st_mtime)
+            info.update(scan_chat_file(chat_file))
+        except OSError:
+            pass
+        chats.append(info)
+    return chats
@@ -0,0 +1,62 @@
+"""Running scans and exports on a process pool"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .index import chat_index_disabled, disable_chat_index
+from .parsed_cache import disable_parsed_cache, parsed_cache_disabled
+
+_worker_cancel_event = None
+
+def _init_scan_worker(cancel_event, no_parsed_cache=False, no_chat_index=False):
+    """Process pool initializer: remember the shared cancellation event and index/cache settings
+
+    Workers started with spawn do not inherit the parent's --no-index state.
+    """
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+    if no_parsed_cache:
+        disable_parsed_cache()
+    if no_chat_index:
+        disable_chat_index()
+
+def scan_cancelled():
+    """Check (in a worker) whether the parent no longer needs results"""
+    return _worker_cancel_event is not None and _worker_cancel_event.is_set()
+
+def resolve_jobs(jobs=None):
+    """Number of worker processes to use (default: one per CPU)"""
+    return max(1, jobs or os.cpu_count() or 1)
+
+def parallel_map(func, tasks, jobs=None, ordered=True):
+    """Run func over tasks in worker processes, yielding results in task order
+
+    With ordered=False, results are yielded as soon as they are done instead.
+    Closing the generator (e.g. once a result limit is reached) cancels the
+    tasks that have not started and tells running workers to stop early.
+    Small inputs and jobs=1 run in-process.
+    """
+    jobs = min(resolve_jobs(jobs), len(tasks))
+    if jobs <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+    
+    cancel_event = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker,
+                                   initargs=(cancel_event, parsed_cache_disabled(), chat_index_disabled()))
+    try:
+        if ordered:
+            for result in executor.map(func, tasks):
+                yield result
+        else:
+            futures = [executor.submit(func, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        cancel_event.set()
+        try:
+            executor.shutdown(wait=True, cancel_futures=True)
+        except TypeError:  # Python < 3.9
+            executor.shutdown(wait=True)
@@ -0,0 +1,182 @@
+"""The parsed-chat cache: a compact binary file of each chat's formatted messages"""
+
+import contextlib
+import hashlib
+import os
+import struct
+from array import array
+from pathlib import Path
+
+from .common import get_cache_dir
+from .render import ChatMessage
+
+class ParsedChat:
+    """Reader of a parsed-chat cache file (see write_parsed_cache)
+
+    Layout: header (magic, version, inode, size, mtime_ns of the chat file), one
+    record per displayable message (lengths of role, timestamp and content, then
+    the UTF-8 strings), the warnings printed while parsing the chat (UTF-8 lines),
+    and a trailer holding the record offset of every message number (-1 for
+    messages that are not displayed), its length, the size of the warnings and
+    the magic.
+    """
+    
+    MAGIC = b'CRPC'
+    VERSION = 2  # Bump when the formatting of messages changes
+    HEADER = struct.Struct('<4sHQQq')
+    RECORD = struct.Struct('<HHI')
+    TRAILER = struct.Struct('<QQ4s')
+    
+    def __init__(self, f):
+        self.file = f
+        f.seek(-self.TRAILER.size, os.SEEK_END)
+        count, warnings_size, magic = self.TRAILER.unpack(f.read(self.TRAILER.size))
+        if magic != self.MAGIC:
+            raise ValueError('truncated parsed-chat cache')
+        f.seek(-self.TRAILER.size - 8 * count - warnings_size, os.SEEK_END)
+        self.warnings = f.read(warnings_size).decode('utf-8').splitlines()
+        self.records = array('q')
+        self.records.frombytes(f.read(8 * count))
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def close(self):
+        self.file.close()
+    
+    def read_record(self, number):
+        """Read the ChatMessage at the current position"""
+        role_len, timestamp_len, content_len = self.RECORD.unpack(self.file.read(self.RECORD.size))
+        data = self.file.read(role_len + timestamp_len + content_len).decode('utf-8')
+        return ChatMessage(number, data[:role_len], data[role_len:role_len + timestamp_len],
+                           data[role_len + timestamp_len:])
+    
+    def message(self, number):
+        """Get message `number`, or None if it is not displayed"""
+        if not 1 <= number <= len(self.records) or self.records[number - 1] < 0:
+            return None
+        self.file.seek(self.records[number - 1])
+        return self.read_record(number)
+    
+    def iter_messages(self, first=None, last=None):
+        """Yield the displayable messages numbered first..last, like iter_chat_messages"""
+        first = max(first or 1, 1)
+        last = min(last or len(self.records), len(self.records))
+        position = None
+        for number in range(first, last + 1):
+            record = self.records[number - 1]
+            if record < 0:
+                continue
+            if record != position:
+                self.file.seek(record)
+            message = self.read_record(number)
+            position = self.file.tell()
+            yield message
+
+def get_parsed_cache_path(file_path):
+    """Get the parsed-chat cache file of a chat file"""
+    key = hashlib.sha1(str(Path(file_path).absolute()).encode('utf-8')).hexdigest()
+    return get_cache_dir() / 'parsed' / f'{key}.bin'
+
+def remove_parsed_cache(file_path):
+    """Delete the parsed-chat cache file of a chat, if it has one"""
+    with contextlib.suppress(OSError):
+        get_parsed_cache_path(file_path).unlink()
+
+_parsed_cache_disabled = False
+
+def disable_parsed_cache():
+    """Parse chat files instead of reading the parsed-chat cache"""
+    global _parsed_cache_disabled
+    _parsed_cache_disabled = True
+
+def parsed_cache_disabled():
+    """Whether the parsed-chat cache was turned off"""
+    return _parsed_cache_disabled
+
+def open_parsed_cache(file_path):
+    """Open the parsed-chat cache of a chat file if it matches the file, else None"""
+    if _parsed_cache_disabled:
+        return None
+    try:
+        st = os.stat(file_path)
+        f = open(get_parsed_cache_path(file_path), 'rb')
+    except OSError:
+        return None
+    
+    try:
+        magic, version, inode, size, mtime_ns = ParsedChat.HEADER.unpack(f.read(ParsedChat.HEADER.size))
+        if (magic, version, inode, size, mtime_ns) == (ParsedChat.MAGIC, ParsedChat.VERSION,
+                                                       st.st_ino, st.st_size, st.st_mtime_ns):
+            return ParsedChat(f)
+    except (struct.error, ValueError, OSError):
+        pass
+    f.close()
+    return None
+
+def write_parsed_cache(messages, file_path, warnings=()):
+    """Pass messages through while writing them to the parsed-chat cache of the chat
+
+    warnings is the list the parser adds its warnings to; they are stored with the
+    messages so a cache hit reports them too. The cache is only kept if the whole
+    chat was read and the file did not change meanwhile; it is written to a
+    temporary file and renamed into place.
+    """
+    if _parsed_cache_disabled:
+        yield from messages
+        return
+    
+    try:
+        st = os.stat(file_path)
+        cache_path = get_parsed_cache_path(file_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+        f = open(tmp_path, 'wb')
+    except OSError:
+        yield from messages
+        return
+    
+    # A failing cache write must not cut the output short: stop writing, keep yielding
+    writing = True
+    complete = False
+    records = array('q')
+    try:
+        try:
+            f.write(ParsedChat.HEADER.pack(ParsedChat.MAGIC, ParsedChat.VERSION,
+                                           st.st_ino, st.st_size, st.st_mtime_ns))
+        except OSError:
+            writing = False
+        
+        for message in messages:
+            if writing:
+                try:
+                    data = [part.encode('utf-8') for part in (message.role, message.timestamp, message.content)]
+                    header = ParsedChat.RECORD.pack(*(len(part) for part in data))
+                    records.extend([-1] * (message.number - 1 - len(records)))
+                    records.append(f.tell())
+                    f.write(header)
+                    f.write(b''.join(data))
+                except (OSError, struct.error):
+                    writing = False
+            yield message
+        
+        if writing:
+            try:
+                warnings_data = ''.join(f'{warning}\n' for warning in warnings).encode('utf-8')
+                f.write(warnings_data)
+                f.write(records.tobytes())
+                f.write(ParsedChat.TRAILER.pack(len(records), len(warnings_data), ParsedChat.MAGIC))
+                f.close()
+                new_st = os.stat(file_path)
+                if (new_st.st_ino, new_st.st_size, new_st.st_mtime_ns) == (st.st_ino, st.st_size, st.st_mtime_ns):
+                    os.replace(tmp_path, cache_path)
+                    complete = True
+            except OSError:
+                pass
+    finally:
+        f.close()
+        if not complete:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
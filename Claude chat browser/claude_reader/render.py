@@ -0,0 +1,340 @@
+"""Formatting chat entries into messages, and the output formats"""
+
+import json
+import sys
+from datetime import datetime
+
+from .common import Colors, format_timestamp, json_loads
+from .chatfiles import open_chat_file
+
+def format_content(content, role):
+    """Format message content"""
+    if content is None:
+        return f'[Empty {role} message]'
+    
+    if not content:
+        return f'[No content in {role} message]'
+    
+    # Handle string content
+    if isinstance(content, str):
+        return content.strip() if content.strip() else f'[Empty {role} message]'
+    
+    # Handle list content (Claude's structured format)
+    if isinstance(content, list):
+        text_parts = []
+        for item in content:
+            if isinstance(item, dict):
+                if item.get('type') == 'text':
+                    text = item.get('text', '').strip()
+                    if text:
+                        text_parts.append(text)
+                elif item.get('type') == 'tool_use':
+                    tool_name = item.get('name', 'unknown')
+                    tool_input = item.get('input', {})
+                    text_parts.append(f'🔧 [Tool Use: {tool_name}]')
+                    if tool_input:
+                        # Show first few parameters
+                        if 'file_path' in tool_input:
+                            text_parts.append(f'   File: {tool_input["file_path"]}')
+                        elif 'todos' in tool_input:
+                            todos = tool_input.get('todos', [])
+                            if todos:
+                                text_parts.append(f'   Todos: {len(todos)} items')
+                                for todo in todos[:2]:  # Show first 2 todos
+                                    todo_content = todo.get('content', 'Unknown todo')
+                                    status = todo.get('status', 'unknown')
+                                    text_parts.append(f'     • {todo_content} ({status})')
+                        elif 'old_string' in tool_input and 'new_string' in tool_input:
+                            old_preview = tool_input['old_string'][:50] + '...' if len(tool_input['old_string']) > 50 else tool_input['old_string']
+                            text_parts.append(f'   Replacing: {old_preview}')
+                        elif 'edits' in tool_input:
+                            edits = tool_input.get('edits', [])
+                            text_parts.append(f'   Edits: {len(edits)} changes')
+                        else:
+                            params = []
+                            for k, v in list(tool_input.items())[:3]:
+                                if isinstance(v, str) and len(v) > 50:
+                                    params.append(f'{k}={v[:50]}...')
+                                elif isinstance(v, (list, dict)):
+                                    params.append(f'{k}=<{type(v).__name__}>')
+                                else:
+                                    params.append(f'{k}={v}')
+                            if params:
+                                text_parts.append(f'   Parameters: {", ".join(params)}')
+                elif item.get('type') == 'tool_result':
+                    result = item.get('content', '')
+                    if isinstance(result, str):
+                        preview = result[:200] + '...' if len(result) > 200 else result
+                        text_parts.append(f'⚙️ [Tool Result: {preview}]')
+                    else:
+                        text_parts.append('⚙️ [Tool Result]')
+                elif item.get('type') == 'image':
+                    text_parts.append('🖼️ [Image attachment]')
+            elif isinstance(item, str):
+                if item.strip():
+                    text_parts.append(item.strip())
+            else:
+                text_parts.append(str(item))
+        
+        result = '\n'.join(text_parts) if text_parts else f'[Empty {role} message]'
+        return result
+    
+    # Handle dict content
+    if isinstance(content, dict):
+        if 'text' in content:
+            return content['text'].strip() if content['text'] else f'[Empty {role} message]'
+        elif 'content' in content:
+            return format_content(content['content'], role)
+        else:
+            return f'[Complex {role} data: {str(content)[:100]}...]'
+    
+    return str(content) if content else f'[Empty {role} message]'
+
+def format_tool_result(tool_result, role):
+    """Format tool result information"""
+    if not tool_result:
+        return ''
+    
+    if isinstance(tool_result, str):
+        return f'\n⚙️ [Tool Output]: {tool_result[:200]}...' if len(tool_result) > 200 else f'\n⚙️ [Tool Output]: {tool_result}'
+    
+    if isinstance(tool_result, dict):
+        result_type = tool_result.get('type', 'unknown')
+        
+        if result_type == 'text' and 'file' in tool_result:
+            file_info = tool_result['file']
+            file_path = file_info.get('filePath', 'unknown')
+            lines = file_info.get('numLines', 0)
+            return f'\n📄 [File Read]: {file_path} ({lines} lines)'
+        
+        elif 'newTodos' in tool_result:
+            new_todos = tool_result.get('newTodos', [])
+            old_todos = tool_result.get('oldTodos', [])
+            return f'\n✅ [Todo Update]: {len(old_todos)} → {len(new_todos)} todos'
+        
+        elif 'filePath' in tool_result and 'newString' in tool_result:
+            file_path = tool_result.get('filePath', 'unknown')
+            return f'\n✏️ [File Edit]: {file_path}'
+        
+        else:
+            return f'\n⚙️ [Tool Result]: {result_type}'
+    
+    return f'\n⚙️ [Tool Result]: {str(tool_result)[:100]}...'
+
+def print_warning(message, warnings=None):
+    """Print a warning about a chat line to stderr, adding it to the warnings list if given"""
+    warning = f'Warning: {message}'
+    print(warning, file=sys.stderr)
+    if warnings is not None:
+        warnings.append(warning)
+
+def iter_chat_entries(file_path, with_offsets=False, start=0, start_line=1, warnings=None):
+    """Yield the entries of a JSONL chat file one at a time, skipping summaries
+
+    With with_offsets, yields (byte offset of the line, entry) pairs instead.
+    start is the byte offset of the line to begin with, and start_line its number.
+    The warnings printed about invalid lines are also added to the warnings list.
+    """
+    with open_chat_file(file_path) as f:
+        f.seek(start)
+        offset = start
+        for line_num, line in enumerate(f, start_line):
+            line_offset = offset
+            offset += len(line)
+            try:
+                data = json_loads(line.strip())
+                if not data or data.get('type') == 'summary':  # Skip summary entries
+                    continue
+            except json.JSONDecodeError as e:
+                print_warning(f'Skipping invalid JSON on line {line_num}: {e}', warnings)
+                continue
+            except Exception as e:
+                print_warning(f'Error processing line {line_num}: {e}', warnings)
+                continue
+            yield (line_offset, data) if with_offsets else data
+
+def format_message(entry):
+    """Get (role, timestamp, formatted content) of a chat entry with a message
+
+    Returns None for messages that are empty and not displayed.
+    """
+    message = entry['message']
+    
+    # Get basic message info
+    role = message.get('role', entry.get('type', 'unknown'))
+    content = message.get('content', '')
+    timestamp = format_timestamp(entry.get('timestamp'))
+    tool_result = entry.get('toolUseResult')
+    
+    # Format the main content
+    formatted_content = format_content(content, role)
+    
+    # Add tool result if present
+    if tool_result:
+        tool_output = format_tool_result(tool_result, role)
+        if tool_output:
+            formatted_content += tool_output
+    
+    # Skip truly empty messages
+    if not formatted_content or formatted_content.strip() in ['[Empty unknown message]', '[No content in unknown message]']:
+        return None
+    
+    return role, timestamp, formatted_content
+
+class ChatMessage:
+    """A displayable message: number, role, display timestamp and formatted content
+
+    Only what the formatters show is kept; the decoded JSON entry, which may carry
+    large tool payloads, is dropped once formatted unless a format needs it
+    (entry is None then). offset is the byte offset of the message's line in
+    the chat file (None for messages read from the parsed-chat cache).
+    """
+    __slots__ = ('number', 'role', 'timestamp', 'content', 'offset', 'entry')
+    
+    def __init__(self, number, role, timestamp, content, offset=None, entry=None):
+        self.number = number
+        self.role = role
+        self.timestamp = timestamp
+        self.content = content
+        self.offset = offset
+        self.entry = entry
+    
+    @classmethod
+    def from_entry(cls, number, entry, offset=None, keep_entry=False):
+        """Format a chat entry as message `number`, or get None if it is not displayed"""
+        formatted = format_message(entry)
+        if formatted is None:
+            return None
+        role, timestamp, content = formatted
+        return cls(number, role, timestamp, content, offset, entry if keep_entry else None)
+
+def iter_chat_messages(entries, msg_count=0, keep_entries=False):
+    """Yield a ChatMessage for each displayable message of (offset, entry) pairs
+
+    msg_count is the number of messages before the first entry. With
+    keep_entries, the messages carry their JSON entry.
+    """
+    for offset, entry in entries:
+        # Extract the nested message structure
+        message = entry.get('message', {})
+        
+        # Skip if no message content
+        if not message:
+            continue
+        
+        msg_count += 1
+        
+        message = ChatMessage.from_entry(msg_count, entry, offset, keep_entries)
+        if message is not None:
+            yield message
+
+def role_style(role):
+    """Get the (color, icon) used to display a message role"""
+    if role == 'user':
+        return Colors.GREEN, '👤'
+    elif role == 'assistant':
+        return Colors.BLUE, '🤖'
+    elif role == 'system':
+        return Colors.PURPLE, '⚙️'
+    return Colors.YELLOW, '❓'
+
+class Formatter:
+    """An output format: header chunks, then the chunks of each message
+
+    The output is the chunks joined by newlines (see FormatterSink). New formats
+    subclass this and are registered in FORMATTERS.
+    """
+    needs_entries = False  # Messages must carry their JSON entry (rules out the parsed-chat cache)
+    extension = '.md'  # File extension of exports
+    
+    def header(self):
+        return ()
+    
+    def message(self, message):
+        raise NotImplementedError
+
+class PrettyFormatter(Formatter):
+    """Colored terminal output"""
+    extension = '.txt'
+    
+    def message(self, message):
+        color, icon = role_style(message.role)
+        yield f'{color}{icon} Message {message.number} - {message.role.title()}{Colors.NC}'
+        yield f'🕒 {message.timestamp}'
+        yield f'💬 {message.content}'
+        yield '─' * 80
+
+class MarkdownFormatter(Formatter):
+    """Markdown with a heading and timestamp per message"""
+    
+    def header(self):
+        yield '# Claude Chat Export\n'
+        yield f'**Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}**\n'
+    
+    def message(self, message):
+        yield f'## Message {message.number} - {message.role.title()}\n'
+        yield f'**Time:** {message.timestamp}\n\n'
+        yield f'{message.content}\n\n'
+        yield '---\n\n'
+
+class BookFormatter(MarkdownFormatter):
+    """Book format - clean, minimal presentation"""
+    
+    def message(self, message):
+        if message.role == 'user':
+            # User question in callout style
+            yield f'> {message.content}\n\n'
+        elif message.role == 'assistant':
+            # Assistant response without headers
+            yield f'{message.content}\n\n'
+
+class RawFormatter(Formatter):
+    """The original JSON entries"""
+    needs_entries = True
+    extension = '.json'
+    
+    def message(self, message):
+        yield json.dumps(message.entry, indent=2)
+
+FORMATTERS = {
+    'pretty': PrettyFormatter(),
+    'markdown': MarkdownFormatter(),
+    'raw': RawFormatter(),
+    'book': BookFormatter(),
+}
+
+def iter_formatted_chunks(messages, format_type='pretty'):
+    """Yield the output of a chat in the given format, one chunk at a time"""
+    formatter = FORMATTERS[format_type]
+    yield from formatter.header()
+    for message in messages:
+        yield from formatter.message(message)
+
+def iter_chunk_lines(chunks):
+    """Split output chunks into display lines"""
+    for chunk in chunks:
+        yield from chunk.split('\n')
+
+class FormatterSink:
+    """One output of the render engine: a formatter writing to a text stream"""
+    
+    def __init__(self, format_type, stream):
+        self.formatter = FORMATTERS[format_type]
+        self.stream = stream
+        self.started = False
+    
+    def write(self, chunks):
+        """Write chunks, newline-separated, as they are produced"""
+        for chunk in chunks:
+            if self.started:
+                self.stream.write('\n')
+            self.stream.write(chunk)
+            self.started = True
+
+def render_messages(messages, sinks):
+    """Fan a message stream out to several formatter sinks in a single pass"""
+    for sink in sinks:
+        sink.write(sink.formatter.header())
+    for message in messages:
+        for sink in sinks:
+            sink.write(sink.formatter.message(message))
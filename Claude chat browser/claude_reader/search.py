@@ -0,0 +1,690 @@
+"""Content search: the query language, the full-text index and parallel file scans"""
+
+import mmap
+import os
+import re
+import sqlite3
+import sys
+from array import array
+from functools import partial
+from pathlib import Path
+
+from .common import (Colors, clean_project_name, format_timestamp, get_claude_projects_dir, json_loads,
+                     parse_link_time, print_colored, timestamp_ms)
+from .chatfiles import chat_name, extract_search_fields, is_archive, list_chat_files, open_chat_file
+from .index import MessageIndex, disable_chat_index, get_chat_index
+from .parallel import parallel_map, scan_cancelled
+
+class ChatQuery:
+    """A parsed content search query
+
+    Words and "quoted phrases" match message text, tool names and file paths
+    (case-insensitive); /regex/ terms match as regular expressions. Terms are
+    combined with AND (the default), OR and NOT (or a leading '-'), and grouped
+    with parentheses. Filters: role:user, tool:Bash, project:NAME (part of the
+    name), from:DATE and to:DATE (ISO dates or times, UTC like the display).
+    Plain words without any of this syntax are one phrase, as in the plain
+    content search: update checker is "update checker"; update AND checker
+    matches the words anywhere in a message.
+
+    The query is kept as a tree of (kind, value) tuples. The filters every match
+    must pass (the top-level AND terms) also prune the search: projects by name,
+    chats by their first/last timestamp, and messages by the role and timestamp
+    in their message index, so excluded files and time ranges are never read.
+    """
+    
+    FILTERS = ('role', 'tool', 'project', 'from', 'to')
+    OPERATORS = ('AND', 'OR', 'NOT')
+    TOKEN = re.compile(r'\s*(?:(-?\()|(\))|(-?(?:[A-Za-z]+:)?(?:"[^"]*"|/(?:\\.|[^/\\])*/|[^\s()"]+)))')
+    
+    def __init__(self, text):
+        self.text = text
+        tokens = self.tokenize(text)
+        if not tokens:
+            raise ValueError('empty query')
+        if len(tokens) > 1 and all(self.is_word(token) for token in tokens):
+            tokens = []
+            self.tree = ('text', text.strip().lower())
+        else:
+            self.tree = self.parse_or(tokens)
+        if tokens:
+            raise ValueError(f"unexpected '{tokens[-1]}'")
+        
+        self.conjuncts = self.tree[1] if self.tree[0] == 'and' else [self.tree]
+        self.highlights = []
+        self.collect_highlights(self.tree)
+    
+    def tokenize(self, text):
+        """Split a query into tokens, returned in reverse order (so parsing pops them)"""
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = self.TOKEN.match(text, pos)
+            if not match:
+                raise ValueError(f"cannot parse '{text[pos:].strip()}'")
+            tokens.append(match.group(match.lastindex))
+            pos = match.end()
+        return tokens[::-1]
+    
+    def is_word(self, token):
+        """Check whether a token is a plain word, not an operator, phrase, regex, filter or negation"""
+        if token in self.OPERATORS or token[0] in '-()"':
+            return False
+        if len(token) > 2 and token[0] == token[-1] == '/':
+            return False
+        key, separator, value = token.partition(':')
+        return not (separator and value and key.lower() in self.FILTERS)
+    
+    def parse_or(self, tokens):
+        items = [self.parse_and(tokens)]
+        while tokens and tokens[-1] == 'OR':
+            tokens.pop()
+            items.append(self.parse_and(tokens))
+        return items[0] if len(items) == 1 else ('or', items)
+    
+    def parse_and(self, tokens):
+        items = []
+        while tokens and tokens[-1] not in (')', 'OR'):
+            if tokens[-1] == 'AND':
+                tokens.pop()
+                continue
+            items.append(self.parse_unary(tokens))
+        if not items:
+            raise ValueError('missing search term')
+        return items[0] if len(items) == 1 else ('and', items)
+    
+    def parse_unary(self, tokens):
+        token = tokens.pop() if tokens else None
+        if token == 'NOT':
+            return ('not', self.parse_unary(tokens))
+        if token in ('(', '-('):
+            node = self.parse_or(tokens)
+            if not tokens or tokens.pop() != ')':
+                raise ValueError('missing closing parenthesis')
+            return ('not', node) if token == '-(' else node
+        if token is None or token == ')' or token in self.OPERATORS:
+            raise ValueError('missing search term')
+        return self.parse_term(token)
+    
+    def parse_term(self, token):
+        negate = token.startswith('-') and len(token) > 1
+        if negate:
+            token = token[1:]
+        key, separator, value = token.partition(':')
+        if separator and value and key.lower() in self.FILTERS:
+            node = self.parse_filter(key.lower(), value.strip('"'))
+        elif len(token) > 2 and token[0] == token[-1] == '/':
+            try:
+                node = ('regex', re.compile(token[1:-1], re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(f'invalid regular expression {token}: {e}')
+        else:
+            text = token[1:-1] if len(token) > 1 and token[0] == token[-1] == '"' else token
+            if not text.strip():
+                raise ValueError('empty phrase')
+            node = ('text', text.lower())
+        return ('not', node) if negate else node
+    
+    def parse_filter(self, key, value):
+        if key in ('from', 'to'):
+            try:
+                return (key, parse_link_time(value, end=key == 'to'))
+            except ValueError:
+                raise ValueError(f'invalid date {key}:{value}')
+        return (key, value.lower())
+    
+    def collect_highlights(self, node):
+        """Remember the positive text and regex terms, for match previews"""
+        kind, value = node
+        if kind in ('and', 'or'):
+            for item in value:
+                self.collect_highlights(item)
+        elif kind == 'text':
+            self.highlights.append(re.compile(re.escape(value), re.IGNORECASE))
+        elif kind == 'regex':
+            self.highlights.append(value)
+    
+    def plain_term(self):
+        """Get the search term of a query that is a single word or phrase, else None"""
+        kind, value = self.tree
+        return value if kind == 'text' else None
+    
+    def required(self, kind):
+        """Get the values of the filters or terms of a kind that every match must pass"""
+        return [value for node_kind, value in self.conjuncts if node_kind == kind]
+    
+    def time_range(self):
+        """Get the (from, to) epoch milliseconds every match must lie in (None if unbounded)"""
+        starts, ends = self.required('from'), self.required('to')
+        return (max(starts) if starts else None), (min(ends) if ends else None)
+    
+    def matches_project(self, project_dir):
+        """Check a project against the required project filters"""
+        names = (clean_project_name(project_dir.name).lower(), project_dir.name.lower())
+        return all(any(value in name for name in names) for value in self.required('project'))
+    
+    def matches_chat(self, chat):
+        """Check the first/last timestamp of a chat (metadata index row) against the time range"""
+        start_ms, end_ms = self.time_range()
+        first_ms = timestamp_ms(chat['first_timestamp']) if chat['first_timestamp'] else 0
+        last_ms = timestamp_ms(chat['last_timestamp']) if chat['last_timestamp'] else 0
+        if start_ms is not None and last_ms and last_ms < start_ms:
+            return False
+        if end_ms is not None and first_ms and first_ms > end_ms:
+            return False
+        return True
+    
+    def literals(self):
+        """Get byte strings every matching JSONL line contains, to skip lines without parsing them
+
+        Only ASCII terms that JSON writes unescaped qualify.
+        """
+        literals = []
+        for value in self.required('text') + self.required('tool'):
+            try:
+                literal = value.encode('ascii')
+            except UnicodeEncodeError:
+                continue
+            if not re.search(rb'["\\\x00-\x1f\x7f]', literal):
+                literals.append(literal)
+        return literals
+    
+    def candidates(self, message_index):
+        """Get the (offsets, numbers) of the messages that pass the required role and time filters"""
+        start_ms, end_ms = self.time_range()
+        roles = self.required('role')
+        role_codes = None
+        if roles:
+            codes = {MessageIndex.ROLES.index(role) if role in MessageIndex.ROLES else len(MessageIndex.ROLES)
+                     for role in roles}
+            role_codes = codes if len(set(roles)) == 1 else set()
+        
+        offsets, numbers = array('q'), array('l')
+        timestamps = message_index.timestamps
+        for i, offset in enumerate(message_index.offsets):
+            if role_codes is not None and message_index.roles[i] not in role_codes:
+                continue
+            if start_ms is not None or end_ms is not None:
+                ts = timestamps[i]
+                if not ts or (start_ms is not None and ts < start_ms) or (end_ms is not None and ts > end_ms):
+                    continue
+            offsets.append(offset)
+            numbers.append(i + 1)
+        return offsets, numbers
+    
+    def match(self, message, node=None):
+        """Evaluate the query for a message (see search_chat_query)"""
+        kind, value = node or self.tree
+        if kind == 'and':
+            return all(self.match(message, item) for item in value)
+        if kind == 'or':
+            return any(self.match(message, item) for item in value)
+        if kind == 'not':
+            return not self.match(message, value)
+        if kind == 'text':
+            return value in message['folded']
+        if kind == 'regex':
+            return value.search(message['text']) is not None
+        if kind == 'role':
+            return message['role'] == value
+        if kind == 'tool':
+            return value in message['tools']
+        if kind == 'project':
+            return any(value in name for name in message['project'])
+        if kind == 'from':
+            return message['timestamp'] >= value
+        if kind == 'to':
+            return 0 < message['timestamp'] <= value
+        return False
+    
+    def preview(self, text, width=100):
+        """Get a one-line excerpt of text around the first highlighted match"""
+        found = [m for m in (pattern.search(text) for pattern in self.highlights) if m and m.end() > m.start()]
+        if not found:
+            text = ' '.join(text.split())
+            return text[:width] + '...' if len(text) > width else text
+        
+        match = min(found, key=lambda m: m.start())
+        start = max(0, match.start() - width // 3)
+        end = min(len(text), max(match.end(), start + width))
+        # Do not cut the words at the edges in half
+        if start and not text[start - 1].isspace():
+            space = re.search(r'\s', text[start:match.start()])
+            if space:
+                start += space.end()
+        if end < len(text) and not text[end].isspace():
+            space = re.search(r'\s\S*$', text[match.end():end])
+            if space:
+                end = match.end() + space.start()
+        excerpt = (text[start:match.start()] + Colors.YELLOW + text[match.start():match.end()] + Colors.NC
+                   + text[match.end():end])
+        excerpt = ' '.join(excerpt.split())
+        return ('...' if start else '') + excerpt + ('...' if end < len(text) else '')
+
+def search_content(search_term, limit=None, offset=0, live=False, jobs=None):
+    """Search for content within chats (see ChatQuery for the query syntax)"""
+    print_colored(f"🔍 Searching chat content for: '{search_term}'", Colors.BLUE)
+    print("=" * 60)
+    
+    try:
+        query = ChatQuery(search_term)
+    except ValueError as e:
+        print_colored(f"Invalid query: {e}", Colors.RED)
+        return
+    
+    search_term = query.plain_term()
+    if search_term is None:
+        search_content_query(query, limit, offset, live, jobs)
+        return
+    
+    index = None if live else get_chat_index()
+    if index is None or not index.can_search(search_term):
+        search_content_live(search_term, limit, offset, jobs)
+        return
+    
+    try:
+        results = search_content_indexed(index, search_term, limit, offset)
+    except sqlite3.Error as e:
+        print(f'Warning: Search index error, scanning files directly: {e}', file=sys.stderr)
+        search_content_live(search_term, limit, offset, jobs)
+        return
+    
+    if not results:
+        print_colored(f"No content found matching '{search_term}'", Colors.YELLOW)
+        return
+    
+    # Message numbers turn the results into deep links (project/chat#N)
+    message_indexes = {}
+    for project, chat_path, line, role, timestamp, text, tools, paths in results:
+        if chat_path not in message_indexes:
+            try:
+                message_indexes[chat_path] = index.message_index(index.chat_info(Path(chat_path)))
+            except (sqlite3.Error, OSError):
+                message_indexes[chat_path] = None
+        message_index = message_indexes[chat_path]
+        number = message_index.number_at_line(line) if message_index is not None else 0
+        anchor = f"#{number}" if number else ''
+        print_colored(f"📝 {clean_project_name(project)}/{chat_name(chat_path)}{anchor}", Colors.GREEN)
+        # The same preview as query results: whole words around the first match
+        preview = query.preview('\n'.join(part for part in (text, tools, paths) if part))
+        print(f"   Line {line} ({role}, {format_timestamp(timestamp)}): {preview}")
+        print()
+    print_colored(f"{len(results)} match(es) in {len(message_indexes)} chat(s)", Colors.CYAN)
+
+def search_content_indexed(index, search_term, limit=None, offset=0):
+    """Bring the full-text index up to date, then run a ranked search"""
+    claude_dir = get_claude_projects_dir()
+    
+    for project_dir in claude_dir.iterdir():
+        if project_dir.is_dir():
+            for chat in index.project_chats(project_dir):
+                try:
+                    index.update_search_index(chat)
+                except OSError:
+                    continue
+    
+    return index.search(search_term, limit if limit else -1, offset)
+
+def search_content_live(search_term, limit=None, offset=0, jobs=None):
+    """Search for content by scanning every chat file in parallel"""
+    claude_dir = get_claude_projects_dir()
+    chat_files = []
+    for project_dir in claude_dir.iterdir():
+        if project_dir.is_dir():
+            chat_files.extend(list_chat_files(project_dir))
+    
+    shards = plan_scan_shards(chat_files)
+    scan = partial(search_shard, needle=search_term.lower())
+    
+    found = 0
+    chats = set()
+    current_file = None
+    line_base = 0
+    results = parallel_map(scan, shards, jobs)
+    try:
+        for (path, start, end), (line_count, matches) in zip(shards, results):
+            if path != current_file:
+                current_file, line_base = path, 0
+            
+            for line_offset, role, preview in matches:
+                if offset:
+                    offset -= 1
+                    continue
+                if path not in chats:
+                    chats.add(path)
+                    print_colored(f"📝 Found in: {clean_project_name(path.parent.name)}/{chat_name(path)}", Colors.GREEN)
+                role_str = f" ({role})" if role else ''
+                print(f"   Line {line_base + line_offset}{role_str}: {preview}")
+                found += 1
+                if limit and found >= limit:
+                    break
+            
+            line_base += line_count
+            if limit and found >= limit:
+                break
+    finally:
+        # Stops the workers early when the limit was reached
+        results.close()
+    
+    if not found:
+        print_colored(f"No content found matching '{search_term}'", Colors.YELLOW)
+    else:
+        print()
+        print_colored(f"{found} match(es) in {len(chats)} chat(s)", Colors.CYAN)
+
+def search_content_query(query, limit=None, offset=0, live=False, jobs=None):
+    """Search for the messages matching a query, reading only the chats and messages its filters allow
+
+    With live, the indexes are not used and every chat file is read.
+    """
+    try:
+        tasks = plan_query_tasks(query, None if live else get_chat_index())
+    except sqlite3.Error as e:
+        print(f'Warning: Chat index error, reading files directly: {e}', file=sys.stderr)
+        disable_chat_index()
+        tasks = plan_query_tasks(query, None)
+    
+    found = 0
+    skip = offset
+    more = False
+    chats = set()
+    results = parallel_map(partial(search_chat_query, query=query), tasks, jobs)
+    try:
+        for (chat_file, project_dir, offsets, numbers), matches in zip(tasks, results):
+            for number, role, timestamp, preview in matches:
+                if skip:
+                    skip -= 1
+                    continue
+                if limit and found >= limit:
+                    more = True
+                    break
+                chats.add(chat_file)
+                found += 1
+                print_colored(f"📝 {clean_project_name(project_dir.name)}/{chat_name(chat_file)}#{number}", Colors.GREEN)
+                print(f"   ({role}, {format_timestamp(timestamp)}) {preview}")
+                print()
+            if more:
+                break
+    finally:
+        # Stops the workers early when the limit was reached
+        results.close()
+    
+    if not found:
+        print_colored(f"No content found matching '{query.text}'", Colors.YELLOW)
+        return
+    print_colored(f"{found} match(es) in {len(chats)} chat(s)", Colors.CYAN)
+    if more:
+        print(f"More matches follow: use --offset {offset + found} to see them")
+
+def plan_query_tasks(query, index):
+    """Get the (chat file, project dir, offsets, numbers) scan tasks of a query, pruned by the indexes
+
+    offsets/numbers are the byte offsets and numbers of the candidate messages of a
+    chat, split into tasks spanning at most SCAN_SHARD_SIZE bytes. Without the
+    metadata index, or for a chat without a stored message index, they are None
+    and the worker indexes the chat while it scans it, so that a cold index does
+    not make the parent read every chat before the workers start.
+    """
+    tasks = []
+    for project_dir in sorted(get_claude_projects_dir().iterdir()):
+        if not project_dir.is_dir() or not query.matches_project(project_dir):
+            continue
+        if index is None:
+            tasks.extend((chat_file, project_dir, None, None) for chat_file in list_chat_files(project_dir))
+            continue
+        
+        for chat in index.project_chats(project_dir):
+            if not query.matches_chat(chat):
+                continue
+            message_index = index.load_message_index(chat['id'])
+            if not message_index.offset:
+                tasks.append((chat['file'], project_dir, None, None))
+                continue
+            try:
+                if message_index.offset < chat['offset']:
+                    message_index = index.message_index(chat)
+            except OSError:
+                continue
+            offsets, numbers = query.candidates(message_index)
+            # Archives are read from their start: one task each
+            shard_size = SCAN_SHARD_SIZE if not is_archive(chat['file']) else float('inf')
+            start = 0
+            for i in range(1, len(offsets) + 1):
+                if i == len(offsets) or offsets[i] - offsets[start] >= shard_size:
+                    tasks.append((chat['file'], project_dir, offsets[start:i], numbers[start:i]))
+                    start = i
+    return tasks
+
+def search_chat_query(task, query):
+    """Worker: find the candidate messages of a chat that match a query
+
+    Returns [(message number, role, timestamp, preview)]. Only the candidate lines
+    are read, and those missing a literal every match contains are not parsed.
+    """
+    chat_file, project_dir, offsets, numbers = task
+    matches = []
+    try:
+        if offsets is None:
+            message_index = MessageIndex()
+            message_index.extend(chat_file)
+            offsets, numbers = query.candidates(message_index)
+        
+        literals = query.literals()
+        project = (clean_project_name(project_dir.name).lower(), project_dir.name.lower())
+        with open_chat_file(chat_file) as f:
+            position = None
+            for i, offset in enumerate(offsets):
+                if i % 1000 == 0 and scan_cancelled():
+                    break
+                if offset != position:
+                    f.seek(offset)
+                line = f.readline()
+                position = offset + len(line)
+                if literals:
+                    folded = line.lower()
+                    if not all(literal in folded for literal in literals):
+                        continue
+                try:
+                    entry = json_loads(line)
+                except ValueError:
+                    continue
+                fields = extract_search_fields(entry)
+                if fields is None:
+                    continue
+                
+                text, tools, paths, role, timestamp = fields
+                text = '\n'.join(part for part in (text, tools, paths) if part)
+                message = {'text': text, 'folded': text.lower(), 'role': str(role).lower(),
+                           'tools': tools.lower().split(), 'project': project,
+                           'timestamp': timestamp_ms(entry.get('timestamp'))}
+                if query.match(message):
+                    matches.append((numbers[i], role, timestamp, query.preview(text)))
+    except OSError:
+        pass
+    return matches
+
+# Byte ranges larger than this are split so one huge chat does not serialize a scan
+SCAN_SHARD_SIZE = 16 * 1024 * 1024
+
+def plan_scan_shards(files, shard_size=SCAN_SHARD_SIZE):
+    """Split files into (path, start, end) byte ranges of at most shard_size, in file order
+
+    A shard owns the lines that start inside its range. Archives cannot be entered
+    in the middle, so each is one (path, 0, None) shard.
+    """
+    shards = []
+    for path in files:
+        if is_archive(path):
+            shards.append((path, 0, None))
+            continue
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        start = 0
+        while True:
+            end = min(start + shard_size, size)
+            shards.append((path, start, end))
+            start = end
+            if start >= size:
+                break
+    return shards
+
+def iter_shard_lines(path, start, end):
+    """Yield the lines of a file that start inside the byte range [start, end) (end=None: to the end)"""
+    with open_chat_file(path) as f:
+        if start:
+            # Skip the line that started in the previous shard
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while end is None or pos < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+            pos += len(line)
+
+def search_shard(shard, needle):
+    """Worker: find lines containing needle (lowercase) in one shard
+
+    Returns (number of lines in the shard, [(line number within shard, role, preview)]).
+    ASCII needles use a memory-mapped byte search over the whole shard, so only
+    matching lines are decoded and parsed; other needles fall back to a line scan.
+    """
+    try:
+        needle_bytes = needle.encode('ascii')
+    except UnicodeEncodeError:
+        return search_shard_lines(shard, needle)
+    
+    path, start, end = shard
+    if is_archive(path):
+        return search_archive(shard, needle_bytes, needle)
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if start >= size:
+                return 0, []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return search_buffer(buf, size, start, end, needle_bytes, needle)
+    except (OSError, ValueError):
+        return search_shard_lines(shard, needle)
+
+def search_buffer(buf, size, start, end, needle_bytes, needle, chunk_size=4 * 1024 * 1024):
+    """Search the lines starting inside [start, end) of a mapped file
+
+    The range is lowercased chunk by chunk (bytes.lower() folds ASCII only,
+    like the needle) and searched with bytes.find(); newlines are counted on
+    the same chunks to number the matching lines.
+    """
+    # Own the lines that start inside the range, like iter_shard_lines
+    first = start
+    if start:
+        newline = buf.find(b'\n', start - 1)
+        first = newline + 1 if newline != -1 else size
+    last = size
+    if end < size:
+        newline = buf.find(b'\n', end - 1)
+        last = newline + 1 if newline != -1 else size
+    
+    matches = []
+    newlines = 0  # newlines in [first, pos)
+    skip_to = first
+    overlap = len(needle_bytes) - 1
+    pos = first
+    while pos < last:
+        if scan_cancelled():
+            break
+        chunk_end = min(last, pos + chunk_size)
+        span = chunk_end - pos
+        chunk = buf[pos:min(last, chunk_end + overlap)].lower()
+        
+        counted = 0
+        chunk_newlines = 0
+        i = chunk.find(needle_bytes, max(0, skip_to - pos))
+        while i != -1 and i < span:
+            chunk_newlines += chunk.count(b'\n', counted, i)
+            counted = i
+            
+            # Locate, decode and parse only the matching line
+            match_at = pos + i
+            line_start = buf.rfind(b'\n', first, match_at) + 1 or first
+            line_end = buf.find(b'\n', match_at, last)
+            line_end = last if line_end == -1 else line_end + 1
+            text = buf[line_start:line_end].decode('utf-8', errors='replace')
+            matches.append((newlines + chunk_newlines + 1,) + match_preview(text, needle))
+            
+            # One match per line: continue after it
+            skip_to = line_end
+            if line_end - pos >= span:
+                break
+            i = chunk.find(needle_bytes, line_end - pos)
+        
+        newlines += chunk_newlines + chunk.count(b'\n', counted, span)
+        pos = chunk_end
+    
+    line_count = newlines
+    if last > first and buf[last - 1] != ord('\n'):
+        line_count += 1
+    return line_count, matches
+
+def search_archive(shard, needle_bytes, needle, chunk_size=16 * 1024 * 1024):
+    """Worker: search_shard for a whole archive, searching it in decompressed chunks of whole lines"""
+    path = shard[0]
+    line_count = 0
+    matches = []
+    try:
+        with open_chat_file(path) as f:
+            while not scan_cancelled():
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                if not chunk.endswith(b'\n'):
+                    chunk += f.readline()
+                count, chunk_matches = search_buffer(chunk, len(chunk), 0, len(chunk), needle_bytes, needle)
+                matches.extend((line_count + line, *match) for line, *match in chunk_matches)
+                line_count += count
+    except (OSError, EOFError, ValueError):
+        pass
+    return line_count, matches
+
+def search_shard_lines(shard, needle):
+    """Worker: line-by-line variant of search_shard for needles a byte search cannot fold"""
+    path, start, end = shard
+    line_count = 0
+    matches = []
+    try:
+        for line in iter_shard_lines(path, start, end):
+            line_count += 1
+            if line_count % 1000 == 0 and scan_cancelled():
+                break
+            text = line.decode('utf-8', errors='replace')
+            if needle in text.lower():
+                matches.append((line_count,) + match_preview(text, needle))
+    except OSError:
+        pass
+    return line_count, matches
+
+def match_preview(line, needle):
+    """Get (role, preview) for a matching JSONL line, preferring the matching text part"""
+    try:
+        data = json_loads(line)
+        message = data.get('message', {})
+        content = message.get('content', '')
+        role = message.get('role', 'unknown')
+        
+        if isinstance(content, str) and needle in content.lower():
+            return role, (content[:100] + '...' if len(content) > 100 else content)
+        elif isinstance(content, list):
+            for item in content:
+                if isinstance(item, dict) and item.get('type') == 'text':
+                    text = item.get('text', '')
+                    if needle in text.lower():
+                        return role, (text[:100] + '...' if len(text) > 100 else text)
+    except Exception:
+        role = None
+    
+    # Fallback to simple line preview
+    line = line.strip()
+    return role, (line[:100] + '...' if len(line) > 100 else line)
@@ -0,0 +1,202 @@
+"""Usage statistics, computed by a cached map-reduce over the chats"""
+
+import contextlib
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from .common import (Colors, clean_project_name, find_project_dir, get_claude_projects_dir, json_loads,
+                     print_colored, timestamp_ms)
+from .chatfiles import chat_name, list_chat_files, open_chat_file
+from .index import disable_chat_index, get_chat_index
+from .parallel import parallel_map
+
+def new_stats():
+    """Get empty usage statistics (see add_entry_stats)"""
+    return {'messages': {}, 'tools': {}, 'edits': 0, 'reads': 0, 'sessions': {}, 'days': {}}
+
+def add_entry_stats(stats, entry, session):
+    """Count one chat entry into usage statistics
+
+    Messages are counted by role and by UTC day, tool uses by tool name, and
+    edits/file reads by their toolUseResult. Sessions map an id (default:
+    `session`) to their first and last timestamp in epoch milliseconds.
+    """
+    if not isinstance(entry, dict) or not entry or entry.get('type') == 'summary':
+        return
+    message = entry.get('message')
+    if not message:
+        return
+    
+    role = str(message.get('role', entry.get('type', 'unknown')) if isinstance(message, dict) else entry.get('type'))
+    stats['messages'][role] = stats['messages'].get(role, 0) + 1
+    
+    content = message.get('content') if isinstance(message, dict) else None
+    if isinstance(content, list):
+        for item in content:
+            if isinstance(item, dict) and item.get('type') == 'tool_use':
+                name = str(item.get('name', 'unknown'))
+                stats['tools'][name] = stats['tools'].get(name, 0) + 1
+    
+    tool_result = entry.get('toolUseResult')
+    if isinstance(tool_result, dict):
+        if isinstance(tool_result.get('file'), dict):
+            stats['reads'] += 1
+        elif any(key in tool_result for key in ('structuredPatch', 'oldString', 'edits')) or \
+                tool_result.get('type') == 'create':
+            stats['edits'] += 1
+    
+    ms = timestamp_ms(entry.get('timestamp'))
+    if ms:
+        day = datetime.fromtimestamp(ms / 1000, timezone.utc).strftime('%Y-%m-%d')
+        stats['days'][day] = stats['days'].get(day, 0) + 1
+        span = stats['sessions'].setdefault(str(entry.get('sessionId') or session), [ms, ms])
+        span[0], span[1] = min(span[0], ms), max(span[1], ms)
+
+def merge_stats(total, part):
+    """Add the statistics `part` into `total` (the reduce step)"""
+    for key in ('messages', 'tools', 'days'):
+        for name, count in part[key].items():
+            total[key][name] = total[key].get(name, 0) + count
+    total['edits'] += part['edits']
+    total['reads'] += part['reads']
+    for session, (first, last) in part['sessions'].items():
+        span = total['sessions'].setdefault(session, [first, last])
+        span[0], span[1] = min(span[0], first), max(span[1], last)
+    return total
+
+def collect_chat_stats(task):
+    """Worker: get (statistics, end offset) of the complete lines of a chat in [start, end)
+
+    end=None reads up to the last complete line.
+    """
+    chat_file, start, end = task
+    stats = new_stats()
+    offset = start
+    try:
+        with open_chat_file(chat_file) as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b'\n') or (end is not None and offset >= end):
+                    break
+                offset += len(line)
+                try:
+                    entry = json_loads(line)
+                except ValueError:
+                    continue
+                add_entry_stats(stats, entry, chat_name(chat_file))
+    except OSError:
+        pass
+    return stats, offset
+
+def get_corpus_stats(project_dir=None, jobs=None):
+    """Map-reduce usage statistics over all chats (or one project's)
+
+    Each chat's statistics are cached in the metadata index with the offset
+    they cover, so only new chats and the lines appended to grown ones are
+    read again (by a process pool); the cached parts are then merged.
+    Returns (statistics, {project: message count}, number of chats read).
+    """
+    project_dirs = [project_dir] if project_dir else \
+        sorted(d for d in get_claude_projects_dir().iterdir() if d.is_dir())
+    index = get_chat_index()
+    
+    chats = []  # (chat metadata, cached statistics)
+    try:
+        for directory in project_dirs:
+            if index is None:
+                chats.extend(({'file': f, 'id': None, 'offset': None}, None)
+                             for f in list_chat_files(directory))
+                continue
+            for chat in index.project_chats(directory):
+                offset, stats = index.chat_stats(chat['id'])
+                chat['stats_offset'] = offset if stats is not None else 0
+                chats.append((chat, stats))
+    except sqlite3.Error as e:
+        print(f'Warning: Chat index error, reading files directly: {e}', file=sys.stderr)
+        disable_chat_index()
+        return get_corpus_stats(project_dir, jobs)
+    
+    stale = [chat for chat, stats in chats if stats is None or chat['stats_offset'] < chat['offset']]
+    tasks = [(chat['file'], chat.get('stats_offset', 0), chat['offset']) for chat in stale]
+    if tasks:
+        print_colored(f"Reading {len(tasks)} new or changed chat(s)...", Colors.CYAN)
+    
+    total = new_stats()
+    projects = defaultdict(int)
+    # Read everything first: the write transaction must not stay open while the workers run
+    results = iter(list(parallel_map(collect_chat_stats, tasks, jobs)))
+    with index.conn if index is not None else contextlib.nullcontext():
+        for chat, stats in chats:
+            if stats is None or chat['stats_offset'] < chat['offset']:
+                part, offset = next(results)
+                stats = merge_stats(stats or new_stats(), part)
+                if index is not None:
+                    index.save_chat_stats(chat['id'], offset, stats)
+            merge_stats(total, stats)
+            projects[chat['file'].parent.name] += sum(stats['messages'].values())
+    return total, projects, len(tasks)
+
+def format_duration(ms):
+    """Format a duration in milliseconds like '2h 05m', '12m' or '40s'"""
+    seconds = int(ms // 1000)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+def print_stats_table(counts, limit, width=30):
+    """Print the largest counts of a {name: count} dict with bars"""
+    top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    if not top:
+        print("   (none)")
+        return
+    largest = top[0][1]
+    name_width = min(40, max(len(name) for name, count in top))
+    for name, count in top:
+        bar = '█' * max(1, width * count // largest)
+        print(f"   {name[:name_width]:<{name_width}} {count:>8}  {bar}")
+
+def show_stats(project=None, jobs=None, days=30):
+    """Print usage statistics of all chats, or of one project"""
+    project_dir = None
+    if project:
+        project_dir = find_project_dir(project)
+        if project_dir is None:
+            print_colored(f"Project not found: {project}", Colors.RED)
+            return
+    
+    stats, projects, read = get_corpus_stats(project_dir, jobs)
+    title = clean_project_name(project_dir.name) if project_dir else 'all projects'
+    print_colored(f"📊 Chat statistics for {title}", Colors.BLUE)
+    print("=" * 60)
+    
+    messages = stats['messages']
+    durations = sorted(last - first for first, last in stats['sessions'].values())
+    print(f"Projects: {len(projects)}   Messages: {sum(messages.values())}   "
+          f"Tool uses: {sum(stats['tools'].values())}   Edits: {stats['edits']}   File reads: {stats['reads']}")
+    if durations:
+        print(f"Sessions: {len(durations)}   total {format_duration(sum(durations))}, "
+              f"median {format_duration(durations[len(durations) // 2])}, longest {format_duration(durations[-1])}")
+    
+    print()
+    print_colored("Messages by role", Colors.CYAN)
+    print_stats_table(messages, 10)
+    print()
+    print_colored("Tool uses by tool", Colors.CYAN)
+    print_stats_table(stats['tools'], 15)
+    if not project_dir:
+        print()
+        print_colored("Messages by project", Colors.CYAN)
+        print_stats_table({clean_project_name(name): count for name, count in projects.items()}, 10)
+    print()
+    print_colored(f"Messages per day (last {days} active days, UTC)", Colors.CYAN)
+    recent = sorted(stats['days'].items())[-days:]
+    largest = max((count for day, count in recent), default=0)
+    for day, count in recent:
+        print(f"   {day} {count:>8}  {'█' * max(1, 30 * count // largest)}")
+    if not recent:
+        print("   (none)")
@@ -0,0 +1,372 @@
+"""Viewing chats: the lazy pager and deep links to messages"""
+
+import os
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from .common import Colors, find_project_dir, json_loads, parse_link_time, print_colored
+from .chatfiles import chat_name, is_archive, list_chat_files, open_chat_file
+from .index import MessageIndex, get_message_index
+from .parsed_cache import open_parsed_cache
+from .render import ChatMessage, iter_chunk_lines, iter_formatted_chunks
+from .export import render_chat
+
+def get_terminal_size():
+    """Get terminal size (width, height)"""
+    try:
+        return shutil.get_terminal_size()
+    except:
+        return shutil.get_terminal_size((80, 24))  # fallback
+
+class ChatDocument:
+    """A chat rendered lazily for the pager
+
+    Messages are located through a MessageIndex: the stored one when the metadata
+    index is available (so jumps are instant), otherwise one built only as far as
+    the pager has needed. They are rendered to display lines on demand, from the
+    parsed-chat cache when it is valid, and a small LRU cache keeps the recently
+    shown ones. Positions are (message index,
+    line within the message); messages that are not displayed have no lines.
+    """
+    CACHE_SIZE = 64  # Rendered messages kept in memory
+    SCAN_BATCH = 256  # Messages indexed at a time without a stored index
+    
+    def __init__(self, file_path, message_index=None, parsed=None):
+        self.file_path = file_path
+        self.source = file_path
+        if is_archive(file_path):
+            # The pager seeks back and forth: decompress an archive to a temporary file once
+            with open_chat_file(file_path) as archive, \
+                    tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False) as f:
+                self.source = f.name
+                shutil.copyfileobj(archive, f, 1024 * 1024)
+        self.file = open(self.source, 'rb')
+        self.index = message_index if message_index is not None else MessageIndex()
+        self.parsed = parsed
+        self.complete = False
+        self.cache = OrderedDict()
+    
+    def close(self):
+        self.file.close()
+        if self.source != self.file_path:
+            os.unlink(self.source)
+        if self.parsed is not None:
+            self.parsed.close()
+    
+    def ensure(self, count):
+        """Index messages until `count` are known; returns whether they exist"""
+        if len(self.index) < count and not self.complete:
+            self.complete = not self.index.extend(
+                self.source, count=max(count, len(self.index) + self.SCAN_BATCH), include_partial=True)
+        return len(self.index) >= count
+    
+    def lines(self, index):
+        """Get the display lines of an indexed message, reading it from its offset"""
+        lines = self.cache.get(index)
+        if lines is not None:
+            self.cache.move_to_end(index)
+            return lines
+        
+        if self.parsed is not None and index < len(self.parsed):
+            message = self.parsed.message(index + 1)
+        else:
+            offset = self.index.offsets[index]
+            self.file.seek(offset)
+            message = ChatMessage.from_entry(index + 1, json_loads(self.file.readline()), offset)
+        lines = []
+        if message is not None:
+            lines = list(iter_chunk_lines(iter_formatted_chunks([message], 'pretty')))
+        
+        self.cache[index] = lines
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return lines
+    
+    def page(self, pos, height):
+        """Get up to `height` display lines starting at a position"""
+        index, line = pos
+        page = []
+        while len(page) < height and self.ensure(index + 1):
+            page.extend(self.lines(index)[line:line + height - len(page)])
+            index, line = index + 1, 0
+        return page
+    
+    def forward(self, pos, count):
+        """Move a position `count` lines down, stopping at the end"""
+        index, line = pos
+        while count > 0 and self.ensure(index + 1):
+            remaining = len(self.lines(index)) - line
+            if count < remaining:
+                return index, line + count
+            count -= remaining
+            index, line = index + 1, 0
+        return index, line
+    
+    def backward(self, pos, count):
+        """Move a position `count` lines up, stopping at the top"""
+        index, line = pos
+        while count > line:
+            count -= line
+            if index == 0:
+                return 0, 0
+            index -= 1
+            line = len(self.lines(index))
+        return index, line - count
+    
+    def end(self):
+        """Get the position after the last line (indexes the whole chat)"""
+        self.ensure(float('inf'))
+        return len(self.index), 0
+    
+    def find_message(self, number):
+        """Get the position of message `number`, or None if there is no such message"""
+        return (number - 1, 0) if number >= 1 and self.ensure(number) else None
+    
+    def search(self, term, pos):
+        """Get the position of the first line at or after pos containing term, or None"""
+        term = term.lower()
+        index, line = pos
+        while self.ensure(index + 1):
+            lines = self.lines(index)
+            for i in range(line, len(lines)):
+                if term in lines[i].lower():
+                    return index, i
+            index, line = index + 1, 0
+        return None
+
+PAGER_READ_AHEAD = 2  # Messages rendered ahead of the current page
+
+def display_with_pager(document, title="", start_message=None):
+    """Display a chat document with less-like paging behavior
+
+    Only the current page (plus a small read-ahead) is rendered, so the first
+    page appears at once however long the chat is. start_message opens the
+    pager at that message number.
+    """
+    terminal_size = get_terminal_size()
+    page_height = terminal_size.lines - 2  # Reserve 2 lines for status and input
+    
+    first_page = document.page((0, 0), page_height + 1)
+    if len(first_page) <= page_height:
+        # Content fits on screen, display directly
+        if title:
+            print_colored(title, Colors.BLUE)
+            print("=" * 60)
+            print()
+        print('\n'.join(first_page))
+        return
+    
+    def clamp(pos):
+        """Keep a full page below the position"""
+        return document.backward(document.forward(pos, page_height), page_height)
+    
+    top = (0, 0)
+    if start_message:
+        top = clamp(document.find_message(start_message) or top)
+    last_search = None
+    notice = ''
+    
+    if title:
+        print_colored(title, Colors.BLUE)
+        print("=" * 60)
+        print()
+    
+    while True:
+        # Display the current page
+        lines = document.page(top, page_height)
+        if not lines:
+            break
+        for line in lines:
+            print(line)
+        
+        bottom = document.forward(top, page_height)
+        document.ensure(bottom[0] + PAGER_READ_AHEAD)
+        
+        # Show status line
+        keys = "[Space/Enter: next, 'b': back, ':': message #, '/': search, 'q': quit]"
+        if not document.page(bottom, 1):
+            status = f"{Colors.BLUE}{notice}(END) - Press 'q' to quit, 'b' for back{Colors.NC}"
+        elif document.complete:
+            total = len(document.index)
+            percent = int((bottom[0] / total) * 100)
+            status = f"{Colors.BLUE}{notice}-- More -- (message {top[0] + 1} of {total}, {percent}%) {keys}{Colors.NC}"
+        else:
+            status = f"{Colors.BLUE}{notice}-- More -- (message {top[0] + 1}) {keys}{Colors.NC}"
+        notice = ''
+        
+        print(status, end='', flush=True)
+        
+        # Get user input
+        try:
+            # Read single character without Enter
+            import termios, tty
+            fd = sys.stdin.fileno()
+            old_settings = termios.tcgetattr(fd)
+            try:
+                tty.setraw(sys.stdin.fileno())
+                ch = sys.stdin.read(1)
+            finally:
+                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+            
+            # Clear the status line
+            print('\r' + ' ' * len(status.replace(Colors.BLUE, '').replace(Colors.NC, '')) + '\r', end='')
+            
+            if ch.lower() == 'q':
+                break
+            elif ch.lower() == 'b':
+                # Go back one page
+                top = document.backward(top, page_height)
+            elif ch == ' ':
+                # Space bar - next page
+                top = bottom
+            elif ch == '\r' or ch == '\n' or ch == 'j':
+                # Enter / j - next line (vim-like)
+                top = clamp(document.forward(top, 1))
+            elif ch == 'k':
+                # k - previous line (vim-like)
+                top = document.backward(top, 1)
+            elif ch == 'd':
+                # d - half page down
+                top = clamp(document.forward(top, page_height // 2))
+            elif ch == 'u':
+                # u - half page up
+                top = document.backward(top, page_height // 2)
+            elif ch == 'g':
+                # g - go to top
+                top = (0, 0)
+            elif ch == 'G':
+                # G - go to bottom
+                top = document.backward(document.end(), page_height)
+            elif ch == ':':
+                # : - jump to a message number
+                number = input("Go to message: ").strip()
+                pos = document.find_message(int(number)) if number.isdigit() else None
+                if pos is None:
+                    notice = f"No message {number} - "
+                else:
+                    top = clamp(pos)
+            elif ch == '/' or (ch == 'n' and last_search):
+                # / - search forward, n - repeat the last search
+                if ch == '/':
+                    last_search = input("/").strip() or last_search
+                if last_search:
+                    pos = document.search(last_search, document.forward(top, 1))
+                    if pos is None:
+                        notice = f"Pattern not found: {last_search} - "
+                    else:
+                        top = clamp(pos)
+            else:
+                # Any other key - next page
+                top = bottom
+                
+        except (ImportError, OSError):
+            # Fallback for systems without termios (Windows)
+            input()  # Just wait for Enter
+            top = bottom
+
+def parse_jsonl_file(file_path, format_type='pretty', output_file=None, first=None, last=None):
+    """Parse JSONL file and format output, optionally only messages first..last"""
+    render_chat(file_path, [(format_type, output_file)], first, last)
+
+def view_chat(file_path, format_type='pretty', output_file=None, first=None, last=None):
+    """View a specific chat file, optionally opened at message `first`"""
+    filename = Path(file_path).name
+    
+    if output_file and output_file != '-':
+        parse_jsonl_file(file_path, 'pretty', output_file, first, last)
+        return
+    
+    if not Path(file_path).exists():
+        print_colored(f"❌ File not found: {file_path}", Colors.RED)
+        return
+    
+    # Use pager for interactive viewing, rendering pages as they are shown
+    document = ChatDocument(file_path, get_message_index(file_path), open_parsed_cache(file_path))
+    try:
+        if not document.ensure(1):
+            print_colored('No valid messages found', Colors.YELLOW)
+            return
+        title = f"💬 Viewing: {filename}"
+        display_with_pager(document, title, first)
+    finally:
+        document.close()
+
+def chat_message_index(chat_file):
+    """Get the message index of a whole chat: the stored one, else one built by reading the chat"""
+    message_index = get_message_index(chat_file)
+    if message_index is None:
+        message_index = MessageIndex()
+        message_index.extend(chat_file)
+    return message_index
+
+def resolve_chat_link(link):
+    """Resolve a deep link (see open_chat_link) to (chat file, first, last), or None
+
+    first/last are the selected message numbers (None when not given). A missing
+    project or chat, or a message N the chat does not have, is reported.
+    """
+    target, anchor = link, ''
+    for separator in ('#', '@'):
+        if separator in link:
+            target, rest = link.split(separator, 1)
+            anchor = separator + rest
+            break
+    project_name, _, name = target.rpartition('/')
+    
+    project_dir = find_project_dir(project_name)
+    if project_dir is None:
+        print_colored(f"Project not found: {project_name}", Colors.RED)
+        return None
+    candidates = list_chat_files(project_dir, name)
+    exact = [chat_file for chat_file in candidates if chat_name(chat_file) == name]
+    if exact:
+        candidates = exact[:1]
+    if len(candidates) != 1:
+        print_colored(f"Chat not found: {name}" if not candidates else
+                      f"Ambiguous chat name: {name} ({len(candidates)} matches)", Colors.RED)
+        return None
+    chat_file = candidates[0]
+    
+    first = last = None
+    try:
+        if anchor.startswith('#'):
+            numbers = anchor[1:].split('-', 1)
+            first = int(numbers[0])
+            last = int(numbers[1]) if len(numbers) > 1 else None
+            count = len(chat_message_index(chat_file))
+            if not 1 <= first <= count:
+                print_colored(f"No message {first} in {name} (it has {count} messages)", Colors.YELLOW)
+                return None
+        elif anchor.startswith('@'):
+            start, _, end = anchor[1:].partition('..')
+            message_index = chat_message_index(chat_file)
+            first, last = message_index.numbers_between(
+                parse_link_time(start) if start else None, parse_link_time(end, end=True) if end else None)
+            if first is None:
+                print_colored(f"No messages in time range: {anchor[1:]}", Colors.YELLOW)
+                return None
+    except ValueError:
+        print_colored(f"Invalid link: {link}", Colors.RED)
+        return None
+    
+    return chat_file, first, last
+
+def open_chat_link(link, format_type='pretty', output_file=None):
+    """Open a deep link: project/chat, project/chat#N, project/chat#N-M or project/chat@FROM..TO
+
+    N and M are message numbers; FROM and TO are ISO dates or times (either may be
+    left out). Pretty output opens the pager at the first message; other formats
+    and -o export just the selected messages.
+    """
+    resolved = resolve_chat_link(link)
+    if resolved is None:
+        return
+    chat_file, first, last = resolved
+    
+    if format_type == 'pretty' and not output_file:
+        view_chat(chat_file, format_type, first=first, last=last)
+    else:
+        parse_jsonl_file(chat_file, format_type, output_file, first, last)
@@ -0,0 +1,366 @@
+"""Following a chat as it is written, and keeping the indexes warm (--follow, --watch)"""
+
+import os
+import select
+import sqlite3
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .common import (Colors, clean_project_name, find_project_dir, get_cache_dir, get_claude_projects_dir,
+                     json_loads, print_colored)
+from .chatfiles import CHAT_SUFFIXES, chat_name, is_archive, open_chat_file
+from .index import MessageIndex, get_chat_index, get_message_index
+from .render import FORMATTERS, ChatMessage
+from .viewer import resolve_chat_link
+
+# inotify (Linux) constants: a chat was written, created, moved or deleted in its directory
+IN_MODIFY = 0x002
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000  # Events were lost
+IN_IGNORED = 0x8000  # The watch was removed (its directory was deleted)
+
+FOLLOW_TAIL = 10  # Messages shown before following, unless a link selects the start
+FOLLOW_POLL_INTERVAL = 0.5  # Seconds between checks without inotify
+FOLLOW_WAKE_INTERVAL = 5  # Seconds between checks with inotify (a safety net)
+
+WATCH_POLL_INTERVAL = 2  # Seconds between sweeps of all chat files without inotify
+WATCH_SWEEP_INTERVAL = 60  # Seconds between sweeps with inotify (a safety net)
+WATCH_SETTLE_DELAY = 0.5  # Seconds to let a burst of writes settle before indexing it
+
+_libc = None
+
+def load_libc():
+    """Get libc through ctypes (for inotify), or None"""
+    global _libc
+    if _libc is None:
+        try:
+            import ctypes
+            import ctypes.util
+            _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        except (ImportError, OSError):
+            _libc = False
+    return _libc or None
+
+def open_inotify(directory=None, mask=IN_MODIFY | IN_MOVED_TO | IN_CREATE | IN_DELETE):
+    """Open an inotify instance watching a directory (if given), returning its file descriptor or None"""
+    libc = load_libc()
+    try:
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC) if libc else -1
+    except AttributeError:
+        return None
+    if fd < 0:
+        return None
+    if directory is not None and add_inotify_watch(fd, directory, mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def add_inotify_watch(inotify_fd, directory, mask):
+    """Watch one more directory, returning the watch descriptor (negative on failure)"""
+    return load_libc().inotify_add_watch(inotify_fd, os.fsencode(str(directory)), mask)
+
+def read_inotify_events(inotify_fd):
+    """Read the pending inotify events as (watch descriptor, mask, file name) tuples"""
+    try:
+        data = os.read(inotify_fd, 64 * 1024)
+    except OSError:
+        return []
+    events = []
+    pos = 0
+    while pos + 16 <= len(data):
+        wd, mask, _, length = struct.unpack_from('iIII', data, pos)
+        name = data[pos + 16:pos + 16 + length].split(b'\0', 1)[0]
+        events.append((wd, mask, os.fsdecode(name)))
+        pos += 16 + length
+    return events
+
+def wait_for_change(inotify_fd):
+    """Block until the watched directory changes (inotify) or the poll interval passed"""
+    if inotify_fd is None:
+        time.sleep(FOLLOW_POLL_INTERVAL)
+        return
+    ready, _, _ = select.select([inotify_fd], [], [], FOLLOW_WAKE_INTERVAL)
+    if ready:
+        try:
+            os.read(inotify_fd, 64 * 1024)  # Drain the events; the file is checked anyway
+        except OSError:
+            pass
+
+def find_latest_chat(project=None):
+    """Get the most recently modified chat of a project (or of all projects), or None"""
+    if project:
+        project_dir = find_project_dir(project)
+        if project_dir is None:
+            print_colored(f"Project not found: {project}", Colors.RED)
+            return None
+        chat_files = list(project_dir.glob('*.jsonl'))
+    else:
+        chat_files = list(get_claude_projects_dir().glob('*/*.jsonl'))
+    
+    latest = None
+    latest_mtime = None
+    for chat_file in chat_files:
+        try:
+            mtime = chat_file.stat().st_mtime_ns
+        except OSError:
+            continue
+        if latest_mtime is None or mtime > latest_mtime:
+            latest, latest_mtime = chat_file, mtime
+    if latest is None:
+        print_colored("No chats found", Colors.YELLOW)
+    return latest
+
+def print_follow_messages(file_path, message_index, start, format_type):
+    """Print the messages of a chat from index `start` on, as they are found in the message index"""
+    formatter = FORMATTERS[format_type]
+    with open_chat_file(file_path) as f:
+        for index in range(start, len(message_index)):
+            offset = message_index.offsets[index]
+            f.seek(offset)
+            try:
+                message = ChatMessage.from_entry(index + 1, json_loads(f.readline()), offset,
+                                                 formatter.needs_entries)
+            except ValueError:
+                continue
+            if message is not None:
+                for chunk in formatter.message(message):
+                    print(chunk)
+    sys.stdout.flush()
+
+def follow_chat(target=None, format_type='pretty'):
+    """Print the tail of a chat, then stream messages as they are appended (like tail -f)
+
+    target is a deep link (project/chat, optionally #N to start at message N), a
+    project (its most recent chat) or None (the most recent chat of all). Only
+    complete lines are shown, so a line still being written waits for its
+    newline; a replaced (rotated) or truncated file is followed from its start.
+    """
+    first = None
+    if target and '/' in target:
+        resolved = resolve_chat_link(target)
+        if resolved is None:
+            return
+        file_path, first, _ = resolved
+    else:
+        file_path = find_latest_chat(target)
+        if file_path is None:
+            return
+    
+    print_colored(f"👀 Following: {clean_project_name(file_path.parent.name)}/{chat_name(file_path)} "
+                  f"(Ctrl+C to stop)", Colors.BLUE)
+    print("=" * 60)
+    
+    message_index = get_message_index(file_path)
+    if message_index is None:
+        message_index = MessageIndex()
+    message_index.extend(file_path)
+    start = first - 1 if first else max(0, len(message_index) - FOLLOW_TAIL)
+    print_follow_messages(file_path, message_index, min(start, len(message_index)), format_type)
+    if is_archive(file_path):
+        print_colored("--- Archived chat: no more messages will be added ---", Colors.YELLOW)
+        return
+    inode = file_path.stat().st_ino
+    
+    inotify_fd = open_inotify(file_path.parent)
+    try:
+        while True:
+            wait_for_change(inotify_fd)
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue  # Being rotated: wait for the new file
+            
+            if st.st_ino != inode or st.st_size < message_index.offset:
+                print_colored("--- Chat file was replaced or truncated, following it from the start ---", Colors.YELLOW)
+                inode = st.st_ino
+                message_index = MessageIndex()
+            if st.st_size == message_index.offset:
+                continue
+            
+            start = len(message_index)
+            message_index.extend(file_path)
+            print_follow_messages(file_path, message_index, start, format_type)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        if inotify_fd is not None:
+            os.close(inotify_fd)
+
+class IndexWatcher:
+    """Keeps the metadata, message and full-text indexes up to date as chats are written
+
+    Project directories are watched with inotify: a changed chat file is
+    refreshed on its own (appended lines only), a created or deleted one
+    refreshes its project, and a new project directory is watched and indexed.
+    A periodic sweep re-stats everything, as a safety net with inotify and as
+    the only mechanism without it.
+    """
+    
+    DIR_MASK = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    
+    def __init__(self, index, claude_dir):
+        self.index = index
+        self.claude_dir = claude_dir
+        self.inotify_fd = open_inotify(claude_dir, IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+        self.watches = {}  # watch descriptor -> project dir
+        self.known = {}  # chat path -> (size, mtime_ns, message count) when last indexed
+        self.quiet = False
+    
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+    
+    def log(self, message):
+        if not self.quiet:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+    
+    def watch(self, project_dir):
+        """Watch a project directory (once)"""
+        if self.inotify_fd is not None and project_dir not in self.watches.values():
+            wd = add_inotify_watch(self.inotify_fd, project_dir, self.DIR_MASK)
+            if wd >= 0:
+                self.watches[wd] = project_dir
+    
+    def sweep(self):
+        """Re-stat every chat, indexing what changed; returns the number of chats"""
+        project_dirs = [d for d in self.claude_dir.iterdir() if d.is_dir()]
+        for project_dir in project_dirs:
+            self.watch(project_dir)
+            self.update_project(project_dir)
+        # Forget projects that were deleted
+        for project in {Path(path).parent for path in self.known} - set(project_dirs):
+            self.update_project(project)
+        return len(self.known)
+    
+    def update_project(self, project_dir):
+        """Bring all chats of a project up to date, forgetting deleted ones"""
+        chats = self.index.project_chats(project_dir)
+        for chat in chats:
+            self.update_chat(chat)
+        paths = {str(chat['file']) for chat in chats}
+        for path in [path for path in self.known if Path(path).parent == project_dir and path not in paths]:
+            del self.known[path]
+            self.log(f"Removed {clean_project_name(project_dir.name)}/{chat_name(path)}")
+    
+    def update_chat(self, chat):
+        """Extend the message and full-text indexes of a chat whose metadata was refreshed"""
+        path = str(chat['file'])
+        known = self.known.get(path)
+        if known is not None and known[:2] == (chat['size'], chat['mtime_ns']):
+            return
+        self.index.message_index(chat)
+        self.index.update_search_index(chat)
+        self.known[path] = (chat['size'], chat['mtime_ns'], chat['message_count'])
+        
+        name = f"{clean_project_name(chat['file'].parent.name)}/{chat_name(chat['file'])}"
+        if known is None:
+            self.log(f"Indexed {name} ({chat['message_count']} message(s))")
+        elif chat['message_count'] != known[2]:
+            self.log(f"Indexed {name} ({chat['message_count'] - known[2]:+d} message(s))")
+    
+    def update_file(self, chat_file):
+        """Refresh one changed chat file"""
+        try:
+            self.update_chat(self.index.chat_info(chat_file))
+        except FileNotFoundError:
+            self.update_project(chat_file.parent)
+    
+    def handle_events(self, events):
+        """Index what a batch of inotify events touched; returns False if events were lost"""
+        projects, files = set(), set()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                return False
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            project_dir = self.watches.get(wd)
+            if project_dir is None:
+                # In the projects directory: a project was created, moved or deleted
+                projects.add(self.claude_dir / name)
+            elif name.endswith(CHAT_SUFFIXES):
+                if mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                    projects.add(project_dir)
+                else:
+                    files.add(project_dir / name)
+        
+        for project_dir in projects:
+            if project_dir.is_dir():
+                self.watch(project_dir)
+            self.update_project(project_dir)
+        for chat_file in files:
+            if chat_file.parent not in projects:
+                self.update_file(chat_file)
+        return True
+    
+    def run(self):
+        """Index changes as they happen, until interrupted"""
+        interval = WATCH_SWEEP_INTERVAL if self.inotify_fd is not None else WATCH_POLL_INTERVAL
+        next_sweep = time.time() + interval
+        while True:
+            timeout = max(0, next_sweep - time.time())
+            if self.inotify_fd is None:
+                time.sleep(timeout)
+                ready = False
+            else:
+                ready = select.select([self.inotify_fd], [], [], timeout)[0]
+            
+            try:
+                if ready:
+                    # Let the burst of writes settle, then index it in one go
+                    time.sleep(WATCH_SETTLE_DELAY)
+                    events = []
+                    while True:
+                        batch = read_inotify_events(self.inotify_fd)
+                        if not batch:
+                            break
+                        events.extend(batch)
+                    if self.handle_events(events):
+                        continue
+                self.sweep()
+            except sqlite3.Error as e:
+                print(f'Warning: Chat index error: {e}', file=sys.stderr)
+            except OSError:
+                pass
+            next_sweep = time.time() + interval
+
+def watch_index():
+    """Keep the indexes warm in the foreground (Ctrl+C to stop)"""
+    index = get_chat_index()
+    if index is None:
+        print_colored("❌ --watch needs the chat index (it cannot be combined with --no-index)", Colors.RED)
+        return
+    
+    lock_file = open(get_cache_dir() / 'watch.lock', 'a')
+    try:
+        import fcntl
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        pass
+    except OSError:
+        print_colored("❌ Another --watch is already keeping the index up to date", Colors.RED)
+        lock_file.close()
+        return
+    
+    claude_dir = get_claude_projects_dir()
+    watcher = IndexWatcher(index, claude_dir)
+    mode = 'inotify' if watcher.inotify_fd is not None else f'polling every {WATCH_POLL_INTERVAL}s'
+    print_colored(f"👀 Indexing chats in {claude_dir} as they change ({mode}, Ctrl+C to stop)", Colors.BLUE)
+    try:
+        started = time.time()
+        watcher.quiet = True
+        count = watcher.sweep()
+        watcher.quiet = False
+        print_colored(f"✅ {count} chat(s) indexed in {time.time() - started:.1f}s; watching...", Colors.GREEN)
+        watcher.run()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+        lock_file.close()
@@ -0,0 +1,17 @@
+"""Building chat files for the tests."""
+
+import json
+
+
+def message(role, text, timestamp='2025-09-01T10:00:00Z', tools=(), **extra):
+    """A chat entry as Claude writes it: text plus optional (tool name, input) tool uses."""
+    content = [{'type': 'text', 'text': text}] + [
+        {'type': 'tool_use', 'id': f'toolu_{i}', 'name': name, 'input': tool_input}
+        for i, (name, tool_input) in enumerate(tools)]
+    return {'type': role, 'message': {'role': role, 'content': content}, 'timestamp': timestamp, **extra}
+
+
+def jsonl(entries):
+    """Encode entries (dicts, or raw strings written as they are) as JSONL bytes."""
+    return b''.join((entry if isinstance(entry, str) else json.dumps(entry)).encode() + b'\n'
+                    for entry in entries)
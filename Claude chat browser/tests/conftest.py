@@ -0,0 +1,39 @@
+"""Shared fixtures for the claude-reader tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# The claude_reader package next to claude-reader.py, and chat_entries here
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from chat_entries import jsonl  # noqa: E402
+from claude_reader import index, parsed_cache  # noqa: E402
+
+
+@pytest.fixture
+def projects(tmp_path, monkeypatch):
+    """An empty projects directory and cache, with the index and cache singletons reset."""
+    projects_dir = tmp_path / 'projects'
+    projects_dir.mkdir()
+    monkeypatch.setenv('CLAUDE_PROJECTS_DIR', str(projects_dir))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setattr(index, '_chat_index', None)
+    monkeypatch.setattr(index, '_chat_index_disabled', False)
+    monkeypatch.setattr(parsed_cache, '_parsed_cache_disabled', False)
+    yield projects_dir
+    if index._chat_index is not None:
+        index._chat_index.close()
+
+
+@pytest.fixture
+def write_chat(projects):
+    """Write a chat file from entries, as <project>/<name>.jsonl, and return its path."""
+    def write(entries, name='chat1', project='-home-user-src-app'):
+        chat_file = projects / project / f'{name}.jsonl'
+        chat_file.parent.mkdir(exist_ok=True)
+        chat_file.write_bytes(jsonl(entries))
+        return chat_file
+    return write
@@ -0,0 +1,149 @@
+"""Tests for reading .jsonl.gz and .jsonl.zst chat archives."""
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+from chat_entries import message
+from claude_reader import chatfiles
+from claude_reader.archive import archive_chats, compress_chat
+from claude_reader.chatfiles import chat_name, list_chat_files, open_chat_file, scan_chat_file
+from claude_reader.export import open_chat_messages
+from claude_reader.index import get_chat_index, get_chat_infos
+from claude_reader.render import iter_chat_entries
+from claude_reader.search import plan_scan_shards, search_content, search_shard
+
+
+@pytest.fixture(params=['gz', 'zst'])
+def compression(request):
+    if request.param == 'zst':
+        pytest.importorskip('zstandard')
+    return request.param
+
+
+@pytest.fixture
+def chat_file(write_chat):
+    entries = [message('user' if i % 2 == 0 else 'assistant', f'message {i} ' + 'padding ' * (i % 13),
+                       f'2025-09-01T10:{i:02d}:00Z') for i in range(50)]
+    entries[17]['message']['content'][0]['text'] += ' with a needle'
+    return write_chat(entries)
+
+
+def compressed(chat_file, compression):
+    """A compressed copy of a chat next to it"""
+    archive_file = chat_file.with_name(f'{chat_file.name}.{compression}')
+    compress_chat(chat_file, archive_file, compression)
+    return archive_file
+
+
+def test_archive_reads_as_the_chat(chat_file, compression):
+    archive_file = compressed(chat_file, compression)
+    data = chat_file.read_bytes()
+
+    with open_chat_file(archive_file) as f:
+        assert f.read() == data
+        # Offsets are offsets into the decompressed lines, backwards too
+        middle = data.index(b'\n', len(data) // 2) + 1
+        f.seek(middle)
+        assert f.readline() == data[middle:data.index(b'\n', middle) + 1]
+        f.seek(10)
+        assert f.tell() == 10
+        assert f.read(20) == data[10:30]
+
+
+def test_archive_names_and_listing(chat_file, compression):
+    archive_file = compressed(chat_file, compression)
+    assert chatfiles.is_archive(archive_file)
+    assert chat_name(archive_file) == 'chat1'
+    assert list_chat_files(chat_file.parent) == sorted([chat_file, archive_file])
+
+
+def test_scan_and_entries_match_the_chat(chat_file, compression):
+    archive_file = compressed(chat_file, compression)
+
+    assert scan_chat_file(archive_file) == scan_chat_file(chat_file)
+    entries = list(iter_chat_entries(archive_file, with_offsets=True))
+    assert entries == list(iter_chat_entries(chat_file, with_offsets=True))
+    offset = entries[30][0]
+    assert next(iter_chat_entries(archive_file, start=offset, start_line=31)) == entries[30][1]
+
+
+def test_live_search_in_archive(chat_file, compression):
+    archive_file = compressed(chat_file, compression)
+    chat_file.unlink()
+
+    assert plan_scan_shards([archive_file], 100) == [(archive_file, 0, None)]
+    line_count, matches = search_shard((archive_file, 0, None), 'needle')
+    assert line_count == 50
+    assert [(line, role) for line, role, preview in matches] == [(18, 'assistant')]
+
+
+def test_archive_chats_keeps_chat_readable(chat_file, compression, capsys):
+    old = time.time() - 10 * 86400
+    os.utime(chat_file, (old, old))
+    index = get_chat_index()
+    count = index.chat_info(chat_file)['message_count']
+
+    archive_chats(5, compression=compression)
+
+    archive_file = chat_file.with_name(f'chat1.jsonl.{compression}')
+    assert not chat_file.exists()
+    assert archive_file.stat().st_mtime == pytest.approx(old)
+    assert '1 chat(s) archived' in capsys.readouterr().out
+    # The index entry moved to the archive, so it is not decompressed to be listed
+    assert index.chat_info(archive_file)['message_count'] == count
+
+    messages = list(open_chat_messages(archive_file, first=18, last=19))
+    assert [message.number for message in messages] == [18, 19]
+    assert 'needle' in messages[0].content
+
+    search_content('needle')
+    assert 'Home User Src App/chat1#18' in capsys.readouterr().out
+
+
+def test_recent_chats_are_not_archived(chat_file, compression, capsys):
+    archive_chats(5, compression=compression)
+    assert chat_file.exists()
+    assert 'No chats to archive' in capsys.readouterr().out
+
+
+def test_zst_archive_without_zstandard(chat_file, monkeypatch):
+    archive_file = chat_file.with_name('chat1.jsonl.zst')
+    archive_file.write_bytes(b'')
+    monkeypatch.setattr(chatfiles, 'zstandard', None)
+
+    with pytest.raises(OSError, match='needs zstandard'):
+        open_chat_file(archive_file)
+
+
+@pytest.mark.parametrize('failing_step', ['index', 'unlink'])
+def test_failed_archive_is_rolled_back(chat_file, failing_step, monkeypatch, capsys):
+    old = time.time() - 10 * 86400
+    os.utime(chat_file, (old, old))
+    index = get_chat_index()
+    count = index.chat_info(chat_file)['message_count']
+    unlink = type(chat_file).unlink
+
+    def move_chat(chat_file, new_file):
+        raise sqlite3.OperationalError('disk I/O error')
+
+    def unlink_all_but_the_chat(path, *args, **kwargs):
+        if path == chat_file:
+            raise PermissionError('read-only')
+        return unlink(path, *args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        if failing_step == 'index':
+            patch.setattr(index, 'move_chat', move_chat)
+        else:
+            patch.setattr(type(chat_file), 'unlink', unlink_all_but_the_chat)
+        archive_chats(5)
+
+    assert 'Failed to archive chat1.jsonl' in capsys.readouterr().out
+    assert os.listdir(chat_file.parent) == ['chat1.jsonl']
+    assert [(chat['file'], chat['message_count']) for chat in get_chat_infos(chat_file.parent)] == [(chat_file, count)]
+
+    archive_chats(5)
+    assert os.listdir(chat_file.parent) == ['chat1.jsonl.gz']
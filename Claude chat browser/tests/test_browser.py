@@ -0,0 +1,86 @@
+"""Tests for the interactive browser's project model (ProjectModel)."""
+
+import sqlite3
+import time
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import index as index_module
+from claude_reader.browser import ProjectModel
+from claude_reader.index import chat_index_disabled, get_chat_index, get_chat_infos, scan_project_chats
+
+
+@pytest.fixture
+def model(projects):
+    model = ProjectModel(projects, interval=0.05)
+    yield model
+    model.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.02)
+
+
+def message_counts(model):
+    return {info['name']: info['total_messages'] for info in model.projects()}
+
+
+def test_refresh_reads_only_changed_projects(write_chat, model):
+    chat_file = write_chat([message('user', 'alpha')])
+    write_chat([message('user', 'beta')], project='-home-user-src-api')
+    loaded = []
+
+    def load_chats(project_dir):
+        loaded.append(project_dir.name)
+        return scan_project_chats(project_dir)
+    model.refresh(load_chats)
+    model.refresh(load_chats)
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('assistant', 'gamma')]))
+    model.refresh(load_chats)
+
+    assert sorted(loaded) == ['-home-user-src-api', '-home-user-src-app', '-home-user-src-app']
+    assert message_counts(model) == {'Home User Src App': 2, 'Home User Src Api': 1}
+    assert [chat['message_count'] for chat in model.chats(chat_file.parent)] == [2]
+
+
+def test_background_refresh_picks_up_new_chats(write_chat, model):
+    chat_file = write_chat([message('user', 'alpha')])
+    model.start()
+    assert message_counts(model) == {'Home User Src App': 1}
+
+    write_chat([message('user', 'beta'), message('assistant', 'gamma')], name='chat2')
+    write_chat([message('user', 'delta')], project='-home-user-src-api')
+
+    wait_for(lambda: message_counts(model) == {'Home User Src App': 3, 'Home User Src Api': 1})
+    assert sorted(chat['file'].name for chat in model.chats(chat_file.parent)) == ['chat1.jsonl', 'chat2.jsonl']
+    assert not chat_index_disabled()
+
+
+def test_busy_index_is_retried_not_disabled(write_chat, monkeypatch, capsys):
+    chat_file = write_chat([message('user', 'alpha')])
+    index = get_chat_index()
+    project_chats = index.project_chats
+    failures = []
+
+    def locked_project_chats(project_dir):
+        if failures:
+            failures.pop()
+            raise sqlite3.OperationalError('database is locked')
+        return project_chats(project_dir)
+    monkeypatch.setattr(index, 'project_chats', locked_project_chats)
+
+    failures[:] = [1]
+    assert [chat['message_count'] for chat in get_chat_infos(chat_file.parent)] == [1]
+    assert capsys.readouterr().err == ''
+
+    # Still locked when retried: this listing reads the files, the index stays on
+    failures[:] = [1, 2]
+    assert [chat['message_count'] for chat in get_chat_infos(chat_file.parent)] == [1]
+    assert 'Chat index busy' in capsys.readouterr().err
+    assert not chat_index_disabled()
+    assert index_module.get_chat_index() is index
@@ -0,0 +1,166 @@
+"""Tests for the incremental refresh of the ChatIndex."""
+
+import os
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import index as index_module
+from claude_reader.common import Colors
+from claude_reader.index import ChatIndex
+from claude_reader.search import search_content
+
+
+@pytest.fixture
+def chat_index(projects, tmp_path):
+    """A ChatIndex in the test cache directory, closed after the test."""
+    chat_index = ChatIndex(tmp_path / 'cache' / 'index.sqlite3')
+    yield chat_index
+    chat_index.close()
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Record the start offset of every scan_chat_file() call of the index."""
+    starts = []
+    scan = index_module.scan_chat_file
+
+    def recording_scan(chat_file, start=0):
+        starts.append(start)
+        return scan(chat_file, start)
+    monkeypatch.setattr(index_module, 'scan_chat_file', recording_scan)
+    return starts
+
+
+def refresh(chat_index, chat_file):
+    """Refresh the index entry of a chat and bring its search rows up to date"""
+    chat = chat_index.chat_info(chat_file)
+    chat_index.update_search_index(chat)
+    return chat
+
+
+def search_lines(chat_index, term):
+    return [row['line'] for row in chat_index.search(term)]
+
+
+def touch(chat_file, mtime_ns):
+    """Give a rewritten file a distinct mtime, so the test does not rely on timer resolution"""
+    os.utime(chat_file, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_chat_is_not_rescanned(chat_index, write_chat, scans):
+    chat_file = write_chat([message('user', 'alpha'), message('assistant', 'beta')])
+
+    first = chat_index.chat_info(chat_file)
+    second = chat_index.chat_info(chat_file)
+
+    assert scans == [0]
+    assert second['message_count'] == first['message_count'] == 2
+
+
+def test_append_scans_only_the_tail(chat_index, write_chat, scans):
+    chat_file = write_chat([message('user', 'alpha', '2025-09-01T10:00:00Z'),
+                            message('assistant', 'beta', '2025-09-01T10:01:00Z')])
+    chat = refresh(chat_index, chat_file)
+    size = chat_file.stat().st_size
+    assert chat['offset'] == size
+
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('user', 'gamma appended', '2025-09-01T10:02:00Z')]))
+    chat = refresh(chat_index, chat_file)
+
+    assert scans == [0, size]
+    assert chat['message_count'] == 3
+    assert chat['first_timestamp'] == '2025-09-01T10:00:00Z'
+    assert chat['last_timestamp'] == '2025-09-01T10:02:00Z'
+    assert chat['offset'] == chat_file.stat().st_size
+    assert search_lines(chat_index, 'alpha') == [1]
+    assert search_lines(chat_index, 'gamma') == [3]
+    assert len(chat_index.message_index(chat)) == 3
+
+
+def test_partial_line_is_rescanned_once_complete(chat_index, write_chat):
+    chat_file = write_chat([message('user', 'alpha')])
+    line = jsonl([message('assistant', 'delta written in two parts')])
+    with open(chat_file, 'ab') as f:
+        f.write(line[:20])
+
+    chat = refresh(chat_index, chat_file)
+    assert (chat['message_count'], chat['partial']) == (2, 1)
+    assert search_lines(chat_index, 'delta') == []
+
+    with open(chat_file, 'ab') as f:
+        f.write(line[20:])
+    chat = refresh(chat_index, chat_file)
+
+    assert (chat['message_count'], chat['partial']) == (2, 0)
+    assert search_lines(chat_index, 'delta') == [2]
+
+
+def test_truncated_chat_is_rescanned(chat_index, write_chat, scans):
+    chat_file = write_chat([message('user', 'alpha'), message('assistant', 'beta'), message('user', 'gamma')])
+    chat = refresh(chat_index, chat_file)
+    inode = chat['inode']
+    chat_index.save_chat_stats(chat['id'], chat['offset'], {'messages': 3})
+
+    # Rewritten in place: same inode, smaller size
+    with open(chat_file, 'r+b') as f:
+        f.truncate(0)
+        f.write(jsonl([message('user', 'epsilon')]))
+    touch(chat_file, chat['mtime_ns'] + 10**9)
+    chat = refresh(chat_index, chat_file)
+
+    assert chat['inode'] == inode
+    assert scans == [0, 0]
+    assert chat['message_count'] == 1
+    assert chat_index.chat_stats(chat['id']) == (0, None)
+    assert search_lines(chat_index, 'alpha') == []
+    assert search_lines(chat_index, 'epsilon') == [1]
+    assert len(chat_index.message_index(chat)) == 1
+
+
+def test_replaced_chat_is_rescanned(chat_index, write_chat, scans, tmp_path):
+    chat_file = write_chat([message('user', 'alpha'), message('assistant', 'beta')])
+    chat = refresh(chat_index, chat_file)
+
+    # A new file moved over the old one: new inode, even though it is larger
+    replacement = tmp_path / 'replacement.jsonl'
+    replacement.write_bytes(jsonl([message('user', 'zeta'), message('assistant', 'eta'),
+                                   message('user', 'theta')]))
+    os.replace(replacement, chat_file)
+    chat = refresh(chat_index, chat_file)
+
+    assert chat['inode'] == chat_file.stat().st_ino
+    assert scans == [0, 0]
+    assert chat['message_count'] == 3
+    assert search_lines(chat_index, 'alpha') == []
+    assert search_lines(chat_index, 'theta') == [3]
+
+
+def test_deleted_chat_is_forgotten(chat_index, write_chat):
+    kept = write_chat([message('user', 'alpha')], name='kept')
+    deleted = write_chat([message('user', 'omega')], name='deleted')
+    for chat in chat_index.project_chats(kept.parent):
+        chat_index.update_search_index(chat)
+
+    deleted.unlink()
+    chats = chat_index.project_chats(kept.parent)
+
+    assert [chat['file'] for chat in chats] == [kept]
+    assert search_lines(chat_index, 'omega') == []
+
+
+def test_indexed_search_previews_whole_words(write_chat, capsys):
+    text = 'Preparing the deployment ' * 12 + 'then restarted the kubernetes cluster nodes' + ' and waited' * 12
+    write_chat([message('user', 'Hello'), message('assistant', text, tools=[('Bash', {'command': 'kubectl'})])])
+
+    search_content('Kubernetes')
+
+    out = capsys.readouterr().out
+    line = next(line for line in out.splitlines() if line.lstrip().startswith('Line 2'))
+    preview = line.split('): ', 1)[1]
+    assert f'restarted the {Colors.YELLOW}kubernetes{Colors.NC} cluster nodes and waited' in preview
+    assert preview.startswith('...') and preview.endswith('...')
+    words = preview.replace(Colors.YELLOW, '').replace(Colors.NC, '').strip('.').split()
+    assert set(words) <= set(text.split())
+    assert '1 match(es) in 1 chat(s)' in out
@@ -0,0 +1,73 @@
+"""Tests for the project and chat listings served from the metadata index."""
+
+import os
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import index as index_module
+from claude_reader.browser import get_project_info
+from claude_reader.common import get_cache_dir
+from claude_reader.index import disable_chat_index, get_chat_infos
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Record the name of every chat file the index reads"""
+    names = []
+    scan = index_module.scan_chat_file
+
+    def recording_scan(chat_file, *args, **kwargs):
+        names.append(chat_file.name)
+        return scan(chat_file, *args, **kwargs)
+    monkeypatch.setattr(index_module, 'scan_chat_file', recording_scan)
+    return names
+
+
+def test_project_info_counts_chats_and_messages(write_chat):
+    write_chat([message('user', 'alpha', '2025-09-01T10:00:00Z'),
+                message('assistant', 'beta', '2025-09-01T10:05:00Z')], name='first')
+    chat_file = write_chat([message('user', 'gamma', '2025-09-02T09:00:00Z')], name='second')
+
+    info = get_project_info(chat_file.parent)
+
+    assert (info['name'], info['file_count'], info['total_messages']) == ('Home User Src App', 2, 3)
+    chats = {chat['file'].name: chat for chat in get_chat_infos(chat_file.parent)}
+    assert chats['first.jsonl']['first_timestamp'] == '2025-09-01T10:00:00Z'
+    assert chats['first.jsonl']['last_timestamp'] == '2025-09-01T10:05:00Z'
+
+
+def test_warm_listing_does_not_read_chats(write_chat, scans):
+    write_chat([message('user', 'alpha')], name='first')
+    chat_file = write_chat([message('user', 'beta'), message('assistant', 'gamma')], name='second')
+
+    cold = get_chat_infos(chat_file.parent)
+    warm = get_chat_infos(chat_file.parent)
+
+    assert sorted(scans) == ['first.jsonl', 'second.jsonl']
+    assert [chat['message_count'] for chat in warm] == [chat['message_count'] for chat in cold] == [1, 2]
+
+
+def test_changed_chat_is_read_again(write_chat, scans):
+    write_chat([message('user', 'alpha')], name='first')
+    chat_file = write_chat([message('user', 'beta')], name='second')
+    get_chat_infos(chat_file.parent)
+    mtime_ns = chat_file.stat().st_mtime_ns
+
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('assistant', 'gamma')]))
+    os.utime(chat_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    chats = get_chat_infos(chat_file.parent)
+
+    assert sorted(scans) == ['first.jsonl', 'second.jsonl', 'second.jsonl']
+    assert [chat['message_count'] for chat in chats] == [1, 2]
+
+
+def test_listing_without_index(write_chat):
+    chat_file = write_chat([message('user', 'alpha'), message('assistant', 'beta')])
+    disable_chat_index()
+
+    chats = get_chat_infos(chat_file.parent)
+
+    assert [(chat['file'], chat['message_count']) for chat in chats] == [(chat_file, 2)]
+    assert not (get_cache_dir() / 'index.sqlite3').exists()
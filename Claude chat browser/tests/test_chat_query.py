@@ -0,0 +1,209 @@
+"""Tests for the content search query language (ChatQuery)."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from chat_entries import message
+from claude_reader.common import Colors, get_cache_dir
+from claude_reader.index import MessageIndex, get_chat_index
+from claude_reader.search import ChatQuery, plan_query_tasks, search_chat_query, search_content
+
+SEPT_1 = 1756684800000  # 2025-09-01T00:00:00Z in epoch milliseconds
+DAY_MS = 86400000
+
+
+def candidate(text, role='user', tools=(), project='home user src webapp', timestamp=SEPT_1 + 3600000):
+    """A message as search_chat_query() hands it to ChatQuery.match()"""
+    return {'text': text, 'folded': text.lower(), 'role': role, 'tools': [tool.lower() for tool in tools],
+            'project': (project, project.replace(' ', '-')), 'timestamp': timestamp}
+
+
+@pytest.mark.parametrize('text, tree', [
+    ('docker', ('text', 'docker')),
+    ('Docker Compose', ('text', 'docker compose')),
+    ('Docker AND Compose', ('and', [('text', 'docker'), ('text', 'compose')])),
+    ('docker compose role:user', ('and', [('text', 'docker'), ('text', 'compose'), ('role', 'user')])),
+    ('"Docker Compose"', ('text', 'docker compose')),
+    ('a AND b OR c', ('or', [('and', [('text', 'a'), ('text', 'b')]), ('text', 'c')])),
+    ('-compose', ('not', ('text', 'compose'))),
+    ('NOT compose', ('not', ('text', 'compose'))),
+    ('-(a OR b) c', ('and', [('not', ('or', [('text', 'a'), ('text', 'b')])), ('text', 'c')])),
+    ('role:User tool:Bash project:"web app"',
+     ('and', [('role', 'user'), ('tool', 'bash'), ('project', 'web app')])),
+    ('from:2025-09-01 to:2025-09-01', ('and', [('from', SEPT_1), ('to', SEPT_1 + DAY_MS - 1)])),
+    ('to:2025-09-01T12:00:00', ('to', SEPT_1 + DAY_MS // 2)),
+    ('url:example', ('text', 'url:example')),
+])
+def test_parse(text, tree):
+    assert ChatQuery(text).tree == tree
+
+
+def test_parse_regex():
+    kind, pattern = ChatQuery(r'/docker(file)?\/x/').tree
+    assert kind == 'regex'
+    assert pattern.pattern == r'docker(file)?\/x'
+    assert pattern.flags & re.IGNORECASE
+
+
+@pytest.mark.parametrize('text, error', [
+    ('', 'empty query'),
+    ('   ', 'empty query'),
+    ('(docker', 'missing closing parenthesis'),
+    ('docker)', "unexpected ')'"),
+    ('docker OR', 'missing search term'),
+    ('NOT', 'missing search term'),
+    ('""', 'empty phrase'),
+    ('/(/', 'invalid regular expression'),
+    ('from:yesterday', 'invalid date from:yesterday'),
+    ('"unclosed', 'cannot parse'),
+])
+def test_parse_errors(text, error):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        ChatQuery(text)
+
+
+@pytest.mark.parametrize('text, matches', [
+    ('docker', True),
+    ('DOCKER compose', True),
+    ('compose docker', False),
+    ('compose AND docker', True),
+    ('docker AND kubernetes', False),
+    ('docker OR kubernetes', True),
+    ('docker -compose', False),
+    ('docker -(kubernetes OR helm)', True),
+    ('"docker compose"', True),
+    ('"compose docker"', False),
+    ('/dock(er|ing) comp/', True),
+    ('role:user docker', True),
+    ('role:assistant docker', False),
+    ('tool:bash', True),
+    ('tool:edit', False),
+    ('project:webapp', True),
+    ('project:home-user', True),
+    ('project:api', False),
+    ('from:2025-09-01 to:2025-09-01', True),
+    ('from:2025-09-02', False),
+    ('to:2025-08-31', False),
+])
+def test_match(text, matches):
+    found = candidate('Run Docker Compose up', tools=['Bash'])
+    assert ChatQuery(text).match(found) is matches
+
+
+def test_to_filter_skips_messages_without_timestamp():
+    assert not ChatQuery('to:2025-09-01').match(candidate('docker', timestamp=0))
+
+
+def test_required_filters_and_time_range():
+    query = ChatQuery('docker from:2025-09-01 from:2025-09-03 to:2025-09-10 (role:user OR role:system)')
+    assert query.required('text') == ['docker']
+    assert query.required('role') == []
+    assert query.time_range() == (SEPT_1 + 2 * DAY_MS, SEPT_1 + 10 * DAY_MS - 1)
+    assert ChatQuery('docker').time_range() == (None, None)
+
+
+def test_plain_term():
+    assert ChatQuery('"docker compose"').plain_term() == 'docker compose'
+    assert ChatQuery('docker compose').plain_term() == 'docker compose'
+    assert ChatQuery('docker AND compose').plain_term() is None
+    assert ChatQuery('docker -compose').plain_term() is None
+    assert ChatQuery('role:user').plain_term() is None
+
+
+def test_literals_skip_terms_json_escapes():
+    query = ChatQuery(r'docker C:\temp tool:Bash café -nginx (a OR b)')
+    assert query.literals() == [b'docker', b'bash']
+
+
+def test_matches_project_and_chat():
+    query = ChatQuery('project:webapp from:2025-09-02 to:2025-09-03')
+    assert query.matches_project(Path('-home-user-src-webapp'))
+    assert not query.matches_project(Path('-home-user-src-api'))
+    assert query.matches_chat({'first_timestamp': '2025-09-01T10:00:00Z', 'last_timestamp': '2025-09-02T10:00:00Z'})
+    assert not query.matches_chat({'first_timestamp': '2025-09-01T10:00:00Z',
+                                   'last_timestamp': '2025-09-01T12:00:00Z'})
+    assert not query.matches_chat({'first_timestamp': '2025-09-04T10:00:00Z',
+                                   'last_timestamp': '2025-09-05T10:00:00Z'})
+    assert query.matches_chat({'first_timestamp': None, 'last_timestamp': None})
+
+
+def test_candidates_filter_by_role_and_time():
+    message_index = MessageIndex()
+    entries = [message('user', 'a', '2025-09-01T10:00:00Z'), message('assistant', 'b', '2025-09-02T10:00:00Z'),
+               message('user', 'c', '2025-09-03T10:00:00Z'), message('system', 'd', '2025-09-03T11:00:00Z')]
+    for i, entry in enumerate(entries):
+        message_index.add(i * 100, i + 1, entry)
+
+    offsets, numbers = ChatQuery('role:user from:2025-09-02').candidates(message_index)
+    assert (list(offsets), list(numbers)) == ([200], [3])
+    offsets, numbers = ChatQuery('x').candidates(message_index)
+    assert list(numbers) == [1, 2, 3, 4]
+    # Contradictory role filters leave nothing to read
+    assert list(ChatQuery('role:user role:assistant').candidates(message_index)[1]) == []
+
+
+def test_preview_highlights_first_match():
+    text = 'word ' * 40 + 'the Docker daemon ' + 'tail ' * 40
+    preview = ChatQuery('daemon OR docker').preview(text)
+    assert f'{Colors.YELLOW}Docker{Colors.NC} daemon' in preview
+    assert preview.startswith('...') and preview.endswith('...')
+    # Whole words at the edges
+    assert preview.startswith('...word ') and preview.endswith(' tail...')
+    assert ChatQuery('-docker').preview('short text') == 'short text'
+
+
+def test_search_chat_query_reads_only_matching_messages(write_chat):
+    chat_file = write_chat([
+        message('user', 'Set up Docker for the api', '2025-09-01T10:00:00Z'),
+        message('assistant', 'Running docker build', '2025-09-01T10:01:00Z', tools=[('Bash', {'command': 'ls'})]),
+        'not json docker',
+        message('user', 'Thanks', '2025-09-01T10:02:00Z'),
+        message('assistant', 'Editing the Dockerfile', '2025-09-01T10:03:00Z',
+                tools=[('Edit', {'file_path': '/src/Dockerfile'})]),
+    ])
+    query = ChatQuery('docker -role:user')
+
+    matches = search_chat_query((chat_file, chat_file.parent, None, None), query)
+
+    assert [(number, role) for number, role, timestamp, preview in matches] == [(2, 'assistant'), (4, 'assistant')]
+
+
+def test_search_content_runs_queries(write_chat, capsys):
+    write_chat([message('user', 'Docker compose question'), message('assistant', 'Use docker compose up',
+                                                                       tools=[('Bash', {'command': 'up'})])])
+    write_chat([message('user', 'Docker in another project')], project='-home-user-src-api')
+
+    search_content('docker tool:bash')
+    out = capsys.readouterr().out
+
+    assert 'Home User Src App/chat1#2' in out
+    assert '1 match(es) in 1 chat(s)' in out
+
+    search_content('docker (')
+    assert 'Invalid query: missing search term' in capsys.readouterr().out
+
+
+def test_live_query_does_not_use_the_index(write_chat, capsys):
+    write_chat([message('user', 'Docker compose question'), message('assistant', 'Use docker compose up',
+                                                                       tools=[('Bash', {'command': 'up'})])])
+
+    search_content('docker tool:bash', live=True)
+
+    assert 'Home User Src App/chat1#2' in capsys.readouterr().out
+    assert not (get_cache_dir() / 'index.sqlite3').exists()
+
+
+def test_plan_sends_unindexed_chats_to_workers(write_chat):
+    indexed = write_chat([message('user', 'docker one'), message('assistant', 'docker two')], name='indexed')
+    cold = write_chat([message('user', 'docker three')], name='cold')
+    index = get_chat_index()
+    index.message_index(index.chat_info(indexed))
+
+    tasks = plan_query_tasks(ChatQuery('docker role:user'), index)
+
+    by_file = {chat_file.name: (offsets, numbers) for chat_file, project_dir, offsets, numbers in tasks}
+    assert by_file['cold.jsonl'] == (None, None)
+    assert list(by_file['indexed.jsonl'][1]) == [1]
+    assert index.load_message_index(index.chat_info(cold)['id']).offset == 0
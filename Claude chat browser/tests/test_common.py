@@ -0,0 +1,50 @@
+"""Tests for the shared helpers: JSON decoding with and without orjson (json_loads)."""
+
+import json
+
+import pytest
+
+from chat_entries import message
+from claude_reader import common
+from claude_reader.common import json_loads
+
+LINES = [
+    json.dumps(message('assistant', 'Ünïcode ✓ and "quotes"', tools=[('Bash', {'command': 'ls -la'})])),
+    '{"n": 12345678901234567890, "f": 1.5e300, "empty": [], "null": null}',
+    '{"value": NaN, "other": -Infinity}',
+    '{"escaped": "\\u00e9\\ud83d\\ude00"}',
+    b'{"bytes": true}',
+]
+
+BAD_LINES = ['{"open": ', 'not json', '']
+
+
+@pytest.fixture
+def stdlib_json(monkeypatch):
+    monkeypatch.setattr(common, 'orjson', None)
+
+
+def decode_all(lines):
+    return [repr(json_loads(line)) for line in lines]
+
+
+def decode_errors(lines):
+    errors = []
+    for line in lines:
+        with pytest.raises(json.JSONDecodeError) as error:
+            json_loads(line)
+        errors.append(str(error.value))
+    return errors
+
+
+def test_both_backends_decode_alike(monkeypatch):
+    pytest.importorskip('orjson')
+    with_orjson = decode_all(LINES), decode_errors(BAD_LINES)
+
+    monkeypatch.setattr(common, 'orjson', None)
+    assert (decode_all(LINES), decode_errors(BAD_LINES)) == with_orjson
+
+
+def test_stdlib_fallback(stdlib_json):
+    assert json_loads(LINES[1])['n'] == 12345678901234567890
+    assert json_loads(LINES[4]) == {'bytes': True}
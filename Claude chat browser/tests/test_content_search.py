@@ -0,0 +1,68 @@
+"""Tests for content search answered from the full-text index."""
+
+from chat_entries import jsonl, message
+from claude_reader.index import get_chat_index
+from claude_reader.search import search_content
+
+
+def test_search_lists_matching_messages(write_chat, capsys):
+    write_chat([message('user', 'How do I restart the Kubernetes pods?'),
+                message('assistant', 'Use kubectl rollout restart.')], name='chat1')
+    write_chat([message('user', 'Unrelated question')], name='chat2')
+
+    search_content('kubernetes')
+
+    out = capsys.readouterr().out
+    assert 'Home User Src App/chat1' in out
+    assert 'Line 1 (user' in out
+    assert 'chat2' not in out
+    assert '1 match(es) in 1 chat(s)' in out
+
+
+def test_search_matches_tool_names_and_file_paths(write_chat, capsys):
+    write_chat([message('user', 'Fix the build'),
+                message('assistant', 'Reading it', tools=[('Read', {'file_path': '/src/app/settings.py'})])])
+
+    search_content('settings.py')
+
+    out = capsys.readouterr().out
+    assert 'Line 2 (assistant' in out
+    assert '1 match(es) in 1 chat(s)' in out
+
+
+def test_search_indexes_appended_messages(write_chat, capsys):
+    chat_file = write_chat([message('user', 'The first deployment failed')])
+    search_content('deployment')
+    assert '1 match(es) in 1 chat(s)' in capsys.readouterr().out
+
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('assistant', 'The deployment is fixed now')]))
+    search_content('deployment')
+
+    out = capsys.readouterr().out
+    assert 'Line 2 (assistant' in out
+    assert '2 match(es) in 1 chat(s)' in out
+
+
+def test_no_match(write_chat, capsys):
+    write_chat([message('user', 'alpha')])
+
+    search_content('nonexistent')
+
+    assert "No content found matching 'nonexistent'" in capsys.readouterr().out
+    assert get_chat_index() is not None
+
+
+def test_plain_words_are_a_phrase(write_chat, capsys):
+    write_chat([message('user', 'Run the update checker again'),
+                message('assistant', 'The checker found an update')])
+
+    search_content('update checker')
+
+    out = capsys.readouterr().out
+    # Answered by the ranked index search (Line N), not as a query of two words (#N)
+    assert 'Line 1 (user' in out
+    assert '1 match(es) in 1 chat(s)' in out
+
+    search_content('update AND checker')
+    assert '2 match(es) in 1 chat(s)' in capsys.readouterr().out
@@ -0,0 +1,153 @@
+"""Tests for incremental dataset exports (--dataset): re-runs must never duplicate rows."""
+
+import os
+import sqlite3
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import dataset as dataset_module
+from claude_reader.dataset import export_dataset
+
+
+@pytest.fixture(params=['sqlite', 'parquet'])
+def dataset(request, tmp_path):
+    """A dataset path and a reader of its (chat, line, role) message and (chat, line, tool) tool call rows"""
+    if request.param == 'parquet':
+        pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+        path = tmp_path / 'dataset'
+
+        def read(table, columns):
+            parts = sorted((path / table).glob('part-*.parquet'))
+            rows = [row for part in parts for row in pyarrow_parquet.read_table(str(part)).to_pylist()]
+            return sorted(tuple(row[column] for column in columns) for row in rows)
+    else:
+        path = tmp_path / 'dataset.sqlite'
+
+        def read(table, columns):
+            with sqlite3.connect(str(path)) as conn:
+                return sorted(conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall())
+
+    class Dataset:
+        format = request.param
+
+        def export(self, project=None):
+            export_dataset(path, project=project, jobs=1, format_type=request.param)
+
+        def messages(self):
+            return read('messages', ('chat', 'line', 'role'))
+
+        def tool_calls(self):
+            return read('tool_calls', ('chat', 'line', 'tool_name'))
+    return Dataset()
+
+
+def chat_entries(count, start=0):
+    """Alternating user and assistant messages; every assistant message runs Bash"""
+    return [message('user', f'question {i}') if i % 2 == 0 else
+            message('assistant', f'answer {i}', tools=[('Bash', {'command': 'ls'})])
+            for i in range(start, start + count)]
+
+
+def test_rerun_adds_nothing(dataset, write_chat, capsys):
+    write_chat(chat_entries(4), name='one')
+    write_chat(chat_entries(3), name='two')
+    dataset.export()
+    messages, tool_calls = dataset.messages(), dataset.tool_calls()
+    capsys.readouterr()
+
+    dataset.export()
+    dataset.export()
+
+    assert len(messages) == 7 and len(tool_calls) == 3
+    assert dataset.messages() == messages
+    assert dataset.tool_calls() == tool_calls
+    assert '2 unchanged chat(s) skipped' in capsys.readouterr().out
+
+
+def test_append_adds_only_new_lines(dataset, write_chat):
+    chat_file = write_chat(chat_entries(2))
+    dataset.export()
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl(chat_entries(2, start=2)))
+
+    dataset.export()
+
+    assert dataset.messages() == [('chat1', 1, 'user'), ('chat1', 2, 'assistant'),
+                                  ('chat1', 3, 'user'), ('chat1', 4, 'assistant')]
+    assert dataset.tool_calls() == [('chat1', 2, 'Bash'), ('chat1', 4, 'Bash')]
+
+
+def test_interrupted_run_does_not_duplicate_rows(dataset, write_chat, monkeypatch):
+    write_chat(chat_entries(3), name='a')
+    write_chat(chat_entries(3), name='b')
+    parallel_map = dataset_module.parallel_map
+
+    def interrupted_map(func, tasks, jobs=None, **kwargs):
+        results = parallel_map(func, tasks, jobs, **kwargs)
+        yield next(results)
+        raise KeyboardInterrupt
+    monkeypatch.setattr(dataset_module, 'parallel_map', interrupted_map)
+    with pytest.raises(KeyboardInterrupt):
+        dataset.export()
+    monkeypatch.setattr(dataset_module, 'parallel_map', parallel_map)
+
+    dataset.export()
+
+    assert dataset.messages() == [('a', 1, 'user'), ('a', 2, 'assistant'), ('a', 3, 'user'),
+                                  ('b', 1, 'user'), ('b', 2, 'assistant'), ('b', 3, 'user')]
+    assert dataset.tool_calls() == [('a', 2, 'Bash'), ('b', 2, 'Bash')]
+
+
+def test_partial_line_is_exported_once_complete(dataset, write_chat):
+    chat_file = write_chat(chat_entries(1))
+    line = jsonl([message('assistant', 'written in two parts')])
+    with open(chat_file, 'ab') as f:
+        f.write(line[:15])
+    dataset.export()
+    assert dataset.messages() == [('chat1', 1, 'user')]
+
+    with open(chat_file, 'ab') as f:
+        f.write(line[15:])
+    dataset.export()
+
+    assert dataset.messages() == [('chat1', 1, 'user'), ('chat1', 2, 'assistant')]
+
+
+def test_rewritten_chat_replaces_its_rows(dataset, write_chat):
+    chat_file = write_chat(chat_entries(4))
+    write_chat(chat_entries(2), name='other')
+    dataset.export()
+
+    with open(chat_file, 'r+b') as f:
+        f.truncate(0)
+        f.write(jsonl([message('user', 'rewritten')]))
+    mtime_ns = chat_file.stat().st_mtime_ns + 10**9
+    os.utime(chat_file, ns=(mtime_ns, mtime_ns))
+    dataset.export()
+
+    assert dataset.messages() == [('chat1', 1, 'user'), ('other', 1, 'user'), ('other', 2, 'assistant')]
+    assert dataset.tool_calls() == [('other', 2, 'Bash')]
+
+
+def test_deleted_chat_rows_are_removed(dataset, write_chat, capsys):
+    write_chat(chat_entries(2), name='kept')
+    deleted = write_chat(chat_entries(2), name='deleted')
+    dataset.export()
+    deleted.unlink()
+    capsys.readouterr()
+
+    dataset.export()
+
+    assert [row[0] for row in dataset.messages()] == ['kept', 'kept']
+    assert '1 replaced or deleted chat(s) removed' in capsys.readouterr().out
+
+
+def test_project_export_keeps_other_projects(dataset, write_chat):
+    write_chat(chat_entries(2), name='app')
+    write_chat(chat_entries(2), name='api', project='-home-user-src-api')
+    dataset.export()
+
+    dataset.export(project='Home User Src App')
+
+    assert [row[0] for row in dataset.messages()] == ['api', 'api', 'app', 'app']
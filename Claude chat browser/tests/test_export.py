@@ -0,0 +1,198 @@
+"""Tests for bulk exports: run_export and incremental exports (export_chats with incremental=True)."""
+
+import json
+import os
+import sys
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import export
+from claude_reader.export import EXPORT_MANIFEST, export_chats, run_export
+
+PROJECT = 'Home User Src App'
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Record the names of the chats each export run renders."""
+    runs = []
+    run_export = export.run_export
+
+    def recording_run_export(tasks, jobs=None):
+        runs.append(sorted(chat_file.name for chat_file, outputs in tasks))
+        return run_export(tasks, jobs)
+    monkeypatch.setattr(export, 'run_export', recording_run_export)
+    return runs
+
+
+@pytest.fixture
+def chats(write_chat):
+    """Two chats in one project and one in another"""
+    return [write_chat([message('user', 'First question'), message('assistant', 'First answer')], name='one'),
+            write_chat([message('user', 'Second question')], name='two'),
+            write_chat([message('user', 'Other project')], name='three', project='-home-user-src-api')]
+
+
+def run(export_dir, format_type='markdown', project=None):
+    export_chats(str(export_dir), format_type, project=project, jobs=1, incremental=True)
+
+
+def manifest(export_dir):
+    return json.loads((export_dir / EXPORT_MANIFEST).read_text())['chats']
+
+
+def test_first_run_exports_everything(chats, rendered, tmp_path, capsys):
+    export_dir = tmp_path / 'exports'
+
+    run(export_dir)
+
+    assert rendered == [['one.jsonl', 'three.jsonl', 'two.jsonl']]
+    assert 'First answer' in (export_dir / PROJECT / 'one.md').read_text()
+    entry = manifest(export_dir)[str(chats[0])]
+    assert entry['format'] == 'markdown'
+    assert entry['output'] == f'{PROJECT}/one.md'
+    assert entry['size'] == chats[0].stat().st_size
+    assert '0 unchanged chat(s) skipped, 0 deleted chat(s) removed' in capsys.readouterr().out
+
+
+def test_unchanged_chats_are_skipped(chats, rendered, tmp_path, capsys):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    capsys.readouterr()
+
+    run(export_dir)
+
+    assert rendered[1] == []
+    assert '3 unchanged chat(s) skipped' in capsys.readouterr().out
+
+
+def test_touched_chat_with_same_content_is_skipped(chats, rendered, tmp_path):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    mtime_ns = chats[1].stat().st_mtime_ns + 10**9
+    os.utime(chats[1], ns=(mtime_ns, mtime_ns))
+
+    run(export_dir)
+    run(export_dir)
+
+    assert rendered[1:] == [[], []]
+    assert manifest(export_dir)[str(chats[1])]['mtime_ns'] == mtime_ns
+
+
+def test_appended_chat_is_exported_again(chats, rendered, tmp_path):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    with open(chats[0], 'ab') as f:
+        f.write(jsonl([message('user', 'Appended follow-up')]))
+
+    run(export_dir)
+
+    assert rendered[1] == ['one.jsonl']
+    assert 'Appended follow-up' in (export_dir / PROJECT / 'one.md').read_text()
+    assert manifest(export_dir)[str(chats[0])]['size'] == chats[0].stat().st_size
+
+
+def test_format_switch_replaces_exports(chats, rendered, tmp_path):
+    export_dir = tmp_path / 'exports'
+    run(export_dir, 'markdown')
+
+    run(export_dir, 'pretty')
+
+    assert rendered[1] == ['one.jsonl', 'three.jsonl', 'two.jsonl']
+    assert sorted(path.name for path in (export_dir / PROJECT).iterdir()) == ['one.txt', 'two.txt']
+    assert {entry['format'] for entry in manifest(export_dir).values()} == {'pretty'}
+
+    run(export_dir, 'pretty')
+    assert rendered[2] == []
+
+
+def test_deleted_export_is_rewritten(chats, rendered, tmp_path):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    (export_dir / PROJECT / 'two.md').unlink()
+
+    run(export_dir)
+
+    assert rendered[1] == ['two.jsonl']
+    assert (export_dir / PROJECT / 'two.md').exists()
+
+
+def test_deleted_chat_export_is_removed(chats, rendered, tmp_path, capsys):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    chats[1].unlink()
+    capsys.readouterr()
+
+    run(export_dir)
+
+    assert not (export_dir / PROJECT / 'two.md').exists()
+    assert str(chats[1]) not in manifest(export_dir)
+    assert '2 unchanged chat(s) skipped, 1 deleted chat(s) removed' in capsys.readouterr().out
+
+
+def test_project_export_keeps_other_projects(chats, rendered, tmp_path):
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+
+    run(export_dir, project=PROJECT)
+
+    assert rendered[1] == []
+    assert str(chats[2]) in manifest(export_dir)
+    assert (export_dir / 'Home User Src Api' / 'three.md').exists()
+
+
+def test_chat_without_messages_is_recorded(write_chat, rendered, tmp_path):
+    write_chat([{'type': 'summary', 'summary': 'Nothing to show'}], name='empty')
+    export_dir = tmp_path / 'exports'
+
+    run(export_dir)
+    run(export_dir)
+
+    assert rendered == [['empty.jsonl'], []]
+    assert [entry['output'] for entry in manifest(export_dir).values()] == [None]
+
+
+def test_removed_export_does_not_delete_directory_of_new_chats(write_chat, rendered, tmp_path):
+    old = write_chat([message('user', 'Old chat')], name='old')
+    export_dir = tmp_path / 'exports'
+    run(export_dir)
+    old.unlink()
+    write_chat([message('user', 'New chat')], name='new')
+
+    run(export_dir)
+
+    assert sorted(path.name for path in (export_dir / PROJECT).iterdir()) == ['new.md']
+
+
+def test_run_export_draws_progress_on_a_terminal(chats, tmp_path, capsys, monkeypatch):
+    tasks = [(chat, [('markdown', str(tmp_path / f'{chat.stem}.md'))]) for chat in chats]
+    monkeypatch.setattr(sys.stdout, 'isatty', lambda: True)
+
+    summary = run_export(tasks, jobs=1)
+
+    out = capsys.readouterr().out
+    assert [line.split('] ')[1] for line in out.split('\r')[1:]] == ['1/3 chats', '2/3 chats', '3/3 chats\n']
+    assert (summary['files'], summary['errors'], summary['failed']) == (3, [], set())
+
+
+def test_run_export_without_terminal_prints_nothing(chats, tmp_path, capsys):
+    run_export([(chats[0], [('markdown', str(tmp_path / 'one.md'))])], jobs=1)
+
+    assert capsys.readouterr().out == ''
+
+
+def test_failed_export_keeps_the_previous_file(chats, tmp_path, monkeypatch):
+    output = tmp_path / 'one.md'
+    output.write_text('previous export')
+
+    def failing_render(messages, sinks):
+        sinks[0].stream.write('half a chat')
+        raise OSError('disk full')
+    monkeypatch.setattr(export, 'render_messages', failing_render)
+    summary = run_export([(chats[0], [('markdown', str(output)), ('pretty', str(tmp_path / 'one.txt'))])], jobs=1)
+
+    assert summary['errors'] == ['one.jsonl: disk full']
+    assert summary['failed'] == {chats[0]}
+    assert output.read_text() == 'previous export'
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_file()) == ['one.md']
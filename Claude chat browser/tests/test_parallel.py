@@ -0,0 +1,75 @@
+"""Tests for the worker pool (parallel_map): result order, cancellation and worker settings."""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from claude_reader import index as index_module
+from claude_reader import parallel, parsed_cache
+from claude_reader.index import chat_index_disabled, disable_chat_index
+from claude_reader.parallel import parallel_map, scan_cancelled
+from claude_reader.parsed_cache import disable_parsed_cache, parsed_cache_disabled
+
+
+def slow_square(n):
+    """Later tasks finish first"""
+    time.sleep((8 - n) * 0.02)
+    return n * n
+
+
+def wait_for_cancel(task):
+    """Return the first task at once; the others run until the scan is cancelled"""
+    out_dir, n = task
+    outcome = 'done'
+    if n:
+        deadline = time.time() + 10
+        while not scan_cancelled():
+            if time.time() > deadline:
+                outcome = 'timeout'
+                break
+            time.sleep(0.01)
+        else:
+            outcome = 'cancelled'
+    (out_dir / f'{n}.{outcome}').touch()
+    return n
+
+
+def test_results_keep_the_task_order():
+    assert list(parallel_map(slow_square, list(range(8)), jobs=4)) == [n * n for n in range(8)]
+    assert sorted(parallel_map(slow_square, list(range(8)), jobs=4, ordered=False)) == [n * n for n in range(8)]
+
+
+def test_closing_the_results_stops_the_workers(tmp_path):
+    tasks = [(tmp_path, n) for n in range(40)]
+    results = parallel_map(wait_for_cancel, tasks, jobs=2)
+    assert next(results) == 0
+
+    started = time.time()
+    results.close()
+
+    assert time.time() - started < 5
+    outcomes = sorted(path.name for path in tmp_path.iterdir())
+    assert '0.done' in outcomes
+    assert not [outcome for outcome in outcomes if outcome.endswith('.timeout')]
+    # Tasks that had not started were cancelled rather than run
+    assert len(outcomes) < 10
+
+
+def test_workers_get_the_no_index_settings(projects, monkeypatch):
+    executors = []
+
+    class RecordingExecutor(ProcessPoolExecutor):
+        def __init__(self, **kwargs):
+            executors.append(kwargs)
+            super().__init__(**kwargs)
+    monkeypatch.setattr(parallel, 'ProcessPoolExecutor', RecordingExecutor)
+    disable_chat_index()
+    disable_parsed_cache()
+
+    assert list(parallel_map(abs, [-1, -2], jobs=2)) == [1, 2]
+
+    # A spawned worker starts with the defaults, and only has the initializer's arguments
+    monkeypatch.setattr(index_module, '_chat_index_disabled', False)
+    monkeypatch.setattr(parsed_cache, '_parsed_cache_disabled', False)
+    monkeypatch.setattr(parallel, '_worker_cancel_event', None)
+    executors[0]['initializer'](*executors[0]['initargs'])
+    assert chat_index_disabled() and parsed_cache_disabled()
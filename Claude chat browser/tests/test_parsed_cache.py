@@ -0,0 +1,85 @@
+"""Tests for the parsed-chat cache."""
+
+from chat_entries import jsonl, message
+from claude_reader.export import export_chat, open_chat_messages, print_export_summary, run_export
+from claude_reader.index import get_chat_infos
+from claude_reader.parsed_cache import get_parsed_cache_path, open_parsed_cache
+
+
+def read_all(chat_file):
+    return [(m.number, m.role, m.timestamp, m.content) for m in open_chat_messages(chat_file)]
+
+
+def test_cache_hit_gives_the_parsed_messages(write_chat):
+    chat_file = write_chat([message('user', 'Question'), {'type': 'summary', 'summary': 'x'},
+                            message('assistant', 'Answer', tools=[('Bash', {'command': 'ls'})])])
+
+    cold = read_all(chat_file)
+
+    assert get_parsed_cache_path(chat_file).exists()
+    parsed = open_parsed_cache(chat_file)
+    assert parsed is not None
+    parsed.close()
+    assert read_all(chat_file) == cold
+    assert [number for number, *_ in cold] == [1, 2]
+
+
+def test_changed_chat_invalidates_cache(write_chat):
+    chat_file = write_chat([message('user', 'Question')])
+    read_all(chat_file)
+
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('assistant', 'Late answer')]))
+
+    assert open_parsed_cache(chat_file) is None
+    assert [content for *_, content in read_all(chat_file)][-1].strip().endswith('Late answer')
+
+
+def test_cache_hit_repeats_warnings(write_chat, capsys):
+    chat_file = write_chat([message('user', 'Question'), '{"broken', 'not json at all',
+                            message('assistant', 'Answer'), '{"truncated": '])
+
+    read_all(chat_file)
+    cold = capsys.readouterr().err.splitlines()
+    assert open_parsed_cache(chat_file) is not None
+    read_all(chat_file)
+    warm = capsys.readouterr().err.splitlines()
+
+    assert len(cold) == 3
+    assert cold[0].startswith('Warning: Skipping invalid JSON on line 2:')
+    assert warm == cold
+
+
+def test_ranges_from_cache_do_not_repeat_warnings(write_chat, capsys):
+    chat_file = write_chat([message('user', 'Question'), 'not json', message('assistant', 'Answer')])
+    read_all(chat_file)
+    capsys.readouterr()
+
+    assert [m.number for m in open_chat_messages(chat_file, first=2)] == [2]
+    assert capsys.readouterr().err == ''
+
+
+def test_export_summary_counts_warnings_cold_and_warm(write_chat, tmp_path, capsys):
+    chat_file = write_chat([message('user', 'Question'), 'not json', '{"broken', message('assistant', 'Answer')])
+    task = (chat_file, [('markdown', str(tmp_path / 'chat1.md'))])
+
+    cold = export_chat(task)
+    warm = export_chat(task)
+
+    assert cold == warm == (chat_file, 1, 2, None)
+    print_export_summary(run_export([task], jobs=1))
+    assert '2 invalid line(s) skipped' in capsys.readouterr().out
+
+
+def test_index_sweep_prunes_cache_of_deleted_chats(write_chat):
+    deleted = write_chat([message('user', 'Gone soon')], name='deleted')
+    kept = write_chat([message('user', 'Still here')], name='kept')
+    read_all(deleted)
+    read_all(kept)
+    get_chat_infos(kept.parent)
+
+    deleted.unlink()
+    assert [chat['file'] for chat in get_chat_infos(kept.parent)] == [kept]
+
+    assert not get_parsed_cache_path(deleted).exists()
+    assert get_parsed_cache_path(kept).exists()
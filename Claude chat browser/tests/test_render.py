@@ -0,0 +1,109 @@
+"""Tests for the render engine: formatter sinks and the message records they format."""
+
+import io
+import re
+
+import pytest
+
+from chat_entries import message
+from claude_reader.export import render_chat
+from claude_reader.render import (FORMATTERS, ChatMessage, FormatterSink, iter_chat_entries, iter_chat_messages,
+                                  iter_chunk_lines, iter_formatted_chunks, render_messages)
+
+
+@pytest.fixture
+def chat_file(write_chat):
+    """A chat with text, tool uses, a tool result, a system message, a summary and an invalid line"""
+    return write_chat([
+        {'type': 'summary', 'summary': 'Fixing the build'},
+        message('user', 'Why does the build fail?', '2025-09-01T10:00:00Z'),
+        message('assistant', 'Let me look.', '2025-09-01T10:00:05Z',
+                tools=[('Bash', {'command': 'make'}), ('Read', {'file_path': '/src/Makefile'})]),
+        message('user', '', '2025-09-01T10:00:09Z', toolUseResult={'stdout': 'make: *** missing target', 'stderr': ''}),
+        'not json',
+        message('system', 'Context compacted', '2025-09-01T10:01:00Z'),
+        message('assistant', 'The Makefile has no default target.', '2025-09-01T10:02:00Z'),
+    ])
+
+
+def without_generated(text):
+    """Drop the export time, which differs between two renders"""
+    return re.sub(r'\*\*Generated: [^*]*\*\*', '**Generated**', text)
+
+
+def render_files(chat_file, formats, out_dir):
+    out_dir.mkdir()
+    outputs = [(format_type, str(out_dir / f'chat.{format_type}')) for format_type in formats]
+    assert render_chat(chat_file, outputs, quiet=True)
+    return {format_type: without_generated((out_dir / f'chat.{format_type}').read_text()) for format_type in formats}
+
+
+def test_multi_format_render_equals_single_format_renders(chat_file, tmp_path):
+    together = render_files(chat_file, list(FORMATTERS), tmp_path / 'together')
+    separate = {}
+    for format_type in FORMATTERS:
+        separate.update(render_files(chat_file, [format_type], tmp_path / format_type))
+
+    assert together == separate
+    assert 'The Makefile has no default target.' in together['book']
+    assert '"command": "make"' in together['raw']
+
+
+def test_sinks_write_what_the_formatters_yield(chat_file):
+    messages = list(iter_chat_messages(iter_chat_entries(chat_file, with_offsets=True), keep_entries=True))
+    sinks = [FormatterSink(format_type, io.StringIO()) for format_type in FORMATTERS]
+
+    render_messages(iter(messages), sinks)
+
+    for sink, format_type in zip(sinks, FORMATTERS):
+        expected = '\n'.join(iter_formatted_chunks(messages, format_type))
+        assert without_generated(sink.stream.getvalue()) == without_generated(expected)
+
+
+def test_render_streams_one_message_at_a_time(chat_file):
+    messages = list(iter_chat_messages(iter_chat_entries(chat_file, with_offsets=True)))
+    stream = io.StringIO()
+    written = []
+
+    def pull():
+        for chat_message in messages:
+            written.append(stream.getvalue())
+            yield chat_message
+
+    render_messages(pull(), [FormatterSink('pretty', stream)])
+
+    # Each message is written out before the next one is read
+    for chat_message, before_next in zip(messages, written[1:]):
+        assert before_next.endswith('\n'.join(FORMATTERS['pretty'].message(chat_message)))
+    assert all(len(before) < len(after) for before, after in zip(written, written[1:]))
+
+
+def test_formatted_chunks_are_produced_lazily(chat_file):
+    pulled = []
+
+    def pull():
+        for chat_message in iter_chat_messages(iter_chat_entries(chat_file, with_offsets=True)):
+            pulled.append(chat_message.number)
+            yield chat_message
+
+    lines = iter_chunk_lines(iter_formatted_chunks(pull(), 'markdown'))
+    while not pulled:
+        next(lines)
+    assert pulled == [1]
+
+
+def test_chat_messages_are_slotted_and_drop_their_entry(chat_file):
+    entries = list(iter_chat_entries(chat_file, with_offsets=True))
+    offset, entry = entries[0]
+    plain = ChatMessage.from_entry(1, entry, offset)
+    kept = ChatMessage.from_entry(1, entry, offset, keep_entry=True)
+
+    assert not hasattr(plain, '__dict__')
+    with pytest.raises(AttributeError):
+        plain.note = 'extra'
+    assert (plain.number, plain.role, plain.offset, plain.entry) == (1, 'user', offset, None)
+    assert kept.entry is entry and kept.content == plain.content
+    assert ChatMessage.from_entry(1, {'type': 'unknown', 'message': {}}) is None
+
+    assert all(message.entry is None for message in iter_chat_messages(entries))
+    assert all(message.entry is not None for message in iter_chat_messages(entries, keep_entries=True))
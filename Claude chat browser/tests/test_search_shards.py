@@ -0,0 +1,112 @@
+"""Tests for the sharded live search: line numbers must not depend on where shards and chunks split."""
+
+import mmap
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader.search import plan_scan_shards, search_buffer, search_shard, search_shard_lines
+
+
+def chat_lines(count=60):
+    """Entries of varied length, every 7th mentioning the needle (twice in some)"""
+    entries = []
+    for i in range(count):
+        text = f'line {i} ' + 'filler ' * (i % 11)
+        if i % 7 == 3:
+            text += 'Needle here' + (' and another needle' if i % 2 else '')
+        entries.append(message('user' if i % 2 else 'assistant', text))
+    return entries
+
+
+def expected_lines(data, needle):
+    return [number for number, line in enumerate(data.splitlines(), 1) if needle in line.lower()]
+
+
+def live_search(path, shard_size, needle, scan=search_shard):
+    """Combine the shard results into file line numbers, as search_content_live() does"""
+    shards = plan_scan_shards([path], shard_size)
+    line_base = 0
+    found = []
+    for shard in shards:
+        line_count, matches = scan(shard, needle)
+        found.extend(line_base + line for line, role, preview in matches)
+        line_base += line_count
+    return found, line_base, shards
+
+
+@pytest.fixture
+def chat_file(write_chat):
+    return write_chat(chat_lines())
+
+
+@pytest.mark.parametrize('shard_size', [1, 57, 100, 333, 1000, 10**9])
+def test_line_numbers_across_shards(chat_file, shard_size):
+    data = chat_file.read_bytes()
+
+    found, line_count, shards = live_search(chat_file, shard_size, 'needle')
+
+    assert found == expected_lines(data, b'needle')
+    assert line_count == data.count(b'\n')
+    assert shards[-1][2] == len(data)
+
+
+@pytest.mark.parametrize('shard_size', [50, 400])
+def test_line_scan_fallback_agrees(chat_file, shard_size):
+    # Non-ASCII needles are searched line by line
+    data = chat_file.read_bytes()
+    assert live_search(chat_file, shard_size, 'needle', search_shard_lines)[0] == expected_lines(data, b'needle')
+
+
+def test_shard_boundary_inside_matching_line(chat_file):
+    data = chat_file.read_bytes()
+    match_start = data.index(b'Needle')
+    line_start = data.rindex(b'\n', 0, match_start) + 1
+
+    for boundary in (line_start, line_start + 1, match_start, match_start + 3):
+        shards = [(chat_file, 0, boundary), (chat_file, boundary, len(data))]
+        first_count, first = search_shard(shards[0], 'needle')
+        second_count, second = search_shard(shards[1], 'needle')
+        numbers = [line for line, *_ in first] + [first_count + line for line, *_ in second]
+        assert numbers == expected_lines(data, b'needle'), boundary
+        assert first_count + second_count == data.count(b'\n')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64, 200, 4096])
+def test_search_buffer_chunks(chat_file, chunk_size):
+    data = chat_file.read_bytes()
+    with open(chat_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        line_count, matches = search_buffer(buf, len(data), 0, len(data), b'needle', 'needle', chunk_size)
+
+    assert line_count == data.count(b'\n')
+    assert [line for line, *_ in matches] == expected_lines(data, b'needle')
+    assert {role for line, role, preview in matches} == {'user', 'assistant'}
+    assert all('Needle' in preview for line, role, preview in matches)
+
+
+def test_unterminated_last_line(write_chat):
+    chat_file = write_chat(chat_lines(10))
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('user', 'last needle')]).rstrip(b'\n'))
+    data = chat_file.read_bytes()
+
+    found, line_count, shards = live_search(chat_file, 200, 'needle')
+
+    assert line_count == data.count(b'\n') + 1
+    assert found == expected_lines(data, b'needle')
+    assert found[-1] == line_count
+
+
+@pytest.mark.parametrize('shard_size, chunk_size', [(90, 7), (250, 16), (700, 33)])
+def test_search_buffer_shards_and_chunks(chat_file, shard_size, chunk_size):
+    data = chat_file.read_bytes()
+    numbers = []
+    line_base = 0
+    with open(chat_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for path, start, end in plan_scan_shards([chat_file], shard_size):
+            line_count, matches = search_buffer(buf, len(data), start, end, b'needle', 'needle', chunk_size)
+            numbers.extend(line_base + line for line, *_ in matches)
+            line_base += line_count
+
+    assert numbers == expected_lines(data, b'needle')
+    assert line_base == data.count(b'\n')
@@ -0,0 +1,88 @@
+"""Tests for the usage statistics map-reduce and its cache (get_corpus_stats)."""
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import stats as stats_module
+from claude_reader.index import disable_chat_index, get_chat_index
+from claude_reader.stats import get_corpus_stats, show_stats
+
+
+@pytest.fixture
+def chats(write_chat):
+    """Two chats in one project, one in another, with tool uses, an edit and a file read"""
+    first = write_chat([
+        message('user', 'Fix the build', '2025-09-01T10:00:00Z'),
+        message('assistant', 'Reading it', '2025-09-01T10:05:00Z', tools=[('Read', {'file_path': '/a.py'})]),
+        message('user', 'ok', '2025-09-01T10:06:00Z', toolUseResult={'file': {'filePath': '/a.py'}}),
+        message('assistant', 'Editing it', '2025-09-02T09:00:00Z', tools=[('Edit', {'file_path': '/a.py'})]),
+        message('user', 'ok', '2025-09-02T09:30:00Z', toolUseResult={'structuredPatch': []}),
+    ], name='first')
+    write_chat([message('user', 'Hello', '2025-09-02T12:00:00Z')], name='second')
+    write_chat([message('user', 'Deploy', '2025-09-03T08:00:00Z'),
+                message('assistant', 'Running it', '2025-09-03T08:01:00Z', tools=[('Bash', {'command': 'make'})])],
+               project='-home-user-src-api')
+    return first
+
+
+def test_corpus_stats(chats):
+    stats, projects, read = get_corpus_stats()
+
+    assert stats['messages'] == {'user': 5, 'assistant': 3}
+    assert stats['tools'] == {'Read': 1, 'Edit': 1, 'Bash': 1}
+    assert (stats['edits'], stats['reads']) == (1, 1)
+    assert stats['days'] == {'2025-09-01': 3, '2025-09-02': 3, '2025-09-03': 2}
+    assert len(stats['sessions']) == 3
+    assert stats['sessions']['first'][1] - stats['sessions']['first'][0] == (23 * 60 + 30) * 60 * 1000
+    assert dict(projects) == {'-home-user-src-app': 6, '-home-user-src-api': 2}
+    assert read == 3
+
+
+def test_cached_stats_only_read_appended_lines(chats):
+    get_corpus_stats()
+    assert get_corpus_stats()[2] == 0
+
+    with open(chats, 'ab') as f:
+        f.write(jsonl([message('assistant', 'Done', '2025-09-04T10:00:00Z', tools=[('Bash', {'command': 'ls'})])]))
+    stats, projects, read = get_corpus_stats()
+
+    assert read == 1
+    assert stats['tools']['Bash'] == 2
+    assert stats['days']['2025-09-04'] == 1
+    assert stats['messages'] == {'user': 5, 'assistant': 4}
+    assert projects['-home-user-src-app'] == 7
+
+
+def test_stats_without_index(chats):
+    disable_chat_index()
+
+    stats, projects, read = get_corpus_stats()
+
+    assert stats['messages'] == {'user': 5, 'assistant': 3}
+    assert dict(projects) == {'-home-user-src-app': 6, '-home-user-src-api': 2}
+    assert read == 3
+
+
+def test_workers_run_outside_the_write_transaction(chats, monkeypatch):
+    index = get_chat_index()
+    in_transaction = []
+
+    def parallel_map(function, tasks, jobs=None):
+        for task in tasks:
+            in_transaction.append(index.conn.in_transaction)
+            yield function(task)
+    monkeypatch.setattr(stats_module, 'parallel_map', parallel_map)
+
+    get_corpus_stats()
+
+    assert in_transaction == [False, False, False]
+    assert not index.conn.in_transaction
+
+
+def test_show_stats_for_one_project(chats, capsys):
+    show_stats('-home-user-src-api')
+
+    out = capsys.readouterr().out
+    assert 'Chat statistics for Home User Src Api' in out
+    assert 'Messages: 2   Tool uses: 1' in out
+    assert 'Messages by project' not in out
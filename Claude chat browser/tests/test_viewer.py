@@ -0,0 +1,133 @@
+"""Tests for the lazy pager document (ChatDocument) and deep links (resolve_chat_link)."""
+
+import gzip
+import os
+
+import pytest
+
+from chat_entries import message
+from claude_reader.export import open_chat_messages
+from claude_reader.index import disable_chat_index, get_message_index
+from claude_reader.parsed_cache import open_parsed_cache
+from claude_reader.viewer import ChatDocument, resolve_chat_link
+
+
+@pytest.fixture
+def chat_file(write_chat):
+    """A chat of 40 messages, each rendered to several lines"""
+    return write_chat([message('user' if n % 2 else 'assistant', f'Message {n}\nsecond line of {n}\nthird line',
+                               f'2025-09-01T10:{n:02d}:00Z') for n in range(1, 41)] + ['not json'])
+
+
+@pytest.fixture
+def document(chat_file):
+    document = ChatDocument(chat_file)
+    yield document
+    document.close()
+
+
+def test_pages_follow_on_without_gaps(document):
+    pos = (0, 0)
+    pages = []
+    while document.page(pos, 7):
+        pages.extend(document.page(pos, 7))
+        pos = document.forward(pos, 7)
+
+    message_lines = len(document.lines(0))
+    assert pages == [line for index in range(40) for line in document.lines(index)]
+    assert len(pages) == 40 * message_lines
+    assert pos == document.end() == (40, 0)
+    assert document.backward(pos, message_lines + 2) == (38, message_lines - 2)
+    assert document.backward((1, 1), 100) == (0, 0)
+
+
+def test_first_page_indexes_only_what_it_needs(document, monkeypatch):
+    monkeypatch.setattr(ChatDocument, 'SCAN_BATCH', 4)
+
+    assert 'Message 1' in '\n'.join(document.page((0, 0), 3))
+    assert len(document.index) == 4 and not document.complete
+
+    document.end()
+    assert len(document.index) == 40 and document.complete
+
+
+def test_find_message(document):
+    assert document.find_message(25) == (24, 0)
+    assert 'Message 25' in '\n'.join(document.page(document.find_message(25), 3))
+    assert document.find_message(41) is None
+    assert document.find_message(0) is None
+
+
+def test_search_from_a_position(document):
+    first = document.search('LINE OF 12', (0, 0))
+    assert first is not None and first[0] == 11
+    assert 'second line of 12' in document.lines(first[0])[first[1]]
+
+    assert document.search('third line', first) == (11, first[1] + 1)
+    assert document.search('second line', document.forward(first, 1))[0] == 12
+    assert document.search('nowhere', (0, 0)) is None
+
+
+def test_stored_index_and_parsed_cache_render_the_same(chat_file, document):
+    document.end()
+    expected = [document.lines(index) for index in range(40)]
+    list(open_chat_messages(chat_file))
+
+    cached = ChatDocument(chat_file, get_message_index(chat_file), open_parsed_cache(chat_file))
+    try:
+        assert cached.parsed is not None and len(cached.index) == 40
+        assert [cached.lines(index) for index in range(40)] == expected
+    finally:
+        cached.close()
+
+
+def test_archive_is_paged_from_a_temporary_copy(chat_file, document):
+    archive = chat_file.with_name(chat_file.name + '.gz')
+    archive.write_bytes(gzip.compress(chat_file.read_bytes()))
+
+    archived = ChatDocument(archive)
+    source = archived.source
+    try:
+        assert archived.page((0, 0), 100) == document.page((0, 0), 100)
+    finally:
+        archived.close()
+    assert source != archive
+    assert not os.path.exists(source)
+
+
+@pytest.mark.parametrize('anchor, first, last', [
+    ('', None, None),
+    ('#1', 1, None),
+    ('#40', 40, None),
+    ('#10-20', 10, 20),
+    ('@2025-09-01T10:05..2025-09-01T10:07', 5, 7),
+])
+def test_resolve_chat_link(chat_file, anchor, first, last):
+    for project in ('-home-user-src-app', 'home user src app'):
+        assert resolve_chat_link(f'{project}/chat1{anchor}') == (chat_file, first, last)
+
+
+def test_resolve_chat_link_by_unique_prefix(chat_file, write_chat):
+    other = write_chat([message('user', 'Other')], name='other-chat')
+    assert resolve_chat_link('-home-user-src-app/oth#1') == (other, 1, None)
+
+
+@pytest.mark.parametrize('link, error', [
+    ('-home-user-src-app/missing#1', 'Chat not found: missing'),
+    ('no-such-project/chat1#1', 'Project not found: no-such-project'),
+    ('-home-user-src-app/chat1#41', 'No message 41 in chat1 (it has 40 messages)'),
+    ('-home-user-src-app/chat1#0', 'No message 0 in chat1'),
+    ('-home-user-src-app/chat1#x', 'Invalid link: -home-user-src-app/chat1#x'),
+    ('-home-user-src-app/chat1@2026-01-01..', 'No messages in time range: 2026-01-01..'),
+])
+def test_resolve_chat_link_errors(chat_file, capsys, link, error):
+    assert resolve_chat_link(link) is None
+    assert error in capsys.readouterr().out
+
+
+def test_resolve_chat_link_without_index(chat_file, capsys):
+    disable_chat_index()
+
+    assert resolve_chat_link('-home-user-src-app/chat1#40') == (chat_file, 40, None)
+    assert resolve_chat_link('-home-user-src-app/chat1#41') is None
+    assert 'No message 41' in capsys.readouterr().out
@@ -0,0 +1,132 @@
+"""Tests for following a chat (follow_chat) and keeping the indexes warm (IndexWatcher)."""
+
+import os
+
+import pytest
+
+from chat_entries import jsonl, message
+from claude_reader import watch
+from claude_reader.index import MessageIndex, get_chat_index
+from claude_reader.watch import IN_CREATE, IN_DELETE, IN_MODIFY, IndexWatcher, follow_chat
+
+REPLACED = 'Chat file was replaced or truncated'
+
+
+@pytest.fixture
+def follow(monkeypatch, capsys):
+    """Run follow_chat on a chat, applying one change to the files per wake-up
+
+    Returns the output printed after each change (the first item: before any).
+    """
+    def run(chat_file, changes):
+        outputs = []
+        pending = list(changes)
+
+        def wait_for_change(inotify_fd):
+            outputs.append(capsys.readouterr().out)
+            if not pending:
+                raise KeyboardInterrupt
+            pending.pop(0)()
+        monkeypatch.setattr(watch, 'open_inotify', lambda *args: None)
+        monkeypatch.setattr(watch, 'wait_for_change', wait_for_change)
+        follow_chat(f'{chat_file.parent.name}/{chat_file.stem}')
+        return outputs
+    return run
+
+
+def test_partial_line_waits_for_its_newline(write_chat, follow):
+    chat_file = write_chat([message('user', 'alpha')])
+    line = jsonl([message('assistant', 'bravo')])
+
+    def append(data):
+        def change():
+            with open(chat_file, 'ab') as f:
+                f.write(data)
+        return change
+
+    before, half, complete = follow(chat_file, [append(line[:20]), append(line[20:])])
+
+    assert 'alpha' in before
+    assert half == ''
+    assert 'bravo' in complete and 'alpha' not in complete
+
+
+def test_rotated_chat_is_followed_from_its_start(write_chat, follow):
+    chat_file = write_chat([message('user', 'alpha'), message('assistant', 'bravo')])
+
+    def rotate():
+        new_file = chat_file.with_suffix('.new')
+        new_file.write_bytes(jsonl([message('user', 'charlie')]))
+        os.replace(new_file, chat_file)
+
+    before, rotated = follow(chat_file, [rotate])
+
+    assert 'alpha' in before and 'bravo' in before
+    assert REPLACED in rotated
+    assert 'charlie' in rotated and 'bravo' not in rotated
+
+
+def test_truncated_chat_is_followed_from_its_start(write_chat, follow):
+    chat_file = write_chat([message('user', 'alpha' * 20), message('assistant', 'bravo' * 20)])
+    inode = chat_file.stat().st_ino
+
+    def truncate():
+        with open(chat_file, 'wb') as f:
+            f.write(jsonl([message('user', 'delta')]))
+
+    before, truncated = follow(chat_file, [truncate])
+
+    assert chat_file.stat().st_ino == inode
+    assert REPLACED in truncated
+    assert 'delta' in truncated and 'bravo' not in truncated
+
+
+@pytest.fixture
+def watcher(projects, monkeypatch):
+    """An IndexWatcher without inotify, watching the project directory as descriptor 1"""
+    monkeypatch.setattr(watch, 'open_inotify', lambda *args: None)
+    project_dir = projects / '-home-user-src-app'
+    project_dir.mkdir()
+    watcher = IndexWatcher(get_chat_index(), projects)
+    watcher.quiet = True
+    watcher.watches[1] = project_dir
+    yield watcher
+    watcher.close()
+
+
+def index_rows(index):
+    """Get {chat name: (message count, indexed messages, full-text rows)} from the index tables"""
+    rows = {}
+    for chat in index.conn.execute('SELECT * FROM chats'):
+        message_index = MessageIndex(index.conn.execute(
+            'SELECT * FROM message_index WHERE chat_id = ?', (chat['id'],)).fetchone())
+        fts_rows = index.conn.execute('SELECT count(*) FROM messages_fts WHERE rowid BETWEEN ? AND ?',
+                                      (chat['id'] << 32, (chat['id'] << 32) | 0xFFFFFFFF)).fetchone()[0]
+        rows[chat['path'].rsplit('/', 1)[-1]] = (chat['message_count'], len(message_index), fts_rows)
+    return rows
+
+
+def test_watcher_indexes_created_appended_and_deleted_chats(write_chat, watcher):
+    index = watcher.index
+    chat_file = write_chat([message('user', 'alpha')])
+    assert watcher.handle_events([(1, IN_CREATE, 'chat1.jsonl')])
+    assert index_rows(index) == {'chat1.jsonl': (1, 1, 1)}
+
+    with open(chat_file, 'ab') as f:
+        f.write(jsonl([message('assistant', 'bravo'), message('user', 'charlie')]))
+    assert watcher.handle_events([(1, IN_MODIFY, 'chat1.jsonl')])
+    assert index_rows(index) == {'chat1.jsonl': (3, 3, 3)}
+
+    write_chat([message('user', 'delta')], name='chat2')
+    chat_file.unlink()
+    assert watcher.handle_events([(1, IN_DELETE, 'chat1.jsonl'), (1, IN_CREATE, 'chat2.jsonl')])
+    assert index_rows(index) == {'chat2.jsonl': (1, 1, 1)}
+    assert list(watcher.known) == [str(chat_file.with_name('chat2.jsonl'))]
+
+
+def test_watcher_ignores_other_files_and_reports_lost_events(write_chat, watcher):
+    write_chat([message('user', 'alpha')])
+    assert watcher.handle_events([(1, IN_MODIFY, 'notes.txt')])
+    assert index_rows(watcher.index) == {}
+
+    assert not watcher.handle_events([(-1, watch.IN_Q_OVERFLOW, '')])
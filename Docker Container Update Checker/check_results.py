@@ -0,0 +1,351 @@
+"""
+Per-image check results of the Docker Container Update Checker:
+timing the registry and docker calls of a check, the --profile report,
+the history database and the reports of the history command
+"""
+
+import logging
+import math
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def timed_step(details: Dict, label: str):
+    """Time one registry or docker call, adding it to the steps in the details of a check."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        details.setdefault('steps', []).append((label, time.monotonic() - start))
+
+
+def http_get(details: Dict, url: str, **kwargs) -> requests.Response:
+    """requests.get() with the call timed for the profile report."""
+    parts = urlsplit(url)
+    with timed_step(details, f"GET {parts.netloc}{parts.path}"):
+        return requests.get(url, **kwargs)
+
+
+class CheckHistory:
+    """Compact SQLite history of per-image check results.
+    
+    Rows older than the retention period are compacted: only rows where the
+    state of an image changed (digests, newest tag, status) are kept, which is
+    enough to answer "how long has it been behind" and "how often does it publish".
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS images (
+            id INTEGER PRIMARY KEY,
+            container TEXT NOT NULL,
+            image TEXT NOT NULL,
+            registry TEXT NOT NULL,
+            UNIQUE (container, image)
+        );
+        CREATE TABLE IF NOT EXISTS checks (
+            image_id INTEGER NOT NULL REFERENCES images(id),
+            checked_at INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            current_digest BLOB,
+            remote_digest BLOB,
+            newest_tag TEXT,
+            latency_ms INTEGER,
+            PRIMARY KEY (image_id, checked_at)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_checks_checked_at ON checks (checked_at);
+    """
+    
+    def __init__(self, db_path: str, retention_days: int = 30):
+        """Open (and create if needed) the history database."""
+        self.db_path = db_path
+        self.retention_days = retention_days
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        # Must be set before the first table is created to take effect
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        self.conn.executescript(self.SCHEMA)
+    
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+    
+    @staticmethod
+    def pack_digest(digest: Optional[str]) -> Optional[bytes]:
+        """Store a 'sha256:<hex>' digest as 32 raw bytes."""
+        if not digest:
+            return None
+        try:
+            return bytes.fromhex(digest.split(':')[-1])
+        except ValueError:
+            return digest.encode()
+    
+    @staticmethod
+    def unpack_digest(blob: Optional[bytes]) -> Optional[str]:
+        """Convert a stored digest back to 'sha256:<hex>' form."""
+        if not blob:
+            return None
+        return f'sha256:{blob.hex()}' if len(blob) == 32 else blob.decode(errors='replace')
+    
+    def image_id(self, container: str, image: str, registry: str) -> int:
+        """Get (or create) the id of a container/image pair."""
+        self.conn.execute(
+            'INSERT OR IGNORE INTO images (container, image, registry) VALUES (?, ?, ?)',
+            (container, image, registry)
+        )
+        row = self.conn.execute(
+            'SELECT id FROM images WHERE container = ? AND image = ?', (container, image)
+        ).fetchone()
+        return row[0]
+    
+    def record(self, results: List[Dict], checked_at: Optional[int] = None):
+        """Record the per-image results of one run."""
+        checked_at = checked_at or int(time.time())
+        with self.conn:
+            for result in results:
+                image_id = self.image_id(result['container'], result['image'], result['registry'])
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (image_id, checked_at, result['status'],
+                     self.pack_digest(result.get('current_digest')),
+                     self.pack_digest(result.get('remote_digest')),
+                     result.get('newest_tag'),
+                     int(result.get('latency', 0) * 1000))
+                )
+        logger.debug(f"Recorded {len(results)} check result(s) in {self.db_path}")
+    
+    def compact(self) -> int:
+        """Drop old rows that repeat the previous state of their image, then reclaim space."""
+        cutoff = int(time.time()) - self.retention_days * 86400
+        with self.conn:
+            cursor = self.conn.execute("""
+                DELETE FROM checks WHERE (image_id, checked_at) IN (
+                    SELECT image_id, checked_at FROM (
+                        SELECT image_id, checked_at,
+                               status IS LAG(status) OVER w
+                               AND current_digest IS LAG(current_digest) OVER w
+                               AND remote_digest IS LAG(remote_digest) OVER w
+                               AND newest_tag IS LAG(newest_tag) OVER w AS unchanged
+                        FROM checks
+                        WINDOW w AS (PARTITION BY image_id ORDER BY checked_at)
+                    )
+                    WHERE unchanged AND checked_at < ?
+                )
+            """, (cutoff,))
+            removed = cursor.rowcount
+            self.conn.execute('DELETE FROM images WHERE id NOT IN (SELECT DISTINCT image_id FROM checks)')
+        # executescript() steps the pragma to completion; execute() would free a single page
+        self.conn.executescript('PRAGMA incremental_vacuum')
+        if removed:
+            logger.debug(f"Compacted {removed} history row(s) older than {self.retention_days} days")
+        return removed
+    
+    def stale_images(self, min_days: float = 0) -> List[Dict]:
+        """Images whose latest check reports an update, with how long they have been behind."""
+        now = time.time()
+        stale = []
+        for image_id, container, image, registry in self.conn.execute(
+                'SELECT id, container, image, registry FROM images ORDER BY container'):
+            latest = self.conn.execute(
+                'SELECT checked_at, status, newest_tag FROM checks WHERE image_id = ? '
+                'ORDER BY checked_at DESC LIMIT 1', (image_id,)
+            ).fetchone()
+            if not latest or latest[1] != 'update':
+                continue
+            
+            # The streak of 'update' results started after the last other result
+            since = self.conn.execute(
+                "SELECT MIN(checked_at) FROM checks WHERE image_id = ? AND status = 'update' "
+                "AND checked_at > COALESCE((SELECT MAX(checked_at) FROM checks "
+                "WHERE image_id = ? AND status NOT IN ('update', 'unknown', 'error')), 0)",
+                (image_id, image_id)
+            ).fetchone()[0]
+            days_behind = (now - since) / 86400
+            if days_behind >= min_days:
+                stale.append({
+                    'container': container,
+                    'image': image,
+                    'registry': registry,
+                    'newest_tag': latest[2],
+                    'behind_since': datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M'),
+                    'days_behind': days_behind
+                })
+        
+        stale.sort(key=lambda s: s['days_behind'], reverse=True)
+        return stale
+    
+    def registry_latency(self, days: float = 30) -> List[Dict]:
+        """Check latency percentiles per registry over the last N days."""
+        cutoff = int(time.time() - days * 86400)
+        latencies = {}
+        for registry, latency_ms in self.conn.execute(
+                'SELECT i.registry, c.latency_ms FROM checks c JOIN images i ON i.id = c.image_id '
+                'WHERE c.checked_at >= ? AND c.latency_ms IS NOT NULL', (cutoff,)):
+            latencies.setdefault(registry, []).append(latency_ms)
+        
+        rows = []
+        for registry, values in sorted(latencies.items()):
+            values.sort()
+            rows.append({
+                'registry': registry,
+                'checks': len(values),
+                'p50_ms': percentile(values, 50),
+                'p95_ms': percentile(values, 95),
+                'max_ms': values[-1]
+            })
+        return rows
+    
+    def publish_frequency(self, days: float = 90) -> List[Dict]:
+        """How often each upstream image published a new digest or tag over the last N days."""
+        cutoff = int(time.time() - days * 86400)
+        changes = {}
+        previous = {}
+        for image_id, checked_at, remote_digest, newest_tag in self.conn.execute(
+                'SELECT image_id, checked_at, remote_digest, newest_tag FROM checks '
+                'WHERE checked_at >= ? AND (remote_digest IS NOT NULL OR newest_tag IS NOT NULL) '
+                'ORDER BY image_id, checked_at', (cutoff,)):
+            state = (remote_digest, newest_tag)
+            if image_id in previous and previous[image_id] != state:
+                changes.setdefault(image_id, []).append(checked_at)
+            previous[image_id] = state
+        
+        rows = []
+        for image_id, container, image in self.conn.execute(
+                'SELECT id, container, image FROM images ORDER BY container'):
+            if image_id not in previous:
+                continue
+            published = changes.get(image_id, [])
+            intervals = [b - a for a, b in zip(published, published[1:])]
+            rows.append({
+                'container': container,
+                'image': image,
+                'publishes': len(published),
+                'last_publish': datetime.fromtimestamp(published[-1]).strftime('%Y-%m-%d %H:%M') if published else 'never',
+                'mean_interval_days': sum(intervals) / len(intervals) / 86400 if intervals else None
+            })
+        
+        rows.sort(key=lambda r: r['publishes'], reverse=True)
+        return rows
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def record_history(checker):
+    """Record the results of a checker's run in the history database, if enabled."""
+    if not checker.history_enabled or not checker.check_results:
+        return
+    
+    try:
+        history = checker.open_history()
+        try:
+            history.record(checker.check_results)
+            history.compact()
+        finally:
+            history.close()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Failed to record check history in {checker.history_db}: {e}")
+
+
+def show_history(checker, args):
+    """Print a history query report."""
+    try:
+        history = checker.open_history()
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Cannot open history database {checker.history_db}: {e}")
+        sys.exit(1)
+    
+    try:
+        if args.query == 'stale':
+            rows = history.stale_images(args.days)
+            print(f"Containers behind for at least {args.days:g} day(s):")
+            print(f"{'Container':<30} {'Image':<45} {'Newest':<15} {'Behind since':<17} {'Days':>6}")
+            for row in rows:
+                print(f"{row['container']:<30} {row['image']:<45} {row['newest_tag'] or '-':<15} "
+                      f"{row['behind_since']:<17} {row['days_behind']:>6.1f}")
+        elif args.query == 'latency':
+            rows = history.registry_latency(args.days)
+            print(f"Check latency per registry over the last {args.days:g} day(s):")
+            print(f"{'Registry':<30} {'Checks':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+            for row in rows:
+                print(f"{row['registry']:<30} {row['checks']:>7} {row['p50_ms']:>8} "
+                      f"{row['p95_ms']:>8} {row['max_ms']:>8}")
+        elif args.query == 'publish':
+            rows = history.publish_frequency(args.days)
+            print(f"Upstream publishes over the last {args.days:g} day(s):")
+            print(f"{'Container':<30} {'Image':<45} {'Publishes':>9} {'Last publish':<17} {'Every (days)':>12}")
+            for row in rows:
+                interval = f"{row['mean_interval_days']:.1f}" if row['mean_interval_days'] is not None else '-'
+                print(f"{row['container']:<30} {row['image']:<45} {row['publishes']:>9} "
+                      f"{row['last_publish']:<17} {interval:>12}")
+        elif args.query == 'compact':
+            removed = history.compact()
+            print(f"Compacted {removed} row(s) older than {history.retention_days} days")
+        
+        if args.query != 'compact' and not rows:
+            print("  (no matching history)")
+    finally:
+        history.close()
+
+
+def print_profile_report(checker, wall_time: float, outlier_seconds: float = 2.0):
+    """Print ranked per-container and per-registry latency tables and flag outliers."""
+    results = sorted(checker.check_results, key=lambda r: r['latency'], reverse=True)
+    latencies = sorted(r['latency'] for r in results)
+    median = percentile(latencies, 50)
+    
+    print()
+    print(f"Profile: {len(results)} container(s) checked in {wall_time:.2f}s "
+          f"(container discovery {checker.discovery_time:.2f}s)")
+    print()
+    print(f"{'Container':<30} {'Registry':<20} {'Status':<8} {'Total s':>8}  Slowest step")
+    print("-" * 110)
+    for result in results:
+        steps = result.get('steps', [])
+        slowest = max(steps, key=lambda step: step[1]) if steps else None
+        slowest_str = f"{slowest[1]:.2f}s {slowest[0][:50]}" if slowest else '-'
+        print(f"{result['container'][:30]:<30} {result['registry'][:20]:<20} {result['status']:<8} "
+              f"{result['latency']:>8.2f}  {slowest_str}")
+    
+    registries = {}
+    for result in results:
+        registries.setdefault(result['registry'], []).append(result['latency'])
+    print()
+    print(f"{'Registry':<30} {'Checks':>7} {'Total s':>8} {'Mean s':>8} {'p95 s':>8} {'Max s':>8}")
+    print("-" * 75)
+    for registry, values in sorted(registries.items(), key=lambda item: sum(item[1]), reverse=True):
+        values.sort()
+        print(f"{registry[:30]:<30} {len(values):>7} {sum(values):>8.2f} {sum(values) / len(values):>8.2f} "
+              f"{percentile(values, 95):>8.2f} {values[-1]:>8.2f}")
+    
+    # Outliers: single calls over the threshold, or containers far slower than the median
+    outliers = []
+    for result in results:
+        for label, seconds in result.get('steps', []):
+            if seconds >= outlier_seconds:
+                outliers.append(f"{result['container']}: {label} took {seconds:.2f}s")
+        if len(results) > 2 and median and result['latency'] > 3 * median and result['latency'] >= outlier_seconds / 2:
+            outliers.append(f"{result['container']}: {result['latency']:.2f}s total is "
+                            f"{result['latency'] / median:.1f}x the median ({median:.2f}s)")
+    print()
+    if outliers:
+        print(f"⚠️  Outliers (calls >= {outlier_seconds:g}s or containers > 3x median):")
+        for outlier in outliers:
+            print(f"   • {outlier}")
+    else:
+        print("No outliers found")
@@ -10,12 +10,16 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import subprocess
+from urllib.parse import urlsplit
 import requests
 from datetime import datetime
 import configparser
 import re
+import time
 from packaging import version
 
+from check_results import CheckHistory, http_get, print_profile_report, record_history, show_history, timed_step
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +27,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Manifest media types accepted when querying a registry API directly
+MANIFEST_ACCEPT = ', '.join([
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.docker.distribution.manifest.v2+json',
+    'application/vnd.oci.image.manifest.v1+json',
+])
+
+# Alternative host names that refer to Docker Hub
+DOCKER_HUB_ALIASES = ('registry-1.docker.io', 'index.docker.io', 'registry.hub.docker.com')
+
 
 class DockerUpdateChecker:
     def __init__(self, config_path: str = "/etc/docker-update-checker/config.ini"):
@@ -38,6 +53,20 @@ class DockerUpdateChecker:
         self.skip_tags = self.config.get('docker', 'skip_tags', fallback=default_skip_tags).split(',')
         self.skip_tags = [t.strip().lower() for t in self.skip_tags if t.strip()]
         
+        # Pull-through mirrors: upstream registry -> list of mirror endpoints, tried in order
+        self.mirrors = self.load_mirrors()
+        self.mirror_timeout = self.config.getfloat('registry', 'mirror_timeout', fallback=5.0)
+        self.unreachable_mirrors = set()
+        
+        # Per-run check results, used for the history database
+        self.check_details = {}
+        self.check_results = []
+        self.discovery_time = 0.0
+        self.history_enabled = self.config.getboolean('history', 'enabled', fallback=True)
+        self.history_db = self.config.get('history', 'database',
+                                          fallback='/var/lib/docker-update-checker/history.db')
+        self.history_retention_days = self.config.getint('history', 'retention_days', fallback=30)
+        
     def load_config(self, config_path: str) -> configparser.ConfigParser:
         """Load configuration from file."""
         config = configparser.ConfigParser()
@@ -51,6 +80,30 @@ class DockerUpdateChecker:
         config.read(config_path)
         return config
     
+    def load_mirrors(self) -> Dict[str, List[str]]:
+        """Load the upstream registry -> mirror endpoints mapping from the [mirrors] section."""
+        mirrors = {}
+        if not self.config.has_section('mirrors'):
+            return mirrors
+        
+        for registry, endpoints in self.config.items('mirrors'):
+            registry = registry.strip().lower()
+            if registry in DOCKER_HUB_ALIASES:
+                registry = 'docker.io'
+            urls = []
+            for endpoint in endpoints.split(','):
+                endpoint = endpoint.strip().rstrip('/')
+                if not endpoint:
+                    continue
+                if '://' not in endpoint:
+                    endpoint = f'https://{endpoint}'
+                urls.append(endpoint)
+            if urls:
+                mirrors.setdefault(registry, []).extend(urls)
+                logger.debug(f"Using mirror(s) for {registry}: {', '.join(urls)}")
+        
+        return mirrors
+    
     def create_sample_config(self, config_path: str):
         """Create a sample configuration file."""
         sample_config = """[telegram]
@@ -77,6 +130,24 @@ docker_hub_username =
 docker_hub_password = 
 # Note: For lscr.io and ghcr.io, the script uses docker manifest inspect
 # which requires docker to be authenticated if the images are private
+# Seconds to wait for a registry mirror before falling back to upstream
+mirror_timeout = 5
+
+[mirrors]
+# Route manifest and tag queries through pull-through mirrors on the LAN.
+# Map an upstream registry to one or more mirror endpoints (comma-separated,
+# tried in order). Queries fall back to the upstream registry on a miss.
+# An endpoint may include a repository prefix (e.g. a Harbor proxy project).
+# docker.io = http://registry-mirror.lan:5000
+# ghcr.io = https://harbor.lan/ghcr-proxy
+
+[history]
+# Record per-image results of every run in a compact SQLite database
+# (query it with: docker-update-checker.py history --help)
+enabled = true
+database = /var/lib/docker-update-checker/history.db
+# Keep every run for this many days, then compact to state changes only
+retention_days = 30
 """
         config_dir = Path(config_path).parent
         config_dir.mkdir(parents=True, exist_ok=True)
@@ -89,12 +160,13 @@ docker_hub_password =
     def run_docker_command(self, cmd: List[str]) -> Optional[str]:
         """Run a docker command and return output."""
         try:
-            result = subprocess.run(
-                ['docker'] + cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            with timed_step(self.check_details, f"docker {' '.join(cmd)}"):
+                result = subprocess.run(
+                    ['docker'] + cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
             return result.stdout.strip()
         except subprocess.CalledProcessError as e:
             logger.error(f"Docker command failed: {e}")
@@ -166,51 +238,151 @@ docker_hub_password =
                     return digests[0].split('@')[-1] if '@' in digests[0] else None
         return None
     
-    def check_dockerhub_update(self, image_name: str, current_tag: str) -> Optional[str]:
-        """Check if there's a newer version on Docker Hub."""
-        # Skip checking if current tag is in skip list
-        if any(skip in current_tag.lower() for skip in self.skip_tags):
-            logger.debug(f"Skipping update check for {image_name}:{current_tag} (tag in skip list)")
+    def is_skipped_tag(self, tag: str) -> bool:
+        """Check whether a tag matches the skip list (pre-release, latest, ...)."""
+        return any(skip in tag.lower() for skip in self.skip_tags)
+    
+    def note_check(self, **details):
+        """Record details (digests, newest tag) about the container currently being checked."""
+        self.check_details.update({k: v for k, v in details.items() if v})
+    
+    def get_bearer_token(self, challenge: str) -> Optional[str]:
+        """Fetch an anonymous token for a 'WWW-Authenticate: Bearer ...' challenge."""
+        if not challenge.lower().startswith('bearer '):
             return None
         
-        # Remove library/ prefix for API calls
-        api_name = image_name.replace('library/', '')
-        
-        # Get token for authentication (even for public repos)
-        token_url = f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{image_name}:pull"
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+        realm = params.pop('realm', None)
+        if not realm:
+            return None
         
         try:
-            token_response = requests.get(token_url, timeout=10)
-            token_response.raise_for_status()
-            token = token_response.json().get('token')
-            
-            if not token:
-                logger.warning(f"Could not get auth token for {image_name}")
-                return None
-            
-            # Get manifest for the current tag
-            manifest_url = f"https://registry-1.docker.io/v2/{image_name}/manifests/{current_tag}"
-            headers = {
-                'Authorization': f'Bearer {token}',
-                'Accept': 'application/vnd.docker.distribution.manifest.v2+json'
-            }
+            response = http_get(self.check_details, realm, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return data.get('token') or data.get('access_token')
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Could not get token from {realm}: {e}")
+            return None
+    
+    def registry_get(self, url: str, headers: Optional[Dict] = None, timeout: float = 10) -> requests.Response:
+        """GET a registry API URL, answering a Bearer auth challenge anonymously if needed."""
+        headers = dict(headers or {})
+        response = http_get(self.check_details, url, headers=headers, timeout=timeout)
+        
+        if response.status_code == 401:
+            token = self.get_bearer_token(response.headers.get('WWW-Authenticate', ''))
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+                response = http_get(self.check_details, url, headers=headers, timeout=timeout)
+        
+        return response
+    
+    def query_mirrors(self, registry: str, image_name: str, endpoint: str,
+                      headers: Optional[Dict] = None) -> Optional[requests.Response]:
+        """Query the configured mirrors of a registry, returning the first successful response.
+        
+        Returns None on a miss so the caller can fall back to the upstream registry.
+        A mirror that cannot be reached is skipped for the rest of the run.
+        """
+        for mirror in self.mirrors.get(registry, []):
+            if mirror in self.unreachable_mirrors:
+                continue
             
-            manifest_response = requests.get(manifest_url, headers=headers, timeout=10)
-            manifest_response.raise_for_status()
+            # The endpoint path (if any) is a repository prefix, e.g. a Harbor proxy project
+            parts = urlsplit(mirror)
+            prefix = parts.path.strip('/')
+            repository = f'{prefix}/{image_name}' if prefix else image_name
+            url = f'{parts.scheme}://{parts.netloc}/v2/{repository}/{endpoint}'
             
-            # Get the current digest
-            current_digest = manifest_response.headers.get('Docker-Content-Digest')
+            try:
+                response = self.registry_get(url, headers=headers, timeout=self.mirror_timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning(f"Mirror {mirror} is unreachable, skipping it for the rest of this run: {e}")
+                self.unreachable_mirrors.add(mirror)
+                continue
+            except requests.RequestException as e:
+                logger.debug(f"Mirror request failed for {url}: {e}")
+                continue
             
-            # Get all available tags to find newer versions
-            tags_url = f"https://registry-1.docker.io/v2/{image_name}/tags/list"
-            tags_response = requests.get(tags_url, headers={'Authorization': f'Bearer {token}'}, timeout=10)
+            if response.status_code == 200:
+                logger.debug(f"Mirror hit: {url}")
+                return response
+            logger.debug(f"Mirror miss ({response.status_code}): {url}")
+        
+        return None
+    
+    def get_remote_manifest(self, registry: str, image_name: str, tag: str) -> Optional[str]:
+        """Get the raw manifest JSON for an image, from a mirror if possible."""
+        response = self.query_mirrors(registry, image_name, f'manifests/{tag}',
+                                      headers={'Accept': MANIFEST_ACCEPT})
+        if response is not None:
+            return response.text
+        
+        # Fall back to the upstream registry
+        return self.run_docker_command([
+            'manifest', 'inspect',
+            f'{registry}/{image_name}:{tag}'
+        ])
+    
+    def get_dockerhub_tags(self, image_name: str, current_tag: str) -> Optional[List[str]]:
+        """Get the available tags of a Docker Hub image, from a mirror if possible."""
+        # Make sure the current tag exists before listing tags
+        manifest_response = self.query_mirrors('docker.io', image_name, f'manifests/{current_tag}',
+                                               headers={'Accept': MANIFEST_ACCEPT})
+        if manifest_response is not None:
+            self.note_check(remote_digest=manifest_response.headers.get('Docker-Content-Digest'))
+            response = self.query_mirrors('docker.io', image_name, 'tags/list')
+            if response is not None:
+                try:
+                    return response.json().get('tags') or []
+                except ValueError as e:
+                    logger.debug(f"Mirror returned an invalid tag list for {image_name}: {e}")
+        
+        # Get token for authentication (even for public repos)
+        token_url = f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{image_name}:pull"
+        
+        token_response = http_get(self.check_details, token_url, timeout=10)
+        token_response.raise_for_status()
+        token = token_response.json().get('token')
+        
+        if not token:
+            logger.warning(f"Could not get auth token for {image_name}")
+            return None
+        
+        # Get manifest for the current tag
+        manifest_url = f"https://registry-1.docker.io/v2/{image_name}/manifests/{current_tag}"
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/vnd.docker.distribution.manifest.v2+json'
+        }
+        
+        manifest_response = http_get(self.check_details, manifest_url, headers=headers, timeout=10)
+        manifest_response.raise_for_status()
+        self.note_check(remote_digest=manifest_response.headers.get('Docker-Content-Digest'))
+        
+        # Get all available tags to find newer versions
+        tags_url = f"https://registry-1.docker.io/v2/{image_name}/tags/list"
+        tags_response = http_get(self.check_details, tags_url, headers={'Authorization': f'Bearer {token}'}, timeout=10)
+        
+        if tags_response.status_code == 200:
+            return tags_response.json().get('tags', [])
+        return None
+    
+    def check_dockerhub_update(self, image_name: str, current_tag: str) -> Optional[str]:
+        """Check if there's a newer version on Docker Hub."""
+        # Skip checking if current tag is in skip list
+        if self.is_skipped_tag(current_tag):
+            logger.debug(f"Skipping update check for {image_name}:{current_tag} (tag in skip list)")
+            return None
+        
+        try:
+            available_tags = self.get_dockerhub_tags(image_name, current_tag)
             
-            if tags_response.status_code == 200:
-                tags_data = tags_response.json()
-                available_tags = tags_data.get('tags', [])
-                
+            if available_tags is not None:
                 # Filter and sort tags to find potential newer versions
-                newer_version = self.find_newer_version(current_tag, available_tags, image_name, headers)
+                newer_version = self.find_newer_version(current_tag, available_tags, image_name)
+                self.note_check(newest_tag=newer_version or current_tag)
                 if newer_version:
                     return f"New version available: {newer_version}"
             
@@ -220,8 +392,8 @@ docker_hub_password =
             logger.warning(f"Failed to check Docker Hub for {image_name}:{current_tag}: {e}")
             return None
     
-    def find_newer_version(self, current_tag: str, available_tags: List[str], 
-                          image_name: str, headers: Dict) -> Optional[str]:
+    def find_newer_version(self, current_tag: str, available_tags: List[str],
+                          image_name: str) -> Optional[str]:
         """Find if there's a newer stable version available."""
         from packaging import version
         
@@ -264,25 +436,23 @@ docker_hub_password =
         """Check if there's a newer version on LinuxServer.io registry."""
         try:
             # Skip checking if current tag is in skip list  
-            if any(skip in current_tag.lower() for skip in self.skip_tags):
+            if self.is_skipped_tag(current_tag):
                 logger.debug(f"Skipping update check for lscr.io/{image_name}:{current_tag} (tag in skip list)")
                 return None
             
             # Get current image digest
             current_digest = self.get_image_digest(container_id)
+            self.note_check(current_digest=current_digest)
             if not current_digest:
                 logger.debug(f"Could not get current digest for lscr.io/{image_name}:{current_tag}")
                 return None
             
             logger.debug(f"Current digest: {current_digest}")
             
-            # Use docker manifest inspect to get remote digest
+            # Get remote manifest from a mirror, or via docker manifest inspect
             logger.debug(f"Checking latest digest for lscr.io/{image_name}:{current_tag}")
             
-            manifest_output = self.run_docker_command([
-                'manifest', 'inspect', 
-                f'lscr.io/{image_name}:{current_tag}'
-            ])
+            manifest_output = self.get_remote_manifest('lscr.io', image_name, current_tag)
             
             if not manifest_output:
                 logger.debug("No manifest output received")
@@ -315,6 +485,7 @@ docker_hub_password =
                             logger.debug(f"Using first manifest digest: {remote_digest[:20] if remote_digest else 'None'}...")
                 
                 # Compare digests
+                self.note_check(remote_digest=remote_digest)
                 if remote_digest:
                     current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
                     remote_sha = remote_digest.split(':')[-1] if ':' in remote_digest else remote_digest
@@ -338,6 +509,7 @@ docker_hub_password =
                 digest_match = re.search(r'sha256:[a-f0-9]{64}', manifest_output)
                 if digest_match:
                     remote_digest = digest_match.group()
+                    self.note_check(remote_digest=remote_digest)
                     current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
                     remote_sha = remote_digest.split(':')[-1]
                     
@@ -356,13 +528,14 @@ docker_hub_password =
     def check_ghcr_update(self, image_name: str, current_tag: str, container_id: str) -> Optional[str]:
         """Check if there's a newer version on GitHub Container Registry."""
         # Skip checking if current tag is in skip list
-        if any(skip in current_tag.lower() for skip in self.skip_tags):
+        if self.is_skipped_tag(current_tag):
             logger.debug(f"Skipping update check for ghcr.io/{image_name}:{current_tag} (tag in skip list)")
             return None
         
         try:
             # Get current image digest
             current_digest = self.get_image_digest(container_id)
+            self.note_check(current_digest=current_digest)
             if not current_digest:
                 logger.debug(f"Could not get current digest for ghcr.io/{image_name}:{current_tag}")
                 return None
@@ -370,11 +543,8 @@ docker_hub_password =
             # For GHCR, we can use the same approach as lscr.io
             logger.debug(f"Checking latest digest for ghcr.io/{image_name}:{current_tag}")
             
-            # Use docker manifest inspect to get remote digest
-            manifest_output = self.run_docker_command([
-                'manifest', 'inspect', 
-                f'ghcr.io/{image_name}:{current_tag}'
-            ])
+            # Get remote manifest from a mirror, or via docker manifest inspect
+            manifest_output = self.get_remote_manifest('ghcr.io', image_name, current_tag)
             
             if manifest_output:
                 # The manifest inspect output contains the digest
@@ -400,6 +570,7 @@ docker_hub_password =
                         elif 'digest' in manifest_data:
                             remote_digest = manifest_data['digest']
                     
+                    self.note_check(remote_digest=remote_digest)
                     if remote_digest:
                         # Compare just the sha256 part
                         current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
@@ -421,6 +592,7 @@ docker_hub_password =
                     digest_match = re.search(r'sha256:[a-f0-9]{64}', manifest_output)
                     if digest_match:
                         remote_digest = digest_match.group()
+                        self.note_check(remote_digest=remote_digest)
                         current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
                         remote_sha = remote_digest.split(':')[-1]
                         
@@ -441,25 +613,23 @@ docker_hub_password =
         """Check if there's a newer version on Quay.io registry."""
         try:
             # Skip checking if current tag is in skip list
-            if any(skip in current_tag.lower() for skip in self.skip_tags):
+            if self.is_skipped_tag(current_tag):
                 logger.debug(f"Skipping update check for quay.io/{image_name}:{current_tag} (tag in skip list)")
                 return None
             
             # Get current image digest
             current_digest = self.get_image_digest(container_id)
+            self.note_check(current_digest=current_digest)
             if not current_digest:
                 logger.debug(f"Could not get current digest for quay.io/{image_name}:{current_tag}")
                 return None
             
             logger.debug(f"Current digest: {current_digest}")
             
-            # Use docker manifest inspect to get remote digest
+            # Get remote manifest from a mirror, or via docker manifest inspect
             logger.debug(f"Checking latest digest for quay.io/{image_name}:{current_tag}")
             
-            manifest_output = self.run_docker_command([
-                'manifest', 'inspect', 
-                f'quay.io/{image_name}:{current_tag}'
-            ])
+            manifest_output = self.get_remote_manifest('quay.io', image_name, current_tag)
             
             if not manifest_output:
                 logger.debug("No manifest output received")
@@ -506,6 +676,7 @@ docker_hub_password =
                         logger.debug(f"Found direct digest: {remote_digest[:20] if remote_digest else 'None'}...")
                 
                 # Compare digests
+                self.note_check(remote_digest=remote_digest)
                 if remote_digest:
                     current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
                     remote_sha = remote_digest.split(':')[-1] if ':' in remote_digest else remote_digest
@@ -529,6 +700,7 @@ docker_hub_password =
                 digest_match = re.search(r'sha256:[a-f0-9]{64}', manifest_output)
                 if digest_match:
                     remote_digest = digest_match.group()
+                    self.note_check(remote_digest=remote_digest)
                     current_sha = current_digest.split(':')[-1] if ':' in current_digest else current_digest
                     remote_sha = remote_digest.split(':')[-1]
                     
@@ -546,9 +718,12 @@ docker_hub_password =
 
     def check_container_updates(self):
         """Check all running containers for updates."""
+        start = time.monotonic()
         containers = self.get_running_containers()
+        self.discovery_time = time.monotonic() - start
         updates = []
         skipped_registries = {}
+        self.check_results = []
         
         for container in containers:
             image = container.get('Image', '')
@@ -557,29 +732,20 @@ docker_hub_password =
             
             logger.info(f"Checking container: {container_name} ({image})")
             
+            self.check_details = {}
+            start = time.monotonic()
+            registry, tag = 'unknown', None
+            status = 'error'
+            
             try:
                 registry, image_name, tag = self.parse_image_tag(image)
                 
                 # Check different registries
                 if registry == 'docker.io':
                     update_info = self.check_dockerhub_update(image_name, tag)
-                    if update_info:
-                        updates.append({
-                            'container': container_name,
-                            'current_image': image,
-                            'update_info': update_info
-                        })
-                        logger.info(f"Update available for {container_name}")
                 elif registry == 'lscr.io':
                     try:
                         update_info = self.check_lscr_update(image_name, tag, container_id)
-                        if update_info:
-                            updates.append({
-                                'container': container_name,
-                                'current_image': image,
-                                'update_info': update_info
-                            })
-                            logger.info(f"Update available for {container_name}")
                     except AttributeError as e:
                         logger.error(f"AttributeError for {container_name}: {e}")
                         logger.error(f"This is the .get() error we're looking for!")
@@ -589,35 +755,46 @@ docker_hub_password =
                         continue
                 elif registry == 'ghcr.io':
                     update_info = self.check_ghcr_update(image_name, tag, container_id)
-                    if update_info:
-                        updates.append({
-                            'container': container_name,
-                            'current_image': image,
-                            'update_info': update_info
-                        })
-                        logger.info(f"Update available for {container_name}")
                 elif registry == 'quay.io':
-                    # These registries could be supported in the future
                     update_info = self.check_quay_update(image_name, tag, container_id)
-                    if update_info:
-                        updates.append({
-                            'container': container_name,
-                            'current_image': image,
-                            'update_info': update_info
-                        })
-                        logger.info(f"Update available for {container_name}")
                 else:
                     logger.debug(f"Container {container_name} uses unsupported registry: {registry}")
                     if registry not in skipped_registries:
                         skipped_registries[registry] = []
                     skipped_registries[registry].append(container_name)
+                    continue
+                
+                if update_info:
+                    updates.append({
+                        'container': container_name,
+                        'current_image': image,
+                        'update_info': update_info
+                    })
+                    logger.info(f"Update available for {container_name}")
+                    status = 'update'
+                elif self.is_skipped_tag(tag):
+                    status = 'skipped'
+                elif self.check_details.get('remote_digest') or self.check_details.get('newest_tag'):
+                    status = 'current'
+                else:
+                    # The registry could not be queried (errors are logged by the check method)
+                    status = 'unknown'
                     
             except Exception as e:
                 logger.error(f"Error checking container {container_name}: {e}")
                 logger.error(f"Error type: {type(e)}")
                 import traceback
                 logger.error(f"Full traceback:\n{traceback.format_exc()}")
-                continue
+            
+            self.check_results.append({
+                'container': container_name,
+                'image': image,
+                'registry': registry,
+                'tag': tag,
+                'status': status,
+                'latency': time.monotonic() - start,
+                **self.check_details
+            })
         
         # Log summary of skipped registries
         if skipped_registries:
@@ -627,6 +804,10 @@ docker_hub_password =
         
         return updates, skipped_registries
     
+    def open_history(self) -> CheckHistory:
+        """Open the history database configured in the [history] section."""
+        return CheckHistory(self.history_db, self.history_retention_days)
+    
     def send_telegram_notification(self, updates, skipped_registries=None):
         """Send update notifications to Telegram."""
         if skipped_registries is None:
@@ -692,6 +873,7 @@ docker_hub_password =
         
         try:
             updates, skipped_registries = self.check_container_updates()
+            record_history(self)
             
             if updates:
                 logger.info(f"Found {len(updates)} container(s) with available updates")
@@ -727,13 +909,65 @@ def main():
         help='Enable verbose logging'
     )
     
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print a ranked per-container and per-registry latency report at the end'
+    )
+    parser.add_argument(
+        '--profile-output',
+        metavar='FILE',
+        help='Also dump cProfile stats to FILE (implies --profile)'
+    )
+    parser.add_argument(
+        '--profile-threshold',
+        metavar='SECONDS',
+        type=float,
+        default=2.0,
+        help='Flag single registry/docker calls slower than this as outliers (default: 2.0)'
+    )
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    history_parser = subparsers.add_parser('history', help='Query the check history database')
+    history_queries = history_parser.add_subparsers(dest='query', metavar='query')
+    history_queries.required = True
+    stale_parser = history_queries.add_parser('stale', help='Containers behind for more than N days')
+    stale_parser.add_argument('--days', type=float, default=0, help='Minimum days behind (default: 0)')
+    latency_parser = history_queries.add_parser('latency', help='p50/p95 check latency per registry')
+    latency_parser.add_argument('--days', type=float, default=30, help='Look-back window in days (default: 30)')
+    publish_parser = history_queries.add_parser('publish', help='How often each upstream image publishes')
+    publish_parser.add_argument('--days', type=float, default=90, help='Look-back window in days (default: 90)')
+    history_queries.add_parser('compact', help='Compact rows older than the retention period')
+    
     args = parser.parse_args()
     
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
     checker = DockerUpdateChecker(config_path=args.config)
-    checker.run()
+    if args.command == 'history':
+        show_history(checker, args)
+    elif args.profile or args.profile_output:
+        profiler = None
+        if args.profile_output:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        
+        start = time.monotonic()
+        try:
+            checker.run()
+        finally:
+            # Also report on failed runs, which exit through sys.exit()
+            wall_time = time.monotonic() - start
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile_output)
+                logger.info(f"cProfile stats written to {args.profile_output} "
+                            f"(inspect with: python3 -m pstats {args.profile_output})")
+            print_profile_report(checker, wall_time, args.profile_threshold)
+    else:
+        checker.run()
 
 
 if __name__ == '__main__':
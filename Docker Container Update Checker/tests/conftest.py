@@ -0,0 +1,46 @@
+"""Shared fixtures for the Docker Container Update Checker tests."""
+
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'docker-update-checker.py'
+
+# The modules next to the script (the script itself finds them the same way)
+sys.path.insert(0, str(SCRIPT.parent))
+
+
+def load_checker_module():
+    """Import docker-update-checker.py, whose file name is not a valid module name."""
+    if 'docker_update_checker' in sys.modules:
+        return sys.modules['docker_update_checker']
+    spec = importlib.util.spec_from_file_location('docker_update_checker', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['docker_update_checker'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def dc():
+    """The docker-update-checker module."""
+    return load_checker_module()
+
+
+@pytest.fixture
+def make_checker(dc, tmp_path) -> Callable:
+    """Build a DockerUpdateChecker from extra config sections, with history in tmp_path."""
+    def make(extra: str = '', history: bool = True):
+        config = tmp_path / 'config.ini'
+        config.write_text(
+            "[telegram]\ntoken = TOKEN\nchat_id = 1\n\n"
+            "[docker]\nignore_containers =\n\n"
+            f"[history]\nenabled = {'true' if history else 'false'}\n"
+            f"database = {tmp_path / 'history.db'}\nretention_days = 30\n\n"
+            f"{extra}"
+        )
+        return dc.DockerUpdateChecker(config_path=str(config))
+    return make
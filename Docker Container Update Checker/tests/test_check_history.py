@@ -0,0 +1,217 @@
+"""Tests for the CheckHistory database."""
+
+import os
+import time
+from argparse import Namespace
+
+import pytest
+
+from check_results import CheckHistory, percentile, record_history, show_history
+
+DAY = 86400
+
+
+@pytest.fixture
+def history(tmp_path):
+    """A CheckHistory in a temporary file, closed after the test."""
+    history = CheckHistory(str(tmp_path / 'history.db'), retention_days=30)
+    yield history
+    history.close()
+
+
+def result(container='web', status='current', remote='sha256:' + 'b' * 64, newest_tag=None, latency=0.25):
+    """One per-image result as produced by check_container_updates()."""
+    return {'container': container, 'image': f'{container}:1.0', 'registry': 'docker.io', 'status': status,
+            'current_digest': 'sha256:' + 'a' * 64, 'remote_digest': remote, 'newest_tag': newest_tag,
+            'latency': latency}
+
+
+def test_compact_shrinks_database_file(history):
+    start = int(time.time()) - 200 * DAY
+    for i in range(3000):
+        history.record([result(f'web{n}') for n in range(5)], checked_at=start + i * 3600)
+    size = os.path.getsize(history.db_path)
+
+    removed = history.compact()
+
+    assert removed == 5 * 2999
+    assert history.conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    assert os.path.getsize(history.db_path) < size / 10
+
+
+def test_record_packs_digests_and_stores_names_once(history):
+    history.record([result()], checked_at=1000)
+    history.record([result(status='update', newest_tag='1.1')], checked_at=2000)
+
+    assert history.conn.execute('SELECT COUNT(*) FROM images').fetchone()[0] == 1
+    rows = history.conn.execute(
+        'SELECT checked_at, status, current_digest, remote_digest, newest_tag, latency_ms FROM checks '
+        'ORDER BY checked_at').fetchall()
+    assert [row[:2] for row in rows] == [(1000, 'current'), (2000, 'update')]
+    assert len(rows[0][2]) == 32
+    assert history.unpack_digest(rows[0][3]) == 'sha256:' + 'b' * 64
+    assert rows[1][4:] == ('1.1', 250)
+
+
+def test_digest_round_trip():
+    digest = 'sha256:' + '0123456789abcdef' * 4
+    assert CheckHistory.unpack_digest(CheckHistory.pack_digest(digest)) == digest
+    assert CheckHistory.unpack_digest(CheckHistory.pack_digest('not-a-digest')) == 'not-a-digest'
+    assert CheckHistory.pack_digest(None) is None
+
+
+def test_compact_keeps_state_changes_and_recent_rows(history):
+    old = int(time.time()) - 100 * DAY
+    states = ['current', 'current', 'update', 'update', 'update', 'current', 'current']
+    for i, status in enumerate(states):
+        history.record([result(status=status)], checked_at=old + i * DAY)
+    recent = int(time.time()) - DAY
+    history.record([result(status='current')], checked_at=recent)
+    history.record([result(status='current')], checked_at=recent + 60)
+
+    removed = history.compact()
+
+    kept = [tuple(row) for row in history.conn.execute('SELECT checked_at, status FROM checks ORDER BY checked_at')]
+    assert removed == 4
+    assert kept == [(old, 'current'), (old + 2 * DAY, 'update'), (old + 5 * DAY, 'current'),
+                    (recent, 'current'), (recent + 60, 'current')]
+
+
+def test_compact_honours_retention_and_drops_unused_images(tmp_path):
+    history = CheckHistory(str(tmp_path / 'short.db'), retention_days=5)
+    try:
+        now = int(time.time())
+        for days_ago in (10, 9, 8, 3, 2):
+            history.record([result()], checked_at=now - days_ago * DAY)
+
+        assert history.compact() == 2
+        assert history.conn.execute('SELECT COUNT(*) FROM checks').fetchone()[0] == 3
+
+        history.conn.execute("INSERT INTO images (container, image, registry) VALUES ('gone', 'gone', 'x')")
+        history.compact()
+        assert [row[0] for row in history.conn.execute('SELECT container FROM images')] == ['web']
+    finally:
+        history.close()
+
+
+def test_stale_images_counts_from_start_of_update_streak(history):
+    now = int(time.time())
+    history.record([result('db', status='update', newest_tag='2.0')], checked_at=now - 20 * DAY)
+    history.record([result('db', status='current')], checked_at=now - 15 * DAY)
+    history.record([result('db', status='update', newest_tag='2.1')], checked_at=now - 10 * DAY)
+    history.record([result('db', status='error')], checked_at=now - 5 * DAY)
+    history.record([result('db', status='update', newest_tag='2.1')], checked_at=now - DAY)
+    history.record([result('web', status='current')], checked_at=now - DAY)
+
+    stale = history.stale_images()
+
+    assert [row['container'] for row in stale] == ['db']
+    assert stale[0]['newest_tag'] == '2.1'
+    assert stale[0]['days_behind'] == pytest.approx(10, abs=0.01)
+    assert history.stale_images(min_days=11) == []
+
+
+def test_registry_latency_percentiles(history):
+    now = int(time.time())
+    for i, latency in enumerate([0.1, 0.2, 0.3, 0.4, 2.0]):
+        history.record([result(latency=latency)], checked_at=now - i * 60)
+    history.record([result(latency=9.0)], checked_at=now - 40 * DAY)
+
+    rows = history.registry_latency(days=30)
+
+    assert rows == [{'registry': 'docker.io', 'checks': 5, 'p50_ms': 300, 'p95_ms': 2000, 'max_ms': 2000}]
+
+
+def test_publish_frequency_counts_remote_changes(history):
+    now = int(time.time())
+    remotes = ['sha256:' + c * 64 for c in 'aabbbc']
+    for i, remote in enumerate(remotes):
+        history.record([result(remote=remote)], checked_at=now - (10 - i * 2) * DAY)
+
+    rows = history.publish_frequency(days=90)
+
+    assert len(rows) == 1
+    assert rows[0]['publishes'] == 2
+    assert rows[0]['mean_interval_days'] == pytest.approx(6)
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 50) == 0
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 95) == 4
+
+
+def test_history_enabled_by_default(dc, tmp_path):
+    config = tmp_path / 'config.ini'
+    config.write_text("[telegram]\ntoken = TOKEN\nchat_id = 1\n")
+    assert dc.DockerUpdateChecker(config_path=str(config)).history_enabled
+
+
+def test_record_history_writes_run_results(make_checker):
+    checker = make_checker()
+    checker.check_results = [result(status='update', newest_tag='1.1')]
+
+    record_history(checker)
+
+    history = checker.open_history()
+    try:
+        assert [row['container'] for row in history.stale_images()] == ['web']
+    finally:
+        history.close()
+
+
+def test_record_history_disabled(make_checker, tmp_path):
+    checker = make_checker(history=False)
+    checker.check_results = [result()]
+    record_history(checker)
+    assert not (tmp_path / 'history.db').exists()
+
+
+def test_record_history_warns_when_database_unwritable(make_checker, tmp_path, caplog):
+    checker = make_checker()
+    (tmp_path / 'blocker').write_text('')
+    checker.history_db = str(tmp_path / 'blocker' / 'history.db')
+    checker.check_results = [result()]
+
+    record_history(checker)
+
+    assert 'Failed to record check history' in caplog.text
+
+
+@pytest.mark.parametrize('query, days, expected', [
+    ('stale', 0, 'web'),
+    ('latency', 30, 'docker.io'),
+    ('publish', 90, 'web'),
+])
+def test_history_subcommands(make_checker, capsys, query, days, expected):
+    checker = make_checker()
+    now = int(time.time())
+    checker.check_results = [result(status='update', remote='sha256:' + 'c' * 64)]
+    history = checker.open_history()
+    history.record([result(status='update')], checked_at=now - 2 * DAY)
+    history.close()
+    record_history(checker)
+
+    show_history(checker, Namespace(query=query, days=days))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert lines[2].startswith(expected)
+
+
+def test_history_subcommand_without_rows(make_checker, capsys):
+    show_history(make_checker(), Namespace(query='stale', days=0))
+    assert '(no matching history)' in capsys.readouterr().out
+
+
+def test_history_compact_subcommand(make_checker, capsys):
+    checker = make_checker()
+    history = checker.open_history()
+    old = int(time.time()) - 60 * DAY
+    history.record([result()], checked_at=old)
+    history.record([result()], checked_at=old + 60)
+    history.close()
+
+    show_history(checker, Namespace(query='compact', days=0))
+
+    assert capsys.readouterr().out == 'Compacted 1 row(s) older than 30 days\n'
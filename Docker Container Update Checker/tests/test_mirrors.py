@@ -0,0 +1,180 @@
+"""Tests for pull-through mirror routing, against stub registries on localhost."""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+MANIFEST = {'schemaVersion': 2, 'manifests': [
+    {'digest': 'sha256:' + 'f' * 64, 'platform': {'architecture': 'amd64', 'os': 'linux'}}]}
+
+
+class StubRegistry:
+    """A registry API on localhost answering from a {path: (status, body)} map.
+
+    With a token, /v2/ requests without it get a Bearer challenge whose realm is /token.
+    """
+
+    def __init__(self, routes=None, delay=0.0, token=None):
+        self.routes = dict(routes or {})
+        self.delay = delay
+        self.token = token
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                time.sleep(stub.delay)
+                path = self.path.split('?')[0]
+                status, body = stub.routes.get(path, (404, {'errors': []}))
+                challenge = (stub.token and path.startswith('/v2/')
+                             and self.headers.get('Authorization') != f'Bearer {stub.token}')
+                if challenge:
+                    status, body = 401, {'errors': []}
+                elif path == '/token' and stub.token:
+                    status, body = 200, {'token': stub.token}
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    if challenge:
+                        self.send_header('WWW-Authenticate', f'Bearer realm="{stub.url}/token",service="stub"')
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Docker-Content-Digest', 'sha256:' + 'd' * 64)
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    pass  # The client gave up (timeout test)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def registries():
+    """Start stub registries on demand and stop them after the test."""
+    started = []
+
+    def start(routes=None, delay=0.0, token=None):
+        registry = StubRegistry(routes, delay, token)
+        started.append(registry)
+        return registry
+    yield start
+    for registry in started:
+        registry.close()
+
+
+@pytest.fixture
+def closed_port_url():
+    """URL of a local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch, dc):
+    """Replace docker calls (the upstream fallback) with a recorder."""
+    calls = []
+
+    def fake_docker(self, cmd):
+        calls.append(cmd)
+        return json.dumps({'upstream': True})
+    monkeypatch.setattr(dc.DockerUpdateChecker, 'run_docker_command', fake_docker)
+    return calls
+
+
+def mirror_checker(make_checker, *endpoints, timeout=5):
+    """A checker with the given endpoints as ghcr.io mirrors."""
+    return make_checker(f"[registry]\nmirror_timeout = {timeout}\n\n[mirrors]\nghcr.io = {', '.join(endpoints)}\n")
+
+
+def test_load_mirrors_normalises_endpoints(make_checker):
+    checker = make_checker("[mirrors]\nregistry-1.docker.io = mirror.lan:5000/, http://other.lan\n"
+                           "ghcr.io = https://harbor.lan/ghcr-proxy\nquay.io = ,\n")
+    assert checker.mirrors == {
+        'docker.io': ['https://mirror.lan:5000', 'http://other.lan'],
+        'ghcr.io': ['https://harbor.lan/ghcr-proxy'],
+    }
+
+
+def test_no_mirrors_section(make_checker):
+    assert make_checker().mirrors == {}
+
+
+def test_mirror_answers(make_checker, registries, upstream_calls):
+    mirror = registries({'/v2/org/app/manifests/1.0': (200, MANIFEST)})
+    checker = mirror_checker(make_checker, mirror.url)
+
+    manifest = checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')
+
+    assert json.loads(manifest) == MANIFEST
+    assert upstream_calls == []
+
+
+def test_mirror_path_is_repository_prefix(make_checker, registries, upstream_calls):
+    mirror = registries({'/v2/ghcr-proxy/org/app/manifests/1.0': (200, MANIFEST)})
+    checker = mirror_checker(make_checker, f'{mirror.url}/ghcr-proxy/')
+
+    assert json.loads(checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')) == MANIFEST
+    assert mirror.requests == ['/v2/ghcr-proxy/org/app/manifests/1.0']
+
+
+def test_mirror_bearer_challenge_is_answered(make_checker, registries, upstream_calls):
+    mirror = registries({'/v2/org/app/manifests/1.0': (200, MANIFEST)}, token='abc')
+    checker = mirror_checker(make_checker, mirror.url)
+
+    assert json.loads(checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')) == MANIFEST
+    assert [path.split('?')[0] for path in mirror.requests] == [
+        '/v2/org/app/manifests/1.0', '/token', '/v2/org/app/manifests/1.0']
+
+
+def test_mirror_timeout_falls_back_to_next_mirror(make_checker, registries, upstream_calls):
+    slow = registries({'/v2/org/app/manifests/1.0': (200, MANIFEST)}, delay=2)
+    fast = registries({'/v2/org/app/manifests/1.0': (200, MANIFEST)})
+    checker = mirror_checker(make_checker, slow.url, fast.url, timeout=0.2)
+
+    start = time.monotonic()
+    manifest = checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')
+
+    assert json.loads(manifest) == MANIFEST
+    assert time.monotonic() - start < 1.5
+    assert fast.requests == ['/v2/org/app/manifests/1.0']
+    assert checker.unreachable_mirrors == {slow.url}
+    assert upstream_calls == []
+
+    # The slow mirror is not tried again during this run
+    checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')
+    assert len(slow.requests) == 1
+
+
+def test_all_mirrors_failing_falls_back_to_upstream(make_checker, registries, closed_port_url, upstream_calls):
+    missing = registries()
+    broken = registries({'/v2/org/app/manifests/1.0': (500, {})})
+    checker = mirror_checker(make_checker, closed_port_url, missing.url, broken.url)
+
+    manifest = checker.get_remote_manifest('ghcr.io', 'org/app', '1.0')
+
+    assert json.loads(manifest) == {'upstream': True}
+    assert upstream_calls == [['manifest', 'inspect', 'ghcr.io/org/app:1.0']]
+    assert missing.requests == broken.requests == ['/v2/org/app/manifests/1.0']
+    assert checker.unreachable_mirrors == {closed_port_url}
+
+
+def test_query_mirrors_returns_none_without_mirrors(make_checker):
+    checker = make_checker()
+    assert checker.query_mirrors('ghcr.io', 'org/app', 'manifests/1.0') is None
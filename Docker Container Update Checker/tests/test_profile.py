@@ -0,0 +1,110 @@
+"""Tests for the --profile latency report."""
+
+import sys
+
+import pytest
+
+from check_results import print_profile_report, timed_step
+
+
+def result(container, registry, latency, steps=(), status='current'):
+    """One per-image result with timed steps, as produced by check_container_updates()."""
+    return {'container': container, 'image': f'{container}:1.0', 'registry': registry, 'tag': '1.0',
+            'status': status, 'latency': latency, 'steps': list(steps)}
+
+
+RESULTS = [
+    result('fast', 'docker.io', 0.2, [('GET registry-1.docker.io/v2/library/fast/tags/list', 0.1)]),
+    result('medium', 'docker.io', 0.3),
+    result('ok', 'ghcr.io', 0.25),
+    result('slow', 'ghcr.io', 3.0, [('docker manifest inspect ghcr.io/org/slow:1.0', 2.8),
+                                    ('docker inspect abc', 0.1)], status='update'),
+]
+
+
+@pytest.fixture
+def stub_run(monkeypatch, dc):
+    """Replace the registry checks and notifications of a run with canned results."""
+    def check(self):
+        self.discovery_time = 0.05
+        self.check_results = list(RESULTS)
+        return [], {}
+    monkeypatch.setattr(dc.DockerUpdateChecker, 'check_container_updates', check)
+    monkeypatch.setattr(dc.DockerUpdateChecker, 'send_telegram_notification', lambda *args: None)
+    monkeypatch.setattr(dc.DockerUpdateChecker, 'send_error_notification', lambda *args: None)
+
+
+def run_main(dc, monkeypatch, config, *args):
+    """Run main() with the given command line arguments."""
+    monkeypatch.setattr(sys, 'argv', ['docker-update-checker.py', '-c', str(config), *args])
+    dc.main()
+
+
+def test_timed_step_records_failed_calls_too():
+    details = {}
+    with timed_step(details, 'docker inspect abc'):
+        pass
+    with pytest.raises(OSError):
+        with timed_step(details, 'GET ghcr.io/v2/'):
+            raise OSError('unreachable')
+
+    assert [label for label, seconds in details['steps']] == ['docker inspect abc', 'GET ghcr.io/v2/']
+    assert all(seconds >= 0 for label, seconds in details['steps'])
+
+
+def test_profile_report_ranks_and_flags_outliers(make_checker, capsys):
+    checker = make_checker()
+    checker.check_results = list(RESULTS)
+    checker.discovery_time = 0.05
+
+    print_profile_report(checker, 3.9, outlier_seconds=2.0)
+
+    out = capsys.readouterr().out
+    assert 'Profile: 4 container(s) checked in 3.90s (container discovery 0.05s)' in out
+    container_table = out.split('-' * 110 + '\n', 1)[1].split('\n\n', 1)[0]
+    assert [line.split()[0] for line in container_table.splitlines()] == ['slow', 'medium', 'ok', 'fast']
+    assert '2.80s docker manifest inspect ghcr.io/org/slow:1.0' in out
+    registries = out.split('Registry', 2)[2]
+    assert registries.index('ghcr.io') < registries.index('docker.io')
+    assert 'slow: docker manifest inspect ghcr.io/org/slow:1.0 took 2.80s' in out
+    assert 'slow: 3.00s total is' in out
+    assert 'fast:' not in out.split('Outliers', 1)[1]
+
+
+def test_profile_report_without_outliers(make_checker, capsys):
+    checker = make_checker()
+    checker.check_results = RESULTS[:3]
+    print_profile_report(checker, 1.0)
+    assert capsys.readouterr().out.rstrip().endswith('No outliers found')
+
+
+def test_profile_flag_prints_report(dc, make_checker, monkeypatch, stub_run, capsys, tmp_path):
+    make_checker(history=False)
+    run_main(dc, monkeypatch, tmp_path / 'config.ini', '--profile')
+    assert 'Profile: 4 container(s) checked' in capsys.readouterr().out
+
+
+def test_profile_report_printed_for_failed_run(dc, make_checker, monkeypatch, stub_run, capsys, tmp_path):
+    make_checker(history=False)
+
+    def fail(checker):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(dc, 'record_history', fail)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_main(dc, monkeypatch, tmp_path / 'config.ini', '--profile')
+
+    assert exit_info.value.code == 1
+    assert 'Profile: 4 container(s) checked' in capsys.readouterr().out
+
+
+def test_profile_output_writes_cprofile_stats(dc, make_checker, monkeypatch, stub_run, capsys, tmp_path):
+    import pstats
+
+    make_checker(history=False)
+    stats_file = tmp_path / 'run.prof'
+
+    run_main(dc, monkeypatch, tmp_path / 'config.ini', '--profile-output', str(stats_file))
+
+    assert 'Profile: 4 container(s) checked' in capsys.readouterr().out
+    assert pstats.Stats(str(stats_file)).total_calls > 0